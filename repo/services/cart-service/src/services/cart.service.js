@@ -175,8 +175,12 @@ class CartService {
 
     async fetchProduct(productId) {
         try {
-            const response = await axios.get(`${PRODUCT_SERVICE_URL}/api/products/${productId}`);
-            return response.data;
+            // Batch endpoint: same payload and product cache as GET /api/products/:id,
+            // but does not count as a product page view
+            const response = await axios.get(`${PRODUCT_SERVICE_URL}/api/products/batch`, {
+                params: { ids: productId },
+            });
+            return response.data.items[0] || null;
         } catch (error) {
             console.error('Failed to fetch product:', error.message);
             return null;
@@ -31,7 +31,6 @@ interface OrderFilters {
 
 export class OrderService {
     private orderRepository = AppDataSource.getRepository(Order);
-    private orderItemRepository = AppDataSource.getRepository(OrderItem);
     private productServiceUrl = process.env.PRODUCT_SERVICE_URL || 'http://localhost:3002';
 
     private generateOrderNumber(): string {
@@ -40,74 +39,114 @@ export class OrderService {
         return `ORD-${timestamp}-${random}`;
     }
 
+    private async releaseHold(holdId: string): Promise<void> {
+        // Best effort: an unreleased hold still expires on its own
+        await axios
+            .post(`${this.productServiceUrl}/api/reservations/${holdId}/release`)
+            .catch(() => undefined);
+    }
+
     async createOrder(input: CreateOrderInput): Promise<Order> {
-        // Fetch product details from Product Service
+        // Fetch product details from Product Service in one batch
         const orderItems: Partial<OrderItem>[] = [];
         let subtotal = 0;
 
+        const productIds = input.items.map((item) => item.productId);
+        let products: Map<number, any>;
+        try {
+            const response = await axios.post(
+                `${this.productServiceUrl}/api/products/batch`,
+                { ids: productIds }
+            );
+            products = new Map(response.data.items.map((product: any) => [product.id, product]));
+        } catch (error) {
+            throw new Error('Failed to fetch products');
+        }
+
         for (const item of input.items) {
-            try {
-                const response = await axios.get(
-                    `${this.productServiceUrl}/api/products/${item.productId}`
-                );
-                const product = response.data;
+            const product = products.get(item.productId);
+            if (!product) {
+                throw new Error(`Product not found: ${item.productId}`);
+            }
 
-                if (product.stock < item.quantity) {
-                    throw new Error(`Insufficient stock for product: ${product.name}`);
-                }
+            if (product.stock < item.quantity) {
+                throw new Error(`Insufficient stock for product: ${product.name}`);
+            }
 
-                const totalPrice = product.price * item.quantity;
-                subtotal += totalPrice;
+            const totalPrice = product.price * item.quantity;
+            subtotal += totalPrice;
+
+            orderItems.push({
+                productId: product.id,
+                productName: product.name,
+                productImage: product.images?.[0],
+                productSku: product.sku,
+                quantity: item.quantity,
+                unitPrice: product.price,
+                totalPrice,
+            });
+        }
 
-                orderItems.push({
-                    productId: product.id,
-                    productName: product.name,
-                    productImage: product.images?.[0],
-                    productSku: product.sku,
+        // Hold stock for all items in Product Service; the hold expires on its
+        // own if this process dies before committing or releasing it
+        const orderNumber = this.generateOrderNumber();
+        let holdId: string;
+        try {
+            const response = await axios.post(`${this.productServiceUrl}/api/reservations`, {
+                order_ref: orderNumber,
+                items: input.items.map((item) => ({
+                    product_id: item.productId,
                     quantity: item.quantity,
-                    unitPrice: product.price,
-                    totalPrice,
-                });
-
-                // Update stock in Product Service
-                await axios.patch(
-                    `${this.productServiceUrl}/api/products/${item.productId}/stock`,
-                    null,
-                    { params: { quantity: -item.quantity } }
-                );
-            } catch (error) {
-                throw new Error(`Failed to process product ${item.productId}`);
-            }
+                })),
+            });
+            holdId = response.data.hold_id;
+        } catch (error) {
+            throw new Error('Failed to reserve stock for order items');
         }
 
         // Calculate totals
         const shippingCost = subtotal >= 500000 ? 0 : 25000; // Free shipping over 500k
         const totalAmount = subtotal + shippingCost;
 
-        // Create order
-        const order = this.orderRepository.create({
-            userId: input.userId,
-            orderNumber: this.generateOrderNumber(),
-            status: OrderStatus.PENDING,
-            paymentStatus: PaymentStatus.PENDING,
-            paymentMethod: input.paymentMethod,
-            subtotal,
-            shippingCost,
-            discount: 0,
-            totalAmount,
-            shippingAddress: input.shippingAddress,
-            notes: input.notes,
-        });
+        // Order and items are written in one transaction, so a failure
+        // leaves neither behind
+        let savedOrder: Order;
+        try {
+            savedOrder = await AppDataSource.transaction(async (manager) => {
+                const order = await manager.save(
+                    manager.create(Order, {
+                        userId: input.userId,
+                        orderNumber,
+                        status: OrderStatus.PENDING,
+                        paymentStatus: PaymentStatus.PENDING,
+                        paymentMethod: input.paymentMethod,
+                        subtotal,
+                        shippingCost,
+                        discount: 0,
+                        totalAmount,
+                        shippingAddress: input.shippingAddress,
+                        notes: input.notes,
+                    })
+                );
 
-        const savedOrder = await this.orderRepository.save(order);
+                await manager.save(
+                    orderItems.map((item) => manager.create(OrderItem, { ...item, orderId: order.id }))
+                );
 
-        // Create order items
-        for (const item of orderItems) {
-            const orderItem = this.orderItemRepository.create({
-                ...item,
-                orderId: savedOrder.id,
+                return order;
             });
-            await this.orderItemRepository.save(orderItem);
+        } catch (error) {
+            await this.releaseHold(holdId);
+            throw error;
+        }
+
+        try {
+            await axios.post(`${this.productServiceUrl}/api/reservations/${holdId}/commit`);
+        } catch (error) {
+            // No stock behind the order: remove it (items cascade) and free the hold
+            await this.orderRepository.delete(savedOrder.id).catch(() => undefined);
+            await this.releaseHold(holdId);
+            throw new Error('Failed to commit stock for order items');
         }
 
         // Fetch complete order with items
@@ -9,10 +9,13 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.config import settings
 from app.database import Base
-from app.models import Category, Product, ProductReview
+from app.models import Category, Product, ProductReview, StockReservation  # noqa: F401
 
 config = context.config
+# Migrate the database the service uses; alembic.ini's URL is not used
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
 
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
@@ -20,6 +23,13 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(obj, name, type_, reflected, compare_to) -> bool:
+    # FULLTEXT indexes ("ft_*") only exist on MySQL; see Product.__table_args__
+    if type_ == "index" and name.startswith("ft_"):
+        return context.get_bind().dialect.name == "mysql"
+    return True
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -42,7 +52,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
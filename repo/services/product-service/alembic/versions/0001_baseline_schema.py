@@ -0,0 +1,109 @@
+"""Baseline schema: categories, products and product_reviews
+
+The tables as ``Base.metadata.create_all`` created them before schema
+changes went through Alembic. Databases created that way already have
+them, so this revision leaves them alone and the later revisions bring
+them up to date.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_baseline'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table('categories'):
+        # Created by create_all at app startup before this revision existed
+        return
+
+    op.create_table(
+        'categories',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('slug', sa.String(length=100), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('image', sa.String(length=255), nullable=True),
+        sa.Column('parent_id', sa.Integer(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('sort_order', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['parent_id'], ['categories.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_categories_id', 'categories', ['id'])
+    op.create_index('ix_categories_name', 'categories', ['name'])
+    op.create_index('ix_categories_slug', 'categories', ['slug'], unique=True)
+
+    op.create_table(
+        'products',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.Column('slug', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('short_description', sa.String(length=500), nullable=True),
+        sa.Column('sku', sa.String(length=50), nullable=False),
+        sa.Column('price', sa.DECIMAL(precision=12, scale=2), nullable=False),
+        sa.Column('compare_price', sa.DECIMAL(precision=12, scale=2), nullable=True),
+        sa.Column('cost_price', sa.DECIMAL(precision=12, scale=2), nullable=True),
+        sa.Column('stock', sa.Integer(), nullable=True),
+        sa.Column('low_stock_threshold', sa.Integer(), nullable=True),
+        sa.Column('category_id', sa.Integer(), nullable=True),
+        sa.Column('seller_id', sa.String(length=36), nullable=False),
+        sa.Column('brand', sa.String(length=100), nullable=True),
+        sa.Column('images', sa.JSON(), nullable=True),
+        sa.Column('attributes', sa.JSON(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('is_featured', sa.Boolean(), nullable=True),
+        sa.Column('rating', sa.DECIMAL(precision=2, scale=1), nullable=True),
+        sa.Column('review_count', sa.Integer(), nullable=True),
+        sa.Column('sold_count', sa.Integer(), nullable=True),
+        sa.Column('view_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['category_id'], ['categories.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_products_id', 'products', ['id'])
+    op.create_index('ix_products_name', 'products', ['name'])
+    op.create_index('ix_products_slug', 'products', ['slug'], unique=True)
+    op.create_index('ix_products_sku', 'products', ['sku'], unique=True)
+    op.create_index('ix_products_seller_id', 'products', ['seller_id'])
+    op.create_index('ix_products_brand', 'products', ['brand'])
+
+    op.create_table(
+        'product_reviews',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.String(length=36), nullable=False),
+        sa.Column('rating', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=True),
+        sa.Column('comment', sa.Text(), nullable=True),
+        sa.Column('images', sa.JSON(), nullable=True),
+        sa.Column('is_verified_purchase', sa.Boolean(), nullable=True),
+        sa.Column('is_approved', sa.Boolean(), nullable=True),
+        sa.Column('helpful_count', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_product_reviews_id', 'product_reviews', ['id'])
+
+
+def downgrade() -> None:
+    op.drop_table('product_reviews')
+    op.drop_table('products')
+    op.drop_table('categories')
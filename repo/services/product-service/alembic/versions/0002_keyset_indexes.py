@@ -0,0 +1,43 @@
+"""Keyset pagination indexes on products
+
+One (is_active, sort key, id) index per sort_by option, so cursor pages
+are an index range scan. Databases created with create_all after keyset
+pagination was added already have them; those are skipped.
+
+Revision ID: 0002_keyset_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:01:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_keyset_indexes'
+down_revision: Union[str, None] = '0001_baseline'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (name, columns), all on products
+KEYSET_INDEXES = [
+    ('ix_products_active_created_at_id', ['is_active', 'created_at', 'id']),
+    ('ix_products_active_price_id', ['is_active', 'price', 'id']),
+    ('ix_products_active_rating_id', ['is_active', 'rating', 'id']),
+    ('ix_products_active_sold_count_id', ['is_active', 'sold_count', 'id']),
+    ('ix_products_active_name_id', ['is_active', 'name', 'id']),
+]
+
+
+def upgrade() -> None:
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('products')}
+    for name, columns in KEYSET_INDEXES:
+        if name not in existing:
+            op.create_index(name, 'products', columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(KEYSET_INDEXES):
+        op.drop_index(name, table_name='products')
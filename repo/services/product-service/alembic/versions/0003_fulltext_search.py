@@ -0,0 +1,35 @@
+"""FULLTEXT search index on products (MySQL only)
+
+Backs the MATCH ... AGAINST search in get_products; it must list the same
+columns as the MATCH. Other databases use the ILIKE fallback and get
+nothing here.
+
+Revision ID: 0003_fulltext_search
+Revises: 0002_keyset_indexes
+Create Date: 2026-10-18 09:02:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_fulltext_search'
+down_revision: Union[str, None] = '0002_keyset_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'mysql':
+        return
+    if 'ft_products_search' not in {index['name'] for index in sa.inspect(bind).get_indexes('products')}:
+        op.create_index('ft_products_search', 'products', ['name', 'description', 'sku'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'mysql':
+        op.drop_index('ft_products_search', table_name='products')
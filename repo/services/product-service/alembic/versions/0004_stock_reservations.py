@@ -0,0 +1,59 @@
+"""Stock reservation holds: products.reserved and stock_reservations
+
+products.reserved is the quantity held by open reservations; every
+existing product starts with nothing held. Databases created with
+create_all after holds were added may already have the table (but never
+the column, since create_all does not alter tables); what exists is
+skipped.
+
+Revision ID: 0004_stock_reservations
+Revises: 0003_fulltext_search
+Create Date: 2026-10-18 09:03:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_stock_reservations'
+down_revision: Union[str, None] = '0003_fulltext_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+
+    if 'reserved' not in {column['name'] for column in inspector.get_columns('products')}:
+        op.add_column('products', sa.Column('reserved', sa.Integer(), server_default='0', nullable=False))
+
+    if not inspector.has_table('stock_reservations'):
+        op.create_table(
+            'stock_reservations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('hold_id', sa.String(length=36), nullable=False),
+            sa.Column('product_id', sa.Integer(), nullable=False),
+            sa.Column('quantity', sa.Integer(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('order_ref', sa.String(length=64), nullable=True),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+            sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_stock_reservations_id', 'stock_reservations', ['id'])
+        op.create_index('ix_stock_reservations_hold_id', 'stock_reservations', ['hold_id'])
+        op.create_index('ix_stock_reservations_status_expires_at', 'stock_reservations', ['status', 'expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_reservations_status_expires_at', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_hold_id', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_id', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
+    with op.batch_alter_table('products') as batch:
+        batch.drop_column('reserved')
@@ -0,0 +1,76 @@
+"""Incremental rating aggregates: products.rating_sum
+
+rating_sum is the sum of a product's approved review ratings; with
+review_count it lets a new review update rating in one UPDATE. All three
+are recomputed from the approved reviews here, so they start out
+consistent with each other.
+
+Revision ID: 0005_rating_aggregates
+Revises: 0004_stock_reservations
+Create Date: 2026-10-18 09:04:00.000000
+
+"""
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_rating_aggregates'
+down_revision: Union[str, None] = '0004_stock_reservations'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if 'rating_sum' not in {column['name'] for column in sa.inspect(bind).get_columns('products')}:
+        op.add_column('products', sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+    _backfill_rating_aggregates(bind)
+
+
+def _backfill_rating_aggregates(bind, batch_size: int = 1000) -> None:
+    """rating, rating_sum and review_count from approved reviews (as
+    crud.product.recompute_rating_aggregates, without importing the app).
+
+    New reviews are folded into the stored sum and count, so the three
+    have to start out consistent with each other.
+    """
+    products = sa.table(
+        'products',
+        sa.column('id', sa.Integer), sa.column('rating', sa.Numeric(2, 1)),
+        sa.column('rating_sum', sa.Integer), sa.column('review_count', sa.Integer)
+    )
+    reviews = sa.table(
+        'product_reviews',
+        sa.column('product_id', sa.Integer), sa.column('rating', sa.Integer), sa.column('is_approved', sa.Boolean)
+    )
+    aggregates = bind.execute(
+        sa.select(reviews.c.product_id, sa.func.sum(reviews.c.rating), sa.func.count())
+        .where(reviews.c.is_approved == sa.true())
+        .group_by(reviews.c.product_id)
+    ).all()
+
+    bind.execute(products.update().values(rating=0, rating_sum=0, review_count=0))
+    statement = products.update().where(products.c.id == sa.bindparam('product_id')).values(
+        rating=sa.bindparam('new_rating'),
+        rating_sum=sa.bindparam('new_rating_sum'),
+        review_count=sa.bindparam('new_review_count')
+    )
+    for start in range(0, len(aggregates), batch_size):
+        bind.execute(statement, [
+            {
+                'product_id': product_id,
+                'new_rating': (Decimal(rating_sum) / count).quantize(Decimal('0.1'), ROUND_HALF_UP),
+                'new_rating_sum': int(rating_sum),
+                'new_review_count': count,
+            }
+            for product_id, rating_sum, count in aggregates[start:start + batch_size]
+        ])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('products') as batch:
+        batch.drop_column('rating_sum')
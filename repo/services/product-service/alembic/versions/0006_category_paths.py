@@ -0,0 +1,83 @@
+"""Subtree filtering: categories.path and products.category_id index
+
+categories.path is the materialized chain of ancestor ids ("/1/5/12/"),
+so a subtree is one prefix range on ix_categories_path; products are
+then matched through ix_products_category_id. Paths are backfilled from
+parent_id for categories that have none.
+
+Revision ID: 0006_category_paths
+Revises: 0005_rating_aggregates
+Create Date: 2026-10-18 09:05:00.000000
+
+"""
+from collections import defaultdict
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_category_paths'
+down_revision: Union[str, None] = '0005_rating_aggregates'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _columns(inspector, table: str) -> set:
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table: str) -> set:
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if 'path' not in _columns(inspector, 'categories'):
+        op.add_column('categories', sa.Column('path', sa.String(length=512), nullable=True))
+    if 'ix_categories_path' not in _indexes(inspector, 'categories'):
+        op.create_index('ix_categories_path', 'categories', ['path'])
+
+    if 'ix_products_category_id' not in _indexes(inspector, 'products'):
+        op.create_index('ix_products_category_id', 'products', ['category_id'])
+
+    _backfill_paths(bind)
+
+
+def _backfill_paths(bind) -> None:
+    """Paths for categories that have none, from parent_id (as
+    crud.category.rebuild_category_paths, without importing the app)."""
+    categories = sa.table(
+        'categories', sa.column('id', sa.Integer), sa.column('parent_id', sa.Integer), sa.column('path', sa.String)
+    )
+    rows = bind.execute(sa.select(categories.c.id, categories.c.parent_id, categories.c.path)).all()
+    if all(path for _, _, path in rows):
+        return
+
+    children = defaultdict(list)
+    for category_id, parent_id, _ in rows:
+        children[parent_id].append(category_id)
+    paths = []
+    stack = [(category_id, '/') for category_id in children[None]]
+    while stack:
+        category_id, parent_path = stack.pop()
+        path = f'{parent_path}{category_id}/'
+        paths.append({'category_id': category_id, 'new_path': path})
+        stack.extend((child_id, path) for child_id in children[category_id])
+
+    if paths:
+        bind.execute(
+            categories.update().where(categories.c.id == sa.bindparam('category_id')).values(path=sa.bindparam('new_path')),
+            paths
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_category_id', table_name='products')
+
+    op.drop_index('ix_categories_path', table_name='categories')
+    with op.batch_alter_table('categories') as batch:
+        batch.drop_column('path')
@@ -0,0 +1,49 @@
+"""Catalog version row behind list and category ETags
+
+catalog_state holds a single row (id 1) whose version every catalog write
+increments, so all workers derive the same ETag/Last-Modified from it.
+The row is seeded as of the migration.
+
+Revision ID: 0007_catalog_state
+Revises: 0006_category_paths
+Create Date: 2026-10-18 09:06:00.000000
+
+"""
+import time
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_catalog_state'
+down_revision: Union[str, None] = '0006_category_paths'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table('catalog_state'):
+        op.create_table(
+            'catalog_state',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('version', sa.BigInteger(), nullable=False),
+            sa.Column('changed_at', sa.BigInteger(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+
+    catalog_state = sa.table('catalog_state', sa.column('id', sa.Integer))
+    if bind.execute(sa.select(catalog_state.c.id).where(catalog_state.c.id == 1)).first() is None:
+        op.bulk_insert(
+            sa.table(
+                'catalog_state', sa.column('id', sa.Integer),
+                sa.column('version', sa.BigInteger), sa.column('changed_at', sa.BigInteger)
+            ),
+            [{'id': 1, 'version': 1, 'changed_at': int(time.time())}]
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_state')
@@ -0,0 +1,40 @@
+"""Indexes on products.created_at and products.updated_at
+
+The in-memory search index refreshes by reading products created or
+updated since its last refresh; these keep that a range scan. Databases
+created with create_all after the refresh was added already have them;
+those are skipped.
+
+Revision ID: 0008_product_change_indexes
+Revises: 0007_catalog_state
+Create Date: 2026-10-18 09:07:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_product_change_indexes'
+down_revision: Union[str, None] = '0007_catalog_state'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_products_created_at', ['created_at']),
+    ('ix_products_updated_at', ['updated_at']),
+]
+
+
+def upgrade() -> None:
+    existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('products')}
+    for name, columns in INDEXES:
+        if name not in existing:
+            op.create_index(name, 'products', columns)
+
+
+def downgrade() -> None:
+    for name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='products')
@@ -0,0 +1,87 @@
+import logging
+import threading
+from typing import Callable
+
+from .cache import catalog_version
+from .config import settings
+from .database import SessionLocal
+from .crud import product as product_crud
+from .crud import reservation as reservation_crud
+from .crud.search_index import search_index
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Call ``func`` every ``interval`` seconds in a daemon thread until stopped."""
+
+    def __init__(self, name: str, interval: float, func: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.func = func
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.func()
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+
+
+# ==========================================
+# Jobs (each opens its own session)
+# ==========================================
+
+def sweep_stock_holds() -> None:
+    """Release expired stock holds, one batch per transaction."""
+    db = SessionLocal()
+    try:
+        batch_size = settings.STOCK_SWEEP_BATCH_SIZE
+        while reservation_crud.sweep_expired_holds(db, batch_size) == batch_size:
+            pass
+    finally:
+        db.close()
+
+
+def flush_view_counts() -> None:
+    """Write buffered product views to the database."""
+    db = SessionLocal()
+    try:
+        product_crud.flush_view_counts(db)
+    finally:
+        db.close()
+
+
+def refresh_search_index() -> None:
+    """Index products other workers created or changed since the last refresh."""
+    db = SessionLocal()
+    try:
+        search_index.refresh(db)
+    finally:
+        db.close()
+
+
+hold_sweeper = PeriodicTask("stock-hold-sweeper", settings.STOCK_SWEEP_INTERVAL, sweep_stock_holds)
+view_count_flusher = PeriodicTask("view-count-flusher", settings.VIEW_COUNT_FLUSH_INTERVAL, flush_view_counts)
+search_index_refresher = PeriodicTask(
+    "search-index-refresher", settings.SEARCH_INDEX_REFRESH_INTERVAL, refresh_search_index
+)
+catalog_version_bumper = PeriodicTask(
+    "catalog-version-bumper", settings.CATALOG_VERSION_BUMP_INTERVAL, catalog_version.flush
+)
@@ -0,0 +1,231 @@
+"""
+Small cache layer with interchangeable backends.
+
+``MemoryCache`` is a per-process LRU with TTL; ``RedisCache`` shares entries
+between workers (requires the ``redis`` package). Both store strings.
+"""
+
+import logging
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import engine
+from .models import CatalogState
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCache:
+    """Thread-safe LRU cache whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, ttl: int, maxsize: int):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: List[Any]) -> List[Optional[Any]]:
+        return [self.get(key) for key in keys]
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: Any) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Redis-backed cache; keys are namespaced with ``prefix``.
+
+    Redis errors are logged and treated as a miss (reads) or ignored
+    (writes), so an outage only costs the cache, not the request.
+    """
+
+    def __init__(self, url: str, ttl: int, prefix: str):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The redis cache backend requires the 'redis' package") from exc
+
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(
+            url,
+            decode_responses=True,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        self._errors = redis.RedisError
+
+    def get(self, key: str) -> Optional[str]:
+        try:
+            return self._client.get(self.prefix + key)
+        except self._errors:
+            logger.warning("Redis get failed; treating %s as a miss", key, exc_info=True)
+            return None
+
+    def get_many(self, keys: List[str]) -> List[Optional[str]]:
+        """One MGET for all ``keys``; misses are None."""
+        if not keys:
+            return []
+        try:
+            return self._client.mget([self.prefix + key for key in keys])
+        except self._errors:
+            logger.warning("Redis mget failed; treating %d keys as misses", len(keys), exc_info=True)
+            return [None] * len(keys)
+
+    def set(self, key: str, value: str) -> None:
+        if self.ttl <= 0:
+            return
+        try:
+            self._client.set(self.prefix + key, value, ex=self.ttl)
+        except self._errors:
+            logger.warning("Redis set failed for %s", key, exc_info=True)
+
+    def delete(self, *keys: str) -> None:
+        if not keys:
+            return
+        try:
+            self._client.delete(*(self.prefix + key for key in keys))
+        except self._errors:
+            logger.warning("Redis delete failed for %d keys", len(keys), exc_info=True)
+
+    def clear(self) -> None:
+        try:
+            keys = list(self._client.scan_iter(match=self.prefix + "*", count=1000))
+            for start in range(0, len(keys), 1000):
+                self._client.delete(*keys[start:start + 1000])
+        except self._errors:
+            logger.warning("Redis clear failed for %s*", self.prefix, exc_info=True)
+
+
+class NullCache:
+    """Caching disabled."""
+
+    def get(self, key: str) -> None:
+        return None
+
+    def get_many(self, keys: List[str]) -> List[None]:
+        return [None] * len(keys)
+
+    def set(self, key: str, value: str) -> None:
+        pass
+
+    def delete(self, *keys: str) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+def create_cache(backend: str, ttl: int, maxsize: int, prefix: str):
+    """Build a cache for ``backend``: "memory", "redis" or "none"."""
+    if backend == "redis":
+        if not settings.REDIS_URL:
+            raise RuntimeError("REDIS_URL must be set for the redis cache backend")
+        return RedisCache(settings.REDIS_URL, ttl, prefix)
+    if backend == "none":
+        return NullCache()
+    return MemoryCache(ttl, maxsize)
+
+
+# Serialized ProductResponse JSON by "id:<id>", and product id by "slug:<slug>"
+product_cache = create_cache(
+    settings.PRODUCT_CACHE_BACKEND,
+    settings.PRODUCT_CACHE_TTL,
+    settings.PRODUCT_CACHE_SIZE,
+    prefix="product-service:product:"
+)
+
+
+# Product listing totals keyed by normalized filters and the catalog version
+# the list is served under, so a cached total never outlives the version its
+# ETag names. Other workers' writes show up once the version changes; until
+# then cached totals may lag, so they are reported as estimated.
+count_cache = MemoryCache(settings.COUNT_CACHE_TTL, settings.COUNT_CACHE_SIZE)
+
+
+class CatalogVersion:
+    """Catalog version number and when it last changed, from the
+    ``catalog_state`` row.
+
+    Backs ETag/Last-Modified on list and category responses. The row is
+    shared by all workers, so every worker hands out the same validators.
+    Read it through the session that also reads the response body: on a
+    replica, both then come from the same point in replication.
+
+    Bumping is an UPDATE of that single row, so high-rate writes (stock
+    changes, reviews) use ``bump_later``: their bumps are coalesced into at
+    most one per CATALOG_VERSION_BUMP_INTERVAL by a background task.
+    """
+
+    def __init__(self):
+        self._pending = threading.Event()
+
+    def get(self, db: Session) -> Tuple[str, Optional[int]]:
+        """``(token, changed_at)``; ``changed_at`` is a Unix timestamp, or
+        None if the catalog has not changed since the row was created."""
+        row = db.execute(
+            select(CatalogState.version, CatalogState.changed_at).where(CatalogState.id == 1)
+        ).first()
+        if row is None or not row.changed_at:
+            return "0", None
+        return str(row.version), row.changed_at
+
+    def bump(self) -> None:
+        """Record a catalog write. Call after the write commits."""
+        changed = dict(version=CatalogState.version + 1, changed_at=int(time.time()))
+        try:
+            with engine.begin() as conn:
+                bumped = conn.execute(update(CatalogState).where(CatalogState.id == 1).values(**changed))
+                if bumped.rowcount == 0:
+                    # Schema from create_all rather than the migration, which seeds the row
+                    conn.execute(insert(CatalogState).values(id=1, version=1, changed_at=changed["changed_at"]))
+        except DBAPIError:
+            # The write itself is committed; clients revalidate against the
+            # old version until the next bump succeeds
+            logger.exception("Could not bump the catalog version")
+
+    def bump_later(self) -> None:
+        """Record a catalog write; the bump happens on the next ``flush``."""
+        self._pending.set()
+
+    def flush(self) -> None:
+        """Apply pending ``bump_later`` calls as one bump."""
+        if self._pending.is_set():
+            self._pending.clear()
+            self.bump()
+
+
+catalog_version = CatalogVersion()
@@ -1,3 +1,3 @@
-from . import category, product
+from . import category, product, product_import, reservation
 
-__all__ = ["category", "product"]
+__all__ = ["category", "product", "product_import", "reservation"]
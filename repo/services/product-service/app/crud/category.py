@@ -1,17 +1,23 @@
-import re
-from typing import Optional, List
+import json
+from collections import defaultdict
+from typing import Optional, List, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from ..models import Category
-from ..schemas import CategoryCreate, CategoryUpdate
+from sqlalchemy import and_, func, literal, select, update, String
+from sqlalchemy.sql.elements import ColumnElement
+from ..cache import MemoryCache, catalog_version, count_cache, product_cache
+from ..config import settings
+from ..models import Category, Product
+from ..schemas import CategoryCreate, CategoryUpdate, CategoryResponse
+from .slugs import commit_with_slug
 
+# Serialized /tree response, keyed by the catalog version token it is
+# served under; only the current version is kept
+tree_cache = MemoryCache(settings.CATEGORY_TREE_CACHE_TTL, maxsize=1)
 
-def generate_slug(name: str) -> str:
-    """Generate URL-friendly slug from name."""
-    slug = name.lower()
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
+
+def invalidate_category_tree() -> None:
+    tree_cache.clear()
+    catalog_version.bump()
 
 
 def get_categories(
@@ -44,25 +50,25 @@ def get_category_by_slug(db: Session, slug: str) -> Optional[Category]:
 
 
 def create_category(db: Session, category: CategoryCreate) -> Category:
-    slug = generate_slug(category.name)
-    
-    # Ensure unique slug
-    existing = get_category_by_slug(db, slug)
-    if existing:
-        slug = f"{slug}-{db.query(Category).count() + 1}"
+    def stage(slug: str) -> Category:
+        db_category = Category(
+            name=category.name,
+            slug=slug,
+            description=category.description,
+            image=category.image,
+            parent_id=category.parent_id,
+            is_active=category.is_active,
+            sort_order=category.sort_order
+        )
+        db.add(db_category)
+        db.flush()
+        db_category.path = _child_path(db, category.parent_id, db_category.id)
+        return db_category
     
-    db_category = Category(
-        name=category.name,
-        slug=slug,
-        description=category.description,
-        image=category.image,
-        parent_id=category.parent_id,
-        is_active=category.is_active,
-        sort_order=category.sort_order
-    )
-    db.add(db_category)
-    db.commit()
+    # Unique slug: the name's, or the next free "-<n>" variant
+    db_category = commit_with_slug(db, Category, category.name, stage)
     db.refresh(db_category)
+    invalidate_category_tree()
     return db_category
 
 
@@ -76,16 +82,29 @@ def update_category(
         return None
     
     update_data = category.model_dump(exclude_unset=True)
+    moved = 'parent_id' in update_data and update_data['parent_id'] != db_category.parent_id
     
-    # Update slug if name changed
-    if 'name' in update_data:
-        update_data['slug'] = generate_slug(update_data['name'])
-    
-    for field, value in update_data.items():
-        setattr(db_category, field, value)
+    def stage(slug: str) -> Category:
+        if moved:
+            _move_subtree(db, db_category, update_data['parent_id'])
+        for field, value in update_data.items():
+            setattr(db_category, field, value)
+        db_category.slug = slug
+        return db_category
     
-    db.commit()
+    # Update slug if name changed (kept if it still fits the new name)
+    if 'name' in update_data:
+        commit_with_slug(db, Category, update_data['name'], stage, current=db_category.slug)
+    else:
+        stage(db_category.slug)
+        db.commit()
+    if moved:
+        # Subtree totals (include_descendants) change with the move
+        count_cache.clear()
     db.refresh(db_category)
+    # Product detail payloads embed their category
+    product_cache.clear()
+    invalidate_category_tree()
     return db_category
 
 
@@ -96,12 +115,139 @@ def delete_category(db: Session, category_id: int) -> bool:
     
     db.delete(db_category)
     db.commit()
+    product_cache.clear()
+    invalidate_category_tree()
     return True
 
 
-def get_category_tree(db: Session) -> List[Category]:
-    """Get all categories with their subcategories."""
-    return db.query(Category).filter(
-        Category.parent_id.is_(None),
+# ==========================================
+# Materialized paths
+# ==========================================
+
+def _child_path(db: Session, parent_id: Optional[int], category_id: int) -> str:
+    parent_path = None
+    if parent_id is not None:
+        parent_path = db.query(Category.path).filter(Category.id == parent_id).scalar()
+    return f"{parent_path or '/'}{category_id}/"
+
+
+def _path_prefix(path: str) -> ColumnElement:
+    """Paths starting with ``path`` as a range, so any backend can seek the
+    index: "/1/5/" <= p < "/1/50" ("0" sorts right after "/")."""
+    return and_(Category.path >= path, Category.path < path[:-1] + "0")
+
+
+def _move_subtree(db: Session, db_category: Category, parent_id: Optional[int]) -> None:
+    """Re-root the paths of ``db_category`` and everything below it.
+
+    Raises ValueError if ``parent_id`` is the category itself or one of its
+    descendants.
+    """
+    old_path = db_category.path or f"/{db_category.id}/"
+    new_path = _child_path(db, parent_id, db_category.id)
+    if parent_id == db_category.id or new_path.startswith(old_path):
+        raise ValueError("A category cannot be moved under itself or its subcategories")
+    
+    # One UPDATE rewrites the prefix of every path in the subtree
+    db.query(Category).filter(_path_prefix(old_path)).update(
+        {Category.path: literal(new_path, String) + func.substr(Category.path, len(old_path) + 1)},
+        synchronize_session=False
+    )
+    db_category.path = new_path
+
+
+def rebuild_category_paths(db: Session, batch_size: int = 1000) -> int:
+    """Recompute every category's path from ``parent_id``.
+
+    Backfills rows created before paths existed and repairs drift. Rows in a
+    parent_id cycle get no path. Returns the number of categories updated.
+    """
+    children = defaultdict(list)
+    for category_id, parent_id in db.query(Category.id, Category.parent_id).all():
+        children[parent_id].append(category_id)
+    
+    paths = []
+    stack = [(category_id, "/") for category_id in children[None]]
+    while stack:
+        category_id, parent_path = stack.pop()
+        path = f"{parent_path}{category_id}/"
+        paths.append({"id": category_id, "path": path})
+        stack.extend((child_id, path) for child_id in children[category_id])
+    
+    for start in range(0, len(paths), batch_size):
+        db.execute(update(Category), paths[start:start + batch_size])
+    db.commit()
+    return len(paths)
+
+
+def subtree_filter(db: Session, category_id: int) -> ColumnElement:
+    """Predicate matching products in ``category_id`` or any category below it.
+
+    A single IN over an index range scan of ``categories.path``.
+    """
+    path = db.query(Category.path).filter(Category.id == category_id).scalar()
+    if not path:
+        return Product.category_id == category_id
+    return Product.category_id.in_(select(Category.id).where(_path_prefix(path)))
+
+
+def get_category_tree(db: Session) -> List[dict]:
+    """Build the full active category tree, any depth, from one query.
+
+    Each node carries ``product_count``: active products in the category
+    and all of its descendants. Inactive categories hide their subtree.
+    """
+    # Count once per category in a subquery: joining products per category
+    # lets the planner probe an is_active index once for every category
+    counts = db.query(
+        Product.category_id, func.count(Product.id).label("product_count")
+    ).filter(Product.is_active == True).group_by(Product.category_id).subquery()
+    rows = db.query(Category, func.coalesce(counts.c.product_count, 0)).outerjoin(
+        counts, counts.c.category_id == Category.id
+    ).filter(
         Category.is_active == True
     ).order_by(Category.sort_order, Category.name).all()
+
+    nodes = {}
+    children = defaultdict(list)
+    for category, product_count in rows:
+        node = CategoryResponse.model_validate(category).model_dump(mode="json")
+        node["product_count"] = product_count
+        node["subcategories"] = children[category.id]
+        nodes[category.id] = node
+        children[category.parent_id].append(node)
+
+    # Roots are parentless categories; children of missing/inactive parents
+    # (and any parent_id cycle) are unreachable and dropped
+    roots = children[None]
+
+    # Post-order walk without recursion so depth is not bounded by the stack
+    order = []
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(node["subcategories"])
+    for node in reversed(order):
+        node["product_count"] += sum(child["product_count"] for child in node["subcategories"])
+
+    return roots
+
+
+def cached_category_tree(version_token: str) -> Optional[str]:
+    """Serialized tree for catalog version ``version_token``, if cached."""
+    return tree_cache.get(version_token)
+
+
+def get_category_tree_json(db: Session) -> Tuple[Tuple[str, Optional[int]], str]:
+    """``(catalog version, serialized tree)``, both read through ``db``.
+
+    Served from memory until the catalog version changes (any worker's
+    write) or the TTL runs out.
+    """
+    version = catalog_version.get(db)
+    payload = tree_cache.get(version[0])
+    if payload is None:
+        payload = json.dumps(get_category_tree(db))
+        tree_cache.set(version[0], payload)
+    return version, payload
@@ -1,18 +1,221 @@
 import re
-from typing import Optional, List, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, desc, asc
-from decimal import Decimal
+import json
+import base64
+import threading
+from datetime import datetime
+from typing import Optional, List, Tuple, Any, Dict
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from sqlalchemy import or_, and_, desc, asc, case, update, func
+from sqlalchemy.dialects.mysql import match
+from decimal import Decimal, ROUND_HALF_UP
+from ..cache import catalog_version, count_cache, product_cache
+from ..config import settings
 from ..models import Product, ProductReview
 from ..schemas import ProductCreate, ProductUpdate, ReviewCreate
+from .category import invalidate_category_tree, subtree_filter
+from .search_index import search_index
+from .slugs import commit_with_slug
 
 
-def generate_slug(name: str) -> str:
-    """Generate URL-friendly slug from name."""
-    slug = name.lower()
-    slug = re.sub(r'[^\w\s-]', '', slug)
-    slug = re.sub(r'[-\s]+', '-', slug)
-    return slug.strip('-')
+def invalidate_product_cache(*product_ids: int, slugs: Tuple[str, ...] = ()) -> None:
+    """Drop cached product detail payloads (and slug -> id entries).
+
+    Does not touch the catalog version: writes that change list or tree
+    bodies also call ``invalidate_category_tree`` (product create, update,
+    delete, import) or ``catalog_version.bump_later`` (stock, ratings).
+    Reservation holds only move units in and out of ``reserved``, and do
+    neither; list stock figures catch up at the next version change.
+    """
+    product_cache.delete(
+        *(f"id:{product_id}" for product_id in product_ids),
+        *(f"slug:{slug}" for slug in slugs)
+    )
+
+
+# ==========================================
+# Keyset pagination cursors
+# ==========================================
+
+SORT_COLUMNS = {
+    "created_at": Product.created_at,
+    "price": Product.price,
+    "rating": Product.rating,
+    "sold_count": Product.sold_count,
+    "name": Product.name,
+}
+
+
+def _dump_sort_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _load_sort_value(sort_by: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if sort_by == "created_at":
+        return datetime.fromisoformat(value)
+    if sort_by in ("price", "rating"):
+        return Decimal(value)
+    if sort_by == "sold_count":
+        return int(value)
+    return str(value)
+
+
+def encode_cursor(product: Product, sort_by: str, sort_order: str) -> str:
+    """Encode the sort key and id of the last row of a page as an opaque cursor."""
+    payload = [sort_by, sort_order, _dump_sort_value(getattr(product, sort_by)), product.id]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Decode a cursor into (sort value, id). Raises ValueError if invalid."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort_by, cursor_order, value, last_id = json.loads(raw)
+        value = _load_sort_value(sort_by, value)
+        last_id = int(last_id)
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if cursor_sort_by != sort_by or cursor_order != sort_order:
+        raise ValueError("Cursor does not match sort_by/sort_order")
+    return value, last_id
+
+
+def _sqlite_timestamp(value):
+    """``value`` as SQLite text in one format, for ordering and comparing.
+
+    SQLite stores the CURRENT_TIMESTAMP default as "YYYY-MM-DD HH:MM:SS" but
+    datetimes bound from Python with ".ffffff", so the raw texts of equal
+    times neither compare equal nor sort alike.
+    """
+    return func.strftime("%Y-%m-%d %H:%M:%f", value)
+
+
+def _keyset_filter(sort_column, value: Any, last_id: int, sort_order: str):
+    """Rows strictly after (value, last_id) in (sort_column, id) order.
+
+    NULLs sort first in ascending order on both MySQL and SQLite.
+    """
+    if sort_order == "desc":
+        if value is None:
+            return and_(sort_column.is_(None), Product.id < last_id)
+        return or_(
+            sort_column < value,
+            and_(sort_column == value, Product.id < last_id),
+            sort_column.is_(None)
+        )
+
+    if value is None:
+        return or_(
+            and_(sort_column.is_(None), Product.id > last_id),
+            sort_column.isnot(None)
+        )
+    return or_(
+        sort_column > value,
+        and_(sort_column == value, Product.id > last_id)
+    )
+
+
+# ==========================================
+# Full-text search
+# ==========================================
+
+_FULLTEXT_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+_FULLTEXT_MIN_TOKEN = 3  # InnoDB innodb_ft_min_token_size default
+
+
+def _boolean_query(search: str) -> str:
+    """Build a MySQL boolean-mode query that requires every term as a prefix.
+
+    Terms shorter than the FULLTEXT minimum token size are dropped, since
+    InnoDB never indexes them.
+    """
+    terms = _FULLTEXT_OPERATORS.sub(" ", search).split()
+    return " ".join(f"+{term}*" for term in terms if len(term) >= _FULLTEXT_MIN_TOKEN)
+
+
+def _search_clauses(db: Session, search: str):
+    """Return (filter, relevance) expressions for a search term.
+
+    MySQL uses the ``ft_products_search`` FULLTEXT index via MATCH ... AGAINST;
+    other backends (SQLite in tests), and terms too short to be indexed, fall
+    back to ILIKE with a weighted score.
+    """
+    if db.get_bind().dialect.name == "mysql":
+        against = _boolean_query(search)
+        if against:
+            expr = match(
+                Product.name, Product.description, Product.sku, against=against
+            ).in_boolean_mode()
+            return expr, expr
+    
+    pattern = f"%{search}%"
+    name_hit = Product.name.ilike(pattern)
+    sku_hit = Product.sku.ilike(pattern)
+    description_hit = Product.description.ilike(pattern)
+    relevance = case((name_hit, 3), else_=0) + case((sku_hit, 2), else_=0) + case((description_hit, 1), else_=0)
+    return or_(name_hit, description_hit, sku_hit), relevance
+
+
+# ==========================================
+# Listing count cache
+# ==========================================
+
+TOTAL_EXACT = "exact"
+TOTAL_ESTIMATED = "estimated"
+TOTAL_OMITTED = "omitted"
+
+
+def _normalize_price(value: Optional[Decimal]) -> Optional[str]:
+    return None if value is None else str(Decimal(value).normalize())
+
+
+def _normalize_text(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def _filter_key(
+    category_id: Optional[int],
+    include_descendants: bool,
+    seller_id: Optional[str],
+    brand: Optional[str],
+    min_price: Optional[Decimal],
+    max_price: Optional[Decimal],
+    is_active: Optional[bool],
+    is_featured: Optional[bool],
+    search: Optional[str],
+    catalog_token: Optional[str]
+) -> tuple:
+    # brand and search arrive normalized, as get_products filters by them
+    return (
+        catalog_token,
+        category_id or None,
+        bool(category_id and include_descendants),
+        seller_id or None,
+        brand,
+        _normalize_price(min_price),
+        _normalize_price(max_price),
+        is_active,
+        is_featured,
+        search,
+    )
+
+
+# What list pages load: the ProductListResponse fields, available_stock's
+# inputs, category_id for the category fetch and the cursor sort keys.
+# description, attributes, cost_price etc. are never read from the row.
+LIST_COLUMNS = (
+    Product.id, Product.name, Product.slug, Product.price, Product.compare_price,
+    Product.stock, Product.reserved, Product.images, Product.rating, Product.review_count,
+    Product.is_featured, Product.category_id, Product.created_at, Product.sold_count,
+)
 
 
 def get_products(
@@ -28,15 +231,44 @@ def get_products(
     is_featured: Optional[bool] = None,
     search: Optional[str] = None,
     sort_by: str = "created_at",
-    sort_order: str = "desc"
-) -> Tuple[List[Product], int]:
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    include_descendants: bool = False,
+    catalog_token: Optional[str] = None
+) -> Tuple[List[Product], Optional[int], str]:
+    """List products.
+
+    When ``cursor`` is given, ``skip`` is ignored and the page starts right
+    after the row encoded in the cursor (keyset pagination).
+
+    Returns ``(products, total, total_type)``. ``total`` is None when
+    ``include_total`` is False; otherwise it comes from the count cache
+    (``estimated``) or a fresh ``COUNT`` (``exact``).
+
+    With ``include_descendants``, ``category_id`` also matches products in
+    all of its subcategories.
+    
+    ``catalog_token`` is the catalog version the response is served under;
+    cached totals are only reused within the same version.
+    
+    Only LIST_COLUMNS are loaded; reading any other column of the returned
+    products raises instead of lazy-loading it row by row.
+    """
+    # Matching is case-insensitive either way; normalized once so the
+    # filters and the count cache key agree
+    brand = _normalize_text(brand)
+    search = _normalize_text(search)
+    
     query = db.query(Product)
     
     # Filters
     if is_active is not None:
         query = query.filter(Product.is_active == is_active)
     
-    if category_id:
+    if category_id and include_descendants:
+        query = query.filter(subtree_filter(db, category_id))
+    elif category_id:
         query = query.filter(Product.category_id == category_id)
     
     if seller_id:
@@ -54,37 +286,86 @@ def get_products(
     if is_featured is not None:
         query = query.filter(Product.is_featured == is_featured)
     
+    relevance = None
     if search:
-        query = query.filter(
-            or_(
-                Product.name.ilike(f"%{search}%"),
-                Product.description.ilike(f"%{search}%"),
-                Product.sku.ilike(f"%{search}%")
-            )
-        )
+        hits = None
+        if settings.SEARCH_BACKEND == "memory":
+            hits = search_index.search(search, settings.SEARCH_INDEX_MAX_CANDIDATES)
+        
+        if hits is not None and not hits:
+            return [], (0 if include_total else None), (TOTAL_EXACT if include_total else TOTAL_OMITTED)
+        if hits is not None:
+            # Resolved in memory: only fetch the candidate rows by primary key
+            query = query.filter(Product.id.in_(list(hits)))
+            relevance = case(hits, value=Product.id, else_=0)
+        else:
+            search_filter, relevance = _search_clauses(db, search)
+            query = query.filter(search_filter)
     
     # Get total count
-    total = query.count()
+    total = None
+    total_type = TOTAL_OMITTED
+    if include_total:
+        key = _filter_key(
+            category_id, include_descendants, seller_id, brand, min_price, max_price,
+            is_active, is_featured, search, catalog_token
+        )
+        total = count_cache.get(key)
+        total_type = TOTAL_ESTIMATED
+        if total is None:
+            total = query.count()
+            total_type = TOTAL_EXACT
+            count_cache.set(key, total)
     
-    # Sorting
-    sort_column = getattr(Product, sort_by, Product.created_at)
-    if sort_order == "desc":
-        query = query.order_by(desc(sort_column))
+    # Sorting (id breaks ties so keyset pages are stable)
+    if sort_by == "relevance" and relevance is not None:
+        sort_column = relevance
     else:
-        query = query.order_by(asc(sort_column))
+        sort_column = SORT_COLUMNS.get(sort_by, Product.created_at)
+        if sort_column is Product.created_at and db.get_bind().dialect.name == "sqlite":
+            sort_column = _sqlite_timestamp(sort_column)
+    direction = desc if sort_order == "desc" else asc
+    query = query.order_by(direction(sort_column), direction(Product.id))
     
     # Pagination
-    products = query.offset(skip).limit(limit).all()
+    if cursor:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Cursor pagination is not supported for sort_by={sort_by}")
+        value, last_id = decode_cursor(cursor, sort_by, sort_order)
+        if isinstance(value, datetime) and sort_column is not Product.created_at:
+            value = _sqlite_timestamp(value)
+        query = query.filter(_keyset_filter(sort_column, value, last_id, sort_order))
+    else:
+        query = query.offset(skip)
     
-    return products, total
+    # Categories for the whole page in one extra query, not one per product
+    products = query.options(
+        load_only(*LIST_COLUMNS, raiseload=True),
+        selectinload(Product.category)
+    ).limit(limit).all()
+    
+    return products, total, total_type
 
 
 def get_product(db: Session, product_id: int) -> Optional[Product]:
-    return db.query(Product).filter(Product.id == product_id).first()
+    return db.query(Product).options(joinedload(Product.category)).filter(
+        Product.id == product_id
+    ).first()
+
+
+def get_products_by_ids(db: Session, product_ids: List[int]) -> List[Product]:
+    """Load several products (with categories) in one query, in no particular order."""
+    if not product_ids:
+        return []
+    return db.query(Product).options(joinedload(Product.category)).filter(
+        Product.id.in_(product_ids)
+    ).all()
 
 
 def get_product_by_slug(db: Session, slug: str) -> Optional[Product]:
-    return db.query(Product).filter(Product.slug == slug).first()
+    return db.query(Product).options(joinedload(Product.category)).filter(
+        Product.slug == slug
+    ).first()
 
 
 def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
@@ -92,38 +373,48 @@ def get_product_by_sku(db: Session, sku: str) -> Optional[Product]:
 
 
 def create_product(db: Session, product: ProductCreate, seller_id: str) -> Product:
-    slug = generate_slug(product.name)
-    
-    # Ensure unique slug
-    existing = get_product_by_slug(db, slug)
-    if existing:
-        slug = f"{slug}-{db.query(Product).count() + 1}"
-    
-    db_product = Product(
-        name=product.name,
-        slug=slug,
-        description=product.description,
-        short_description=product.short_description,
-        sku=product.sku,
-        price=product.price,
-        compare_price=product.compare_price,
-        cost_price=product.cost_price,
-        stock=product.stock,
-        low_stock_threshold=product.low_stock_threshold,
-        category_id=product.category_id,
-        seller_id=seller_id,
-        brand=product.brand,
-        images=product.images,
-        attributes=product.attributes,
-        is_active=product.is_active,
-        is_featured=product.is_featured
-    )
-    db.add(db_product)
-    db.commit()
+    def stage(slug: str) -> Product:
+        db_product = Product(
+            name=product.name,
+            slug=slug,
+            description=product.description,
+            short_description=product.short_description,
+            sku=product.sku,
+            price=product.price,
+            compare_price=product.compare_price,
+            cost_price=product.cost_price,
+            stock=product.stock,
+            low_stock_threshold=product.low_stock_threshold,
+            category_id=product.category_id,
+            seller_id=seller_id,
+            brand=product.brand,
+            images=product.images,
+            attributes=product.attributes,
+            is_active=product.is_active,
+            is_featured=product.is_featured
+        )
+        db.add(db_product)
+        return db_product
+    
+    # Unique slug: the name's, or the next free "-<n>" variant
+    db_product = commit_with_slug(db, Product, product.name, stage)
     db.refresh(db_product)
+    count_cache.clear()
+    invalidate_category_tree()
+    if search_index.ready:
+        search_index.add(db_product)
     return db_product
 
 
+def _check_stock_covers_holds(db: Session, product_id: int, stock: int) -> None:
+    """Raise ValueError if ``stock`` is below the units held by open
+    reservations. Locks the row, so no hold can be taken before the write
+    commits."""
+    reserved = db.query(Product.reserved).filter(Product.id == product_id).with_for_update().scalar()
+    if reserved and stock < reserved:
+        raise ValueError(f"Stock cannot go below the {reserved} units held by open reservations")
+
+
 def update_product(
     db: Session,
     product_id: int,
@@ -139,16 +430,32 @@ def update_product(
         return None
     
     update_data = product.model_dump(exclude_unset=True)
+    old_slug = db_product.slug
     
-    # Update slug if name changed
-    if 'name' in update_data:
-        update_data['slug'] = generate_slug(update_data['name'])
-    
-    for field, value in update_data.items():
-        setattr(db_product, field, value)
+    def stage(slug: str) -> Product:
+        if 'stock' in update_data:
+            _check_stock_covers_holds(db, product_id, update_data['stock'])
+        for field, value in update_data.items():
+            setattr(db_product, field, value)
+        db_product.slug = slug
+        return db_product
     
-    db.commit()
+    # Update slug if name changed (kept if it still fits the new name)
+    try:
+        if 'name' in update_data:
+            commit_with_slug(db, Product, update_data['name'], stage, current=old_slug)
+        else:
+            stage(old_slug)
+            db.commit()
+    except ValueError:
+        db.rollback()
+        raise
     db.refresh(db_product)
+    count_cache.clear()
+    invalidate_category_tree()
+    invalidate_product_cache(product_id, slugs=(old_slug,))
+    if search_index.ready:
+        search_index.add(db_product)
     return db_product
 
 
@@ -161,33 +468,152 @@ def delete_product(db: Session, product_id: int, seller_id: Optional[str] = None
     if seller_id and db_product.seller_id != seller_id:
         return False
     
+    slug = db_product.slug
     db.delete(db_product)
     db.commit()
+    count_cache.clear()
+    invalidate_category_tree()
+    invalidate_product_cache(product_id, slugs=(slug,))
+    if search_index.ready:
+        search_index.remove(product_id)
     return True
 
 
+def _apply_stock_delta(db: Session, product_id: int, quantity: int) -> bool:
+    """Conditionally apply a stock delta in the current transaction.
+
+    The check and the write happen in one UPDATE, so concurrent callers
+    cannot both pass the check and oversell. Units held by reservations
+    are not available. Restocking (positive ``quantity``) always succeeds.
+    """
+    condition = [Product.id == product_id]
+    if quantity < 0:
+        condition.append(Product.stock - Product.reserved + quantity >= 0)
+    result = db.execute(
+        update(Product)
+        .where(*condition)
+        .values(stock=Product.stock + quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
 def update_stock(db: Session, product_id: int, quantity: int) -> Optional[Product]:
     """Update product stock (positive to add, negative to subtract)."""
-    db_product = get_product(db, product_id)
-    if not db_product:
-        return None
+    if not _apply_stock_delta(db, product_id, quantity):
+        db.rollback()
+        return None  # Not found or not enough stock
     
-    new_stock = db_product.stock + quantity
-    if new_stock < 0:
-        return None  # Not enough stock
-    
-    db_product.stock = new_stock
     db.commit()
-    db.refresh(db_product)
-    return db_product
+    invalidate_product_cache(product_id)
+    catalog_version.bump_later()
+    return get_product(db, product_id)
+
 
+STOCK_OK = "ok"
+STOCK_NOT_FOUND = "not_found"
+STOCK_INSUFFICIENT = "insufficient_stock"
 
-def increment_view_count(db: Session, product_id: int) -> None:
-    """Increment product view count."""
-    db.query(Product).filter(Product.id == product_id).update(
-        {Product.view_count: Product.view_count + 1}
+
+def bulk_update_stock(db: Session, adjustments: List[Tuple[int, int]]) -> Tuple[bool, List[dict]]:
+    """Apply several stock deltas in one transaction, all or nothing.
+
+    Deltas for the same product are summed. Rows are updated in id order so
+    concurrent bulk calls lock rows in the same order and cannot deadlock.
+    Returns ``(success, results)`` with one result per product in request
+    order. If any item fails, nothing is committed and each result still
+    says whether that item on its own could have been applied.
+    """
+    deltas = {}
+    for product_id, quantity in adjustments:
+        deltas[product_id] = deltas.get(product_id, 0) + quantity
+    
+    applied = {
+        product_id: _apply_stock_delta(db, product_id, deltas[product_id])
+        for product_id in sorted(deltas)
+    }
+    success = all(applied.values())
+    
+    stocks = dict(
+        db.query(Product.id, Product.stock - Product.reserved).filter(Product.id.in_(list(deltas))).all()
     )
-    db.commit()
+    if success:
+        db.commit()
+        invalidate_product_cache(*deltas)
+        catalog_version.bump_later()
+    else:
+        db.rollback()
+    
+    results = []
+    for product_id, quantity in deltas.items():
+        if applied[product_id]:
+            status = STOCK_OK
+        elif product_id in stocks:
+            status = STOCK_INSUFFICIENT
+        else:
+            status = STOCK_NOT_FOUND
+        results.append({
+            "product_id": product_id,
+            "quantity": quantity,
+            "status": status,
+            "stock": stocks.get(product_id) if success else None
+        })
+    return success, results
+
+
+class ViewCountBuffer:
+    """Coalesces product page views in memory until the next flush.
+
+    Views are written back in one ``UPDATE ... CASE`` per flush, so the
+    product page read path never takes a row lock or commits.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, product_id: int) -> bool:
+        """Count a view; returns True once the buffer holds ``max_size`` products."""
+        with self._lock:
+            self._counts[product_id] = self._counts.get(product_id, 0) + 1
+            return len(self._counts) >= self.max_size
+
+    def flush(self, db: Session) -> int:
+        """Write pending views; returns the number of products updated."""
+        with self._lock:
+            counts, self._counts = self._counts, {}
+        if not counts:
+            return 0
+        
+        try:
+            db.execute(
+                update(Product)
+                .where(Product.id.in_(list(counts)))
+                .values(view_count=Product.view_count + case(counts, value=Product.id, else_=0))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            # Keep the views for the next attempt
+            with self._lock:
+                for product_id, count in counts.items():
+                    self._counts[product_id] = self._counts.get(product_id, 0) + count
+            raise
+        return len(counts)
+
+
+view_counts = ViewCountBuffer(settings.VIEW_COUNT_MAX_BUFFER)
+
+
+def increment_view_count(product_id: int) -> bool:
+    """Buffer a product view. Returns True when the buffer should be flushed now."""
+    return view_counts.add(product_id)
+
+
+def flush_view_counts(db: Session) -> int:
+    return view_counts.flush(db)
 
 
 # ==========================================
@@ -228,31 +654,67 @@ def create_review(
         is_verified_purchase=is_verified_purchase
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    db.flush()
     
-    # Update product rating
-    _update_product_rating(db, product_id)
+    # Update product rating in the same transaction
+    _add_rating(db, product_id, review.rating)
     
+    db.commit()
+    invalidate_product_cache(product_id)
+    catalog_version.bump_later()
+    db.refresh(db_review)
     return db_review
 
 
-def _update_product_rating(db: Session, product_id: int) -> None:
-    """Recalculate product average rating."""
-    from sqlalchemy import func
-    
-    result = db.query(
-        func.avg(ProductReview.rating),
+def _add_rating(db: Session, product_id: int, rating: int) -> None:
+    """Fold one approved rating into the product's running sum and count."""
+    new_sum = Product.rating_sum + rating
+    new_count = func.coalesce(Product.review_count, 0) + 1
+    # rating is set first: MySQL evaluates SET assignments left to right
+    db.execute(
+        update(Product)
+        .where(Product.id == product_id)
+        .ordered_values(
+            (Product.rating, func.round(new_sum * 1.0 / new_count, 1)),
+            (Product.rating_sum, new_sum),
+            (Product.review_count, new_count)
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+def recompute_rating_aggregates(db: Session, batch_size: int = 1000) -> int:
+    """Rebuild rating, rating_sum and review_count from approved reviews.
+
+    Repairs drift in the incrementally maintained aggregates. Returns the
+    number of products that have reviews.
+    """
+    aggregates = db.query(
+        ProductReview.product_id,
+        func.sum(ProductReview.rating),
         func.count(ProductReview.id)
     ).filter(
-        ProductReview.product_id == product_id,
         ProductReview.is_approved == True
-    ).first()
+    ).group_by(ProductReview.product_id).all()
+    
+    reviewed = db.query(ProductReview.product_id).filter(ProductReview.is_approved == True)
+    db.query(Product).filter(~Product.id.in_(reviewed)).update(
+        {Product.rating: 0, Product.rating_sum: 0, Product.review_count: 0},
+        synchronize_session=False
+    )
     
-    avg_rating, count = result
+    for start in range(0, len(aggregates), batch_size):
+        db.execute(update(Product), [
+            {
+                "id": product_id,
+                "rating": (Decimal(rating_sum) / count).quantize(Decimal("0.1"), ROUND_HALF_UP),
+                "rating_sum": int(rating_sum),
+                "review_count": count
+            }
+            for product_id, rating_sum, count in aggregates[start:start + batch_size]
+        ])
     
-    db.query(Product).filter(Product.id == product_id).update({
-        Product.rating: avg_rating or 0,
-        Product.review_count: count or 0
-    })
     db.commit()
+    product_cache.clear()
+    catalog_version.bump()
+    return len(aggregates)
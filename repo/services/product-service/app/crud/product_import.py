@@ -0,0 +1,402 @@
+"""
+Bulk product import: upsert by SKU from NDJSON or CSV.
+
+Rows are read lazily and written in chunks of IMPORT_CHUNK_SIZE: one
+batched ``UPDATE`` by primary key for SKUs that exist (a multi-row
+``INSERT ... ON DUPLICATE KEY UPDATE`` on MySQL), one batched ``INSERT``
+for new ones and one commit per chunk, with slugs, categories
+and existing SKUs resolved for the whole chunk in a few queries. Memory
+stays flat however large the input is.
+
+The existing SKUs are locked when they are looked up, so a product cannot
+change hands between the ownership check and the write; each UPDATE also
+matches on the seller it was checked against. New rows are
+plain INSERTs: a slug or SKU taken concurrently fails the chunk, which is
+then retried row by row, re-allocating slugs, instead of overwriting the
+other product.
+
+Each row is a full record: fields it leaves out get the ProductCreate
+defaults, also when it updates an existing product. Existing products
+keep their slug and seller, and their stock cannot drop below the units
+held by open reservations (the lock keeps new holds out meanwhile). A bad row is reported with its line number
+and skipped; the rest of its chunk is still written.
+"""
+
+import csv
+import json
+from typing import Dict, Iterable, Iterator, List, Optional, Set, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import bindparam, func, insert, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Session
+
+from ..cache import count_cache
+from ..config import settings
+from ..models import Category, Product
+from ..schemas import ProductImportRow
+from .category import invalidate_category_tree
+from .product import invalidate_product_cache
+from .search_index import search_index
+from .slugs import SLUG_ATTEMPTS, allocate_slug, allocate_slugs
+
+FORMATS = ("ndjson", "csv")
+
+# Overwritten on update; slug, seller_id and counters are left alone
+UPDATE_COLUMNS = (
+    "name", "description", "short_description", "price", "compare_price", "cost_price",
+    "stock", "low_stock_threshold", "category_id", "brand", "images", "attributes",
+    "is_active", "is_featured",
+)
+
+# (line number, parsed row or None, parse error or None)
+ParsedRow = Tuple[int, Optional[dict], Optional[str]]
+# (sku, column values or UPDATE parameters plus "_slug", line number)
+WriteRow = Tuple[str, dict, int]
+
+
+# ==========================================
+# Parsing
+# ==========================================
+
+def parse_ndjson(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_no, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_no, None, "Expected a JSON object"
+            continue
+        yield line_no, row, None
+
+
+def _csv_cell(field: str, value: str):
+    if field == "attributes":
+        return json.loads(value)
+    if field == "images":
+        # JSON array, or URLs separated by "|"
+        if value.lstrip().startswith("["):
+            return json.loads(value)
+        return [url.strip() for url in value.split("|") if url.strip()]
+    return value
+
+
+def parse_csv(lines: Iterable[str]) -> Iterator[ParsedRow]:
+    """Header row with ProductImportRow field names; empty cells are omitted."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        line_no = reader.line_num
+        try:
+            row = {
+                field: _csv_cell(field, value)
+                for field, value in record.items()
+                if field and value not in (None, "")
+            }
+        except ValueError as exc:
+            yield line_no, None, f"Invalid cell: {exc}"
+            continue
+        yield line_no, row, None
+
+
+def parse_rows(lines: Iterable[str], fmt: str) -> Iterator[ParsedRow]:
+    if fmt == "csv":
+        return parse_csv(lines)
+    if fmt == "ndjson":
+        return parse_ndjson(lines)
+    raise ValueError(f"Unsupported import format: {fmt}")
+
+
+# ==========================================
+# Import
+# ==========================================
+
+def _update_statement(check_seller: bool):
+    """UPDATE by primary key, executed with a list of rows (executemany).
+
+    With ``check_seller`` a row only matches while it still belongs to the
+    seller checked in ``import_chunk``.
+    """
+    table = Product.__table__
+    stmt = update(table).where(table.c.id == bindparam("_id"))
+    if check_seller:
+        stmt = stmt.where(table.c.seller_id == bindparam("_seller_id"))
+    return stmt.values(updated_at=func.now())
+
+
+def _upsert_statement():
+    """MySQL: update existing rows with one multi-row ``INSERT ... ON
+    DUPLICATE KEY UPDATE``, executed with a list of rows.
+
+    pymysql folds an executemany INSERT into a single statement, but sends
+    an UPDATE per row. Each row carries the product's current id, slug, SKU
+    and seller, so it always hits the duplicate primary key, and only
+    UPDATE_COLUMNS change. The seller is not matched again here: the rows
+    stay locked from the ownership check in ``import_chunk`` until the
+    chunk commits.
+    """
+    stmt = mysql_insert(Product.__table__)
+    return stmt.on_duplicate_key_update(
+        updated_at=func.now(), **{column: stmt.inserted[column] for column in UPDATE_COLUMNS}
+    )
+
+
+def _upsert_values(sku: str, params: dict) -> dict:
+    value = {column: params[column] for column in UPDATE_COLUMNS}
+    value.update(id=params["_id"], slug=params["_slug"], sku=sku, seller_id=params["_seller_id"])
+    return value
+
+
+def _update_params(params: dict) -> dict:
+    return {key: value for key, value in params.items() if key != "_slug"}
+
+
+class _RowsChanged(Exception):
+    """Fewer rows matched the chunk UPDATE than were checked."""
+
+
+class ProductImporter:
+    """Upserts products chunk by chunk and keeps the running report.
+
+    ``seller_id`` owns newly created products. Unless ``update_any`` is
+    set (admins), rows whose SKU belongs to another seller are rejected.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        seller_id: str,
+        update_any: bool = False,
+        chunk_size: Optional[int] = None
+    ):
+        self.db = db
+        self.seller_id = seller_id
+        self.update_any = update_any
+        self.chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+        self.processed = 0
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors: List[dict] = []
+        # Categories already looked up, across chunks
+        self._category_slugs: Dict[str, Optional[int]] = {}
+        self._category_ids: Dict[int, bool] = {}
+
+    def run(self, rows: Iterable[ParsedRow]) -> dict:
+        """Import every row and return the report."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self.import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.import_chunk(chunk)
+        return self.report()
+
+    def report(self) -> dict:
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _error(self, line_no: int, sku: Optional[str], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line_no, "sku": sku, "error": message})
+
+    def import_chunk(self, chunk: List[ParsedRow]) -> None:
+        self.processed += len(chunk)
+
+        # Validate; a later row for the same SKU replaces an earlier one
+        valid: Dict[str, Tuple[int, ProductImportRow]] = {}
+        for line_no, raw, parse_error in chunk:
+            if parse_error:
+                self._error(line_no, None, parse_error)
+                continue
+            try:
+                row = ProductImportRow.model_validate(raw)
+            except ValidationError as exc:
+                self._error(line_no, raw.get("sku") if isinstance(raw.get("sku"), str) else None, _describe(exc))
+                continue
+            if row.sku in valid:
+                earlier = valid[row.sku][0]
+                self._error(earlier, row.sku, f"Duplicate SKU; superseded by line {line_no}")
+            valid[row.sku] = (line_no, row)
+        if not valid:
+            return
+
+        # Locked until the chunk commits (MySQL/PostgreSQL)
+        existing = {
+            sku: (product_id, slug, seller_id, reserved)
+            for sku, product_id, slug, seller_id, reserved in self.db.query(
+                Product.sku, Product.id, Product.slug, Product.seller_id, Product.reserved
+            ).filter(Product.sku.in_(list(valid))).with_for_update()
+        }
+        self._resolve_categories(row for _, row in valid.values())
+
+        updates, creates = [], []
+        for sku, (line_no, row) in valid.items():
+            category_id = self._category_for(row)
+            if isinstance(category_id, str):
+                self._error(line_no, sku, category_id)
+                continue
+            current = existing.get(sku)
+            if current and not self.update_any and current[2] != self.seller_id:
+                self._error(line_no, sku, "SKU belongs to another seller")
+                continue
+
+            value = row.model_dump(exclude={"category_slug"})
+            value["category_id"] = category_id
+            if current and current[3] and value["stock"] < current[3]:
+                self._error(line_no, sku, f"Stock is below the {current[3]} units held by open reservations")
+                continue
+            if current:
+                params = {column: value[column] for column in UPDATE_COLUMNS}
+                params.update(_id=current[0], _slug=current[1], _seller_id=current[2])
+                updates.append((sku, params, line_no))
+            else:
+                value["seller_id"] = self.seller_id
+                creates.append((sku, value, line_no))
+
+        # New rows share one slug lookup per chunk
+        slugs = allocate_slugs(self.db, Product, [value["name"] for _, value, _ in creates])
+        for (_, value, _), slug in zip(creates, slugs):
+            value["slug"] = slug
+
+        updated, created = self._write(updates, creates)
+        self.updated += len(updated)
+        self.created += len(created)
+        written = updated + created
+        changed = [existing[sku] for sku in updated]
+
+        if written:
+            count_cache.clear()
+            invalidate_category_tree()
+            invalidate_product_cache(
+                *(product_id for product_id, _, _, _ in changed),
+                slugs=tuple(slug for _, slug, _, _ in changed)
+            )
+            if search_index.ready:
+                for product in self.db.query(
+                    Product.id, Product.name, Product.short_description, Product.brand, Product.sku
+                ).filter(Product.sku.in_(written)):
+                    search_index.add(product)
+
+    def _resolve_categories(self, rows: Iterable[ProductImportRow]) -> None:
+        slugs: Set[str] = set()
+        ids: Set[int] = set()
+        for row in rows:
+            if row.category_slug and row.category_slug not in self._category_slugs:
+                slugs.add(row.category_slug)
+            elif row.category_id is not None and row.category_id not in self._category_ids:
+                ids.add(row.category_id)
+
+        if slugs:
+            found = dict(self.db.query(Category.slug, Category.id).filter(Category.slug.in_(slugs)))
+            for slug in slugs:
+                self._category_slugs[slug] = found.get(slug)
+        if ids:
+            found_ids = {category_id for (category_id,) in self.db.query(Category.id).filter(Category.id.in_(ids))}
+            for category_id in ids:
+                self._category_ids[category_id] = category_id in found_ids
+
+    def _category_for(self, row: ProductImportRow):
+        """Category id (or None) for ``row``, or an error message."""
+        if row.category_slug:
+            category_id = self._category_slugs.get(row.category_slug)
+            return category_id if category_id is not None else f"Unknown category slug: {row.category_slug}"
+        if row.category_id is not None and not self._category_ids.get(row.category_id):
+            return f"Unknown category id: {row.category_id}"
+        return row.category_id
+
+    def _write(self, updates: List[WriteRow], creates: List[WriteRow]) -> Tuple[List[str], List[str]]:
+        """Write ``(sku, values, line number)`` rows; returns the SKUs
+        updated and created.
+
+        If the chunk statements fail (a slug or SKU taken concurrently, a
+        product that changed seller), the rows are retried one by one in
+        savepoints so only the bad ones are reported.
+        """
+        if not updates and not creates:
+            return [], []
+        check_seller = not self.update_any
+        dialect = self.db.get_bind().dialect
+        try:
+            if updates and dialect.name == "mysql":
+                self.db.execute(_upsert_statement(), [_upsert_values(sku, params) for sku, params, _ in updates])
+            elif updates:
+                result = self.db.execute(
+                    _update_statement(check_seller), [_update_params(params) for _, params, _ in updates]
+                )
+                if dialect.supports_sane_multi_rowcount and result.rowcount != len(updates):
+                    raise _RowsChanged()
+            if creates:
+                self.db.execute(insert(Product.__table__), [value for _, value, _ in creates])
+            self.db.commit()
+            return [sku for sku, _, _ in updates], [sku for sku, _, _ in creates]
+        except (DBAPIError, _RowsChanged):
+            self.db.rollback()
+
+        updated = []
+        for sku, params, line_no in updates:
+            try:
+                with self.db.begin_nested():
+                    result = self.db.execute(_update_statement(check_seller), [_update_params(params)])
+                if result.rowcount:
+                    updated.append(sku)
+                else:
+                    self._error(line_no, sku, "SKU was deleted or moved to another seller")
+            except DBAPIError as exc:
+                self._error(line_no, sku, f"Database error: {exc.orig}")
+
+        created = [sku for sku, value, line_no in creates if self._insert_one(value, line_no)]
+        self.db.commit()
+        return updated, created
+
+    def _insert_one(self, value: dict, line_no: int) -> bool:
+        """INSERT one new row, re-allocating its slug if another writer took it."""
+        for attempt in range(SLUG_ATTEMPTS):
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(Product.__table__), [value])
+                return True
+            except IntegrityError as exc:
+                if self.db.query(Product.id).filter(Product.sku == value["sku"]).first():
+                    self._error(line_no, value["sku"], "SKU was created concurrently; import the row again to update it")
+                    return False
+                if attempt == SLUG_ATTEMPTS - 1:
+                    self._error(line_no, value["sku"], f"Database error: {exc.orig}")
+                    return False
+                value["slug"] = allocate_slug(self.db, Product, value["name"])
+            except DBAPIError as exc:
+                self._error(line_no, value["sku"], f"Database error: {exc.orig}")
+                return False
+
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def import_products(
+    db: Session,
+    stream: TextIO,
+    fmt: str,
+    seller_id: str,
+    update_any: bool = False,
+    chunk_size: Optional[int] = None
+) -> dict:
+    """Import products from a text stream of NDJSON or CSV; returns the report."""
+    importer = ProductImporter(db, seller_id, update_any=update_any, chunk_size=chunk_size)
+    return importer.run(parse_rows(stream, fmt))
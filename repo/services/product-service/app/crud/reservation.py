@@ -0,0 +1,214 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import update
+from ..models import Product, StockReservation
+from .product import invalidate_product_cache
+
+HELD = "held"
+COMMITTED = "committed"
+RELEASED = "released"
+EXPIRED = "expired"
+
+
+class HoldNotCommittable(ValueError):
+    """The hold cannot be committed and retrying will not help: stock is
+    now below the held units. Release the hold instead."""
+
+
+def _utcnow() -> datetime:
+    # expires_at is stored as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _adjust_reserved(db: Session, product_id: int, quantity: int, stock_delta: int = 0) -> bool:
+    """Move ``quantity`` units into (positive) or out of (negative) the held pool.
+
+    Holding only succeeds while enough unreserved stock is left; the check
+    and the write are one conditional UPDATE.
+    """
+    condition = [Product.id == product_id]
+    if quantity > 0:
+        condition.append(Product.stock - Product.reserved >= quantity)
+    if stock_delta < 0:
+        condition.append(Product.stock + stock_delta >= 0)
+
+    result = db.execute(
+        update(Product)
+        .where(*condition)
+        .values(reserved=Product.reserved + quantity, stock=Product.stock + stock_delta)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def _lock_products(db: Session, product_ids: List[int]) -> None:
+    """Row-lock products in id order.
+
+    Finishing and sweeping holds lock products first and reservation rows
+    second (creating a hold only locks products, also in id order), so
+    they cannot deadlock on each other.
+    """
+    if product_ids:
+        db.query(Product.id).filter(
+            Product.id.in_(set(product_ids))
+        ).order_by(Product.id).with_for_update().all()
+
+
+def get_hold(db: Session, hold_id: str) -> List[StockReservation]:
+    return db.query(StockReservation).filter(
+        StockReservation.hold_id == hold_id
+    ).order_by(StockReservation.id).all()
+
+
+def create_hold(
+    db: Session,
+    items: List[Tuple[int, int]],
+    ttl_seconds: int,
+    order_ref: Optional[str] = None
+) -> Tuple[Optional[str], List[dict]]:
+    """Hold stock for several products, all or nothing.
+
+    Returns ``(hold_id, results)``; ``hold_id`` is None and nothing is held
+    if any product is missing or lacks unreserved stock.
+    """
+    quantities = defaultdict(int)
+    for product_id, quantity in items:
+        quantities[product_id] += quantity
+
+    # Lock rows in id order so concurrent holds cannot deadlock
+    held = {
+        product_id: _adjust_reserved(db, product_id, quantities[product_id])
+        for product_id in sorted(quantities)
+    }
+
+    if not all(held.values()):
+        existing = {
+            row.id for row in db.query(Product.id).filter(Product.id.in_(list(quantities)))
+        }
+        db.rollback()
+        return None, [
+            {
+                "product_id": product_id,
+                "quantity": quantity,
+                "status": "ok" if held[product_id] else (
+                    "insufficient_stock" if product_id in existing else "not_found"
+                )
+            }
+            for product_id, quantity in quantities.items()
+        ]
+
+    hold_id = str(uuid.uuid4())
+    expires_at = _utcnow() + timedelta(seconds=ttl_seconds)
+    db.add_all([
+        StockReservation(
+            hold_id=hold_id,
+            product_id=product_id,
+            quantity=quantity,
+            status=HELD,
+            order_ref=order_ref,
+            expires_at=expires_at
+        )
+        for product_id, quantity in quantities.items()
+    ])
+    db.commit()
+    invalidate_product_cache(*quantities)
+    return hold_id, [
+        {"product_id": product_id, "quantity": quantity, "status": HELD}
+        for product_id, quantity in quantities.items()
+    ]
+
+
+def _finish_hold(db: Session, hold_id: str, status: str) -> Optional[List[StockReservation]]:
+    """Move every held row of a hold to ``status`` in one transaction.
+
+    Committing also removes the units from physical stock and needs every
+    row to still be held and unexpired. Releasing skips rows that already
+    expired or were released, so it is safe to repeat. Returns None if the
+    hold does not exist; raises ValueError if it cannot be finished, or
+    HoldNotCommittable if stock no longer covers a held row.
+    """
+    rows = get_hold(db, hold_id)
+    if not rows:
+        return None
+
+    now = _utcnow()
+    pending = []
+    for row in rows:
+        if row.status != HELD:
+            if status == RELEASED and row.status in (RELEASED, EXPIRED):
+                continue
+            db.rollback()
+            raise ValueError(f"Hold is already {row.status}")
+        if status == COMMITTED and row.expires_at < now:
+            db.rollback()
+            raise ValueError("Hold has expired")
+        pending.append(row)
+
+    _lock_products(db, [row.product_id for row in pending])
+    for row in pending:
+        stock_delta = -row.quantity if status == COMMITTED else 0
+        if not _claim(db, row.id, status):
+            db.rollback()
+            raise ValueError("Hold changed concurrently, retry")
+        if not _adjust_reserved(db, row.product_id, -row.quantity, stock_delta):
+            db.rollback()
+            if status == COMMITTED:
+                raise HoldNotCommittable(f"Not enough stock of product {row.product_id} to commit the hold")
+            raise ValueError(f"Product {row.product_id} of the hold no longer exists")
+
+    db.commit()
+    invalidate_product_cache(*(row.product_id for row in rows))
+    return get_hold(db, hold_id)
+
+
+def _claim(db: Session, reservation_id: int, status: str) -> bool:
+    """Move one row out of HELD. Conditional on the current status, so the
+    sweeper and a concurrent commit/release cannot both finish the same row."""
+    return db.execute(
+        update(StockReservation)
+        .where(StockReservation.id == reservation_id, StockReservation.status == HELD)
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    ).rowcount == 1
+
+
+def commit_hold(db: Session, hold_id: str) -> Optional[List[StockReservation]]:
+    """Turn held units into a sale: stock and reserved both drop."""
+    return _finish_hold(db, hold_id, COMMITTED)
+
+
+def release_hold(db: Session, hold_id: str) -> Optional[List[StockReservation]]:
+    """Give held units back to sellable stock."""
+    return _finish_hold(db, hold_id, RELEASED)
+
+
+def sweep_expired_holds(db: Session, batch_size: int = 500) -> int:
+    """Expire one batch of overdue holds and return their units.
+
+    Returns the number of reservation rows expired; call again until it
+    returns less than ``batch_size``.
+    """
+    rows = db.query(StockReservation.id, StockReservation.product_id, StockReservation.quantity).filter(
+        StockReservation.status == HELD,
+        StockReservation.expires_at < _utcnow()
+    ).order_by(StockReservation.expires_at).limit(batch_size).all()
+    if not rows:
+        db.rollback()
+        return 0
+
+    # Products before reservations, as in _finish_hold; a row a concurrent
+    # commit or release already took is skipped by _claim
+    _lock_products(db, [row.product_id for row in rows])
+    released = defaultdict(int)
+    for row in rows:
+        if _claim(db, row.id, EXPIRED):
+            released[row.product_id] += row.quantity
+    for product_id in sorted(released):
+        _adjust_reserved(db, product_id, -released[product_id])
+
+    db.commit()
+    invalidate_product_cache(*released)
+    return len(rows)
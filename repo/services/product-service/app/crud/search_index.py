@@ -0,0 +1,205 @@
+"""
+In-process inverted index for product search.
+
+Indexes name, short_description, brand and SKU so that ``get_products``
+can resolve search terms to candidate ids without touching the database,
+then load only those rows by primary key. Every query term must match
+(as a prefix) some token of the product, like the FULLTEXT boolean mode
+used on MySQL.
+
+Local writes update the index directly; ``refresh`` picks up other
+workers' creates and edits from created_at/updated_at. Products deleted
+by other workers keep their postings until the next build, which is
+harmless since candidates are loaded from the database by id.
+"""
+
+import re
+import bisect
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..models import Product
+
+# Uzbek Latin is written with several apostrophe look-alikes (o‘, g‘, oʻ, ...)
+_APOSTROPHES = re.compile(r"[‘’ʻʼ`´]")
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+# A write's timestamp is taken before it commits, so a refresh also
+# re-reads this far behind the newest change it saw last time
+LATE_COMMIT_MARGIN = timedelta(minutes=1)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase tokens.
+
+    Apostrophes inside a word are kept ("o'yin"), and an apostrophe-free
+    variant is added ("oyin") so both spellings find the product.
+    """
+    if not text:
+        return []
+    text = _APOSTROPHES.sub("'", text.lower())
+    tokens = []
+    for token in _TOKEN.findall(text):
+        tokens.append(token)
+        if "'" in token:
+            tokens.append(token.replace("'", ""))
+    return tokens
+
+
+class ProductSearchIndex:
+    """Token -> product id postings with a sorted vocabulary for prefix lookups."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._vocab: List[str] = []
+        # product id -> (name tokens, other tokens), needed for removal and scoring
+        self._docs: Dict[int, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        self._lock = threading.RLock()
+        # Newest created_at/updated_at covered by the index
+        self._synced_through: Optional[datetime] = None
+        self.ready = False
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def build(self, db: Session, batch_size: int = 10000) -> None:
+        """(Re)build the index from the products table."""
+        # Taken first: rows changed during the scan are re-read by the next refresh
+        synced_through = _latest_change(db)
+        rows = db.query(
+            Product.id, Product.name, Product.short_description, Product.brand, Product.sku
+        ).yield_per(batch_size)
+
+        # Build off to the side so searches keep using the old state meanwhile
+        fresh = ProductSearchIndex()
+        for row in rows:
+            fresh._add(row.id, row.name, row.short_description, row.brand, row.sku, sort_vocab=False)
+        fresh._vocab = sorted(fresh._postings)
+
+        with self._lock:
+            self._postings = fresh._postings
+            self._vocab = fresh._vocab
+            self._docs = fresh._docs
+            self._synced_through = synced_through
+            self.ready = True
+
+    def refresh(self, db: Session) -> int:
+        """Re-index products created or updated since the last build or
+        refresh, by any worker. Returns how many rows were re-indexed."""
+        if not self.ready:
+            return 0
+
+        synced_through = _latest_change(db)
+        if synced_through is None or synced_through == self._synced_through:
+            return 0
+
+        query = db.query(Product.id, Product.name, Product.short_description, Product.brand, Product.sku)
+        if self._synced_through is not None:
+            since = self._synced_through - LATE_COMMIT_MARGIN
+            query = query.filter(or_(Product.created_at >= since, Product.updated_at >= since))
+
+        refreshed = 0
+        for row in query:
+            self.add(row)
+            refreshed += 1
+        self._synced_through = synced_through
+        return refreshed
+
+    def add(self, product: Product) -> None:
+        """Index a product, replacing any previous entry for its id."""
+        with self._lock:
+            self._remove(product.id)
+            self._add(
+                product.id, product.name, product.short_description, product.brand, product.sku
+            )
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._remove(product_id)
+
+    def search(self, text: str, max_candidates: Optional[int] = None) -> Optional[Dict[int, int]]:
+        """Return {product_id: score} for products matching every term.
+
+        Returns None when the index cannot answer (not built, no usable terms,
+        or more than ``max_candidates`` hits), so the caller falls back to SQL.
+        """
+        # Apostrophe-free forms match both spellings of the indexed word
+        terms = list(dict.fromkeys(t for t in tokenize(text) if "'" not in t))
+        if not self.ready or not terms:
+            return None
+
+        with self._lock:
+            matches = []
+            for term in terms:
+                ids: Set[int] = set()
+                for token in self._expand(term):
+                    ids |= self._postings[token]
+                matches.append(ids)
+
+            matches.sort(key=len)
+            candidates = set(matches[0])
+            for ids in matches[1:]:
+                candidates &= ids
+                if not candidates:
+                    break
+
+            if max_candidates is not None and len(candidates) > max_candidates:
+                return None
+
+            # Name hits score double
+            scores = {}
+            for product_id in candidates:
+                name_tokens, _ = self._docs[product_id]
+                scores[product_id] = sum(
+                    2 if any(token.startswith(term) for token in name_tokens) else 1
+                    for term in terms
+                )
+            return scores
+
+    def _expand(self, prefix: str) -> Iterable[str]:
+        vocab = self._vocab
+        index = bisect.bisect_left(vocab, prefix)
+        while index < len(vocab) and vocab[index].startswith(prefix):
+            yield vocab[index]
+            index += 1
+
+    def _add(self, product_id, name, short_description, brand, sku, sort_vocab=True) -> None:
+        name_tokens = frozenset(tokenize(name))
+        other_tokens = frozenset(
+            tokenize(short_description) + tokenize(brand) + tokenize(sku)
+        ) - name_tokens
+        self._docs[product_id] = (name_tokens, other_tokens)
+
+        for token in name_tokens | other_tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = set()
+                if sort_vocab:
+                    bisect.insort(self._vocab, token)
+            postings.add(product_id)
+
+    def _remove(self, product_id: int) -> None:
+        doc = self._docs.pop(product_id, None)
+        if doc is None:
+            return
+
+        for token in doc[0] | doc[1]:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.discard(product_id)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocab, token)
+                if index < len(self._vocab) and self._vocab[index] == token:
+                    del self._vocab[index]
+
+
+def _latest_change(db: Session) -> Optional[datetime]:
+    created, updated = db.query(func.max(Product.created_at), func.max(Product.updated_at)).one()
+    return max((value for value in (created, updated) if value is not None), default=None)
+
+
+search_index = ProductSearchIndex()
@@ -0,0 +1,190 @@
+"""
+Slug allocation for products and categories.
+
+A name's slug is its "base"; when that is taken the row gets the next
+numeric suffix, ``base-2``, ``base-3``, ... One aggregate query per name
+reads whether the base is taken, under the column's collation, and the
+highest numeric suffix in use, from range scans on the unique slug index
+that skip longer names sharing the prefix (``base-galaxy-5``). Cost
+depends on how many rows carry the name, not on the size of the table,
+and it is always one query.
+
+Allocation is optimistic: two requests can pick the same free slug. The
+loser's commit hits the unique constraint and ``commit_with_slug`` rolls
+back and retries with a fresh allocation.
+"""
+
+import re
+import unicodedata
+from typing import Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import Integer, and_, case, cast, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+SLUG_ATTEMPTS = 5
+# Families per query in bulk mode
+BULK_FAMILIES_PER_QUERY = 500
+# Room kept at the end of the column for "-<n>"
+_SUFFIX_ROOM = 8
+_FALLBACK = "item"
+
+
+def generate_slug(name: str) -> str:
+    """Generate URL-friendly slug from name."""
+    slug = name.lower()
+    slug = re.sub(r'[^\w\s-]', '', slug)
+    slug = re.sub(r'[-\s]+', '-', slug)
+    return slug.strip('-')
+
+
+def slug_base(model, text: str) -> str:
+    limit = model.__table__.c.slug.type.length
+    return generate_slug(text)[:limit - _SUFFIX_ROOM].strip("-") or _FALLBACK
+
+
+def _family(model, base: str) -> ColumnElement:
+    # base itself and "base-" followed by a digit: "-" sorts before the
+    # characters slugs are made of, and digits before lowercase letters, in
+    # both binary and the MySQL collations. Longer names sharing the prefix
+    # ("base-galaxy-5") stay outside the range.
+    return and_(model.slug >= base, model.slug < base + "-a")
+
+
+def _family_stats(model, base: str):
+    """One row: whether ``base`` itself is taken and the highest suffix of
+    a ``base-<n>`` slug.
+
+    Both are worked out in SQL, so under MySQL's case- and accent-insensitive
+    collation "sóz" counts as taking "soz", as it does for the unique index.
+
+    Tails in the range that are not a number ("5g-pro") cast to their
+    leading digits on SQLite and MySQL. Every ``base-n`` casts to exactly
+    n, so the maximum is never below the highest real suffix and the
+    number after it is free.
+    """
+    return select(
+        func.max(case((model.slug == base, 1), else_=0)).label("base_taken"),
+        func.max(cast(func.substr(model.slug, len(base) + 2), Integer)).label("highest"),
+    ).where(_family(model, base))
+
+
+def _suffix(slug: str, base: str) -> Optional[int]:
+    """n if ``slug`` is ``base-n``, else None."""
+    tail = slug[len(base) + 1:]
+    if slug.startswith(base + "-") and tail.isdigit():
+        return int(tail)
+    return None
+
+
+def _in_family(slug: str, base: str) -> bool:
+    return slug == base or _suffix(slug, base) is not None
+
+
+def _fold(slug: str) -> str:
+    """Case- and accent-folded ``slug``: slugs the MySQL collation
+    (utf8mb4_unicode_ci) treats as equal fold to the same key."""
+    decomposed = unicodedata.normalize("NFKD", slug)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+class _Family:
+    """Free slugs of one base, handed out in order."""
+
+    def __init__(self, base: str, base_taken: bool = False, highest: Optional[int] = None):
+        self.base = base
+        self.base_taken = base_taken
+        self.highest = max(highest or 0, 1)
+
+    def add(self, slug: str) -> None:
+        if slug == self.base:
+            self.base_taken = True
+            return
+        suffix = _suffix(slug, self.base)
+        if suffix is not None:
+            self.highest = max(self.highest, suffix)
+
+    def next(self, base: Optional[str] = None) -> str:
+        """Next free slug, spelled with ``base`` (default: the family's)."""
+        base = base or self.base
+        if not self.base_taken:
+            self.base_taken = True
+            return base
+        self.highest += 1
+        return f"{base}-{self.highest}"
+
+
+def allocate_slug(db: Session, model, text: str, current: Optional[str] = None) -> str:
+    """Free slug for ``text`` in ``model``'s table.
+
+    ``current`` is the row's existing slug on updates; it is kept when it
+    already belongs to the new name's family.
+    """
+    base = slug_base(model, text)
+    if current is not None and _in_family(current, base):
+        return current
+
+    base_taken, highest = db.execute(_family_stats(model, base)).one()
+    return _Family(base, bool(base_taken), highest).next()
+
+
+def allocate_slugs(db: Session, model, texts: Iterable[str]) -> List[str]:
+    """Bulk mode: distinct free slugs for several new rows, in order.
+
+    Repeated names within ``texts`` get consecutive suffixes. One query
+    per BULK_FAMILIES_PER_QUERY distinct names, reading the families' slugs:
+    cheaper than an aggregate per name when there are many names.
+
+    Slugs are matched to families by their ``_fold`` key, so names the
+    MySQL collation treats as equal ("sóz", "soz") share one family. On a
+    binary collation that only costs an unneeded suffix.
+    """
+    bases = [slug_base(model, text) for text in texts]
+    keys = [_fold(base) for base in bases]
+    families: Dict[str, _Family] = {key: _Family(key) for key in keys}
+
+    distinct = list(dict.fromkeys(bases))
+    for start in range(0, len(distinct), BULK_FAMILIES_PER_QUERY):
+        part = distinct[start:start + BULK_FAMILIES_PER_QUERY]
+        for (slug,) in db.query(model.slug).filter(or_(*(_family(model, base) for base in part))):
+            # A slug can fall in several families' ranges ("a-2" is in "a"'s and "a-2"'s)
+            key = _fold(slug)
+            if key in families:
+                families[key].add(key)
+            prefix, _, tail = key.rpartition("-")
+            if tail.isdigit() and prefix in families:
+                families[prefix].add(key)
+
+    return [families[key].next(base) for key, base in zip(keys, bases)]
+
+
+def _taken(db: Session, model, slug: str) -> bool:
+    return db.query(model.id).filter(model.slug == slug).first() is not None
+
+
+def commit_with_slug(
+    db: Session,
+    model,
+    text: str,
+    stage: Callable[[str], object],
+    current: Optional[str] = None
+):
+    """Allocate a slug for ``text``, stage the write and commit it.
+
+    ``stage(slug)`` applies every pending change of the write (adding the
+    instance if new) and returns the instance; it runs again after a
+    rollback, so it must not rely on earlier attempts. If the commit fails
+    because another request took the slug meanwhile, retries with the next
+    free one. Other integrity errors are re-raised.
+    """
+    for attempt in range(SLUG_ATTEMPTS):
+        slug = allocate_slug(db, model, text, current)
+        try:
+            instance = stage(slug)
+            db.commit()
+            return instance
+        except IntegrityError:
+            db.rollback()
+            if attempt == SLUG_ATTEMPTS - 1 or slug == current or not _taken(db, model, slug):
+                raise
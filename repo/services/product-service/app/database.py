@@ -1,16 +1,78 @@
-from sqlalchemy import create_engine
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from starlette.concurrency import run_in_threadpool
 from .config import settings
+from .metrics import MeteredAsyncQueuePool, MeteredQueuePool, PoolMetrics, pool_metrics
+from . import query_log, request_metrics
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=settings.DEBUG
-)
+
+def pool_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+
+# Engine name -> Engine or AsyncEngine: "primary", "async", "replica-<n>"
+engines: Dict[str, object] = {}
+
+
+def _create_engine(url: str, name: str):
+    db_engine = create_engine(url, echo=settings.SQL_ECHO, **pool_options(MeteredQueuePool))
+    pool_metrics[name] = PoolMetrics(db_engine)
+    query_log.install(db_engine)
+    request_metrics.install(db_engine)
+    engines[name] = db_engine
+    return db_engine
+
+
+# asyncio drivers for the sync drivers we use
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: Optional[str] = None) -> str:
+    if url is None and settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = make_url(url or settings.DATABASE_URL)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername)).render_as_string(hide_password=False)
+
+
+def _create_async_engine(url: str, name: str):
+    db_engine = create_async_engine(url, echo=settings.SQL_ECHO, **pool_options(MeteredAsyncQueuePool))
+    pool_metrics[name] = PoolMetrics(db_engine.sync_engine)
+    query_log.install(db_engine.sync_engine)
+    request_metrics.install(db_engine.sync_engine)
+    engines[name] = db_engine
+    return db_engine
+
+
+engine = _create_engine(settings.DATABASE_URL, "primary")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_MODE == "async":
+    async_engine = _create_async_engine(async_database_url(), "async")
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
@@ -22,3 +84,247 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# ==========================================
+# Read replicas
+# ==========================================
+
+class ReplicaSet:
+    """Round-robin over replica session factories, skipping replicas that
+    failed within the last ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+        self._replicas = []
+        self._down_until = {}
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, name: str, session_factory) -> None:
+        self._replicas.append((name, session_factory))
+
+    def __len__(self) -> int:
+        return len(self._replicas)
+
+    def pick(self):
+        """Next healthy ``(name, session_factory)``, or None to use the primary."""
+        if not self._replicas:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            for _ in range(len(self._replicas)):
+                name, factory = self._replicas[next(self._next) % len(self._replicas)]
+                if self._down_until.get(name, 0) <= now:
+                    return name, factory
+        return None
+
+    def mark_down(self, name: str) -> None:
+        with self._lock:
+            self._down_until[name] = time.monotonic() + self.retry_after
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {name: self._down_until.get(name, 0) <= now for name, _ in self._replicas}
+
+
+def _create_replicas() -> ReplicaSet:
+    replica_set = ReplicaSet(settings.REPLICA_RETRY_AFTER)
+    urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+    for index, url in enumerate(urls):
+        name = f"replica-{index}"
+        if AsyncSessionLocal is not None:
+            factory = async_sessionmaker(
+                _create_async_engine(async_database_url(url), name), autoflush=False, expire_on_commit=False
+            )
+        else:
+            factory = sessionmaker(autocommit=False, autoflush=False, bind=_create_engine(url, name))
+        replica_set.add(name, factory)
+    return replica_set
+
+
+replicas = _create_replicas()
+
+
+# Read-your-writes: a client that just wrote reads from the primary for
+# READ_YOUR_WRITES_WINDOW seconds (cookie), or whenever it sends the header.
+READ_PRIMARY_HEADER = "X-Read-Your-Writes"
+READ_PRIMARY_COOKIE = "read_primary_until"
+
+# Per-request flag set when a primary session commits
+_request_wrote: ContextVar[Optional[dict]] = ContextVar("request_wrote", default=None)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _mark_write(session) -> None:
+    flag = _request_wrote.get()
+    if flag is not None:
+        flag["wrote"] = True
+
+
+class ReadYourWritesMiddleware:
+    """Sets the sticky-primary cookie on responses to requests that committed."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not len(replicas):
+            return await self.app(scope, receive, send)
+
+        flag = {"wrote": False}
+        token = _request_wrote.set(flag)
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and flag["wrote"]:
+                until = int(time.time()) + settings.READ_YOUR_WRITES_WINDOW
+                cookie = f"{READ_PRIMARY_COOKIE}={until}; Max-Age={settings.READ_YOUR_WRITES_WINDOW}; Path=/; HttpOnly"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _request_wrote.reset(token)
+
+
+def wants_primary(request: Request) -> bool:
+    """Whether the client asked (header) or was pinned (cookie) to read its
+    own writes from the primary."""
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    until = request.cookies.get(READ_PRIMARY_COOKIE)
+    return bool(until and until.isdigit() and int(until) > time.time())
+
+
+async def get_read_db(request: Request):
+    """Session for read-only routes. Pass it to ``run_db`` rather than using
+    it directly.
+
+    Comes from the next healthy read replica, or the primary when there are
+    none or the client needs to read its own writes. It is an AsyncSession
+    in async mode, else a regular Session.
+    """
+    replica = None if wants_primary(request) else replicas.pick()
+    if replica is not None:
+        name, factory = replica
+    else:
+        name, factory = None, AsyncSessionLocal or SessionLocal
+
+    db = factory()
+    db.info["replica"] = name
+    try:
+        yield db
+    finally:
+        await _close(db)
+
+
+async def _close(db) -> None:
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+
+async def _run(db, fn, *args, **kwargs):
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def run_db(db, fn, *args, **kwargs):
+    """Run sync ORM code ``fn(session, *args, **kwargs)`` without blocking
+    the event loop.
+
+    With an AsyncSession the same CRUD function runs on the asyncio driver
+    (``run_sync``); with a regular Session it runs in the threadpool, as a
+    sync route would. Results must not lazy-load outside ``fn``.
+
+    If ``db`` is a replica that cannot be reached, the replica is skipped
+    for REPLICA_RETRY_AFTER seconds and ``fn`` is retried on the primary.
+    """
+    try:
+        return await _run(db, fn, *args, **kwargs)
+    except DBAPIError as exc:
+        replica = db.info.get("replica")
+        if replica is None or not (isinstance(exc, OperationalError) or exc.connection_invalidated):
+            raise
+        replicas.mark_down(replica)
+
+    return await _run_on_new_primary(fn, *args, **kwargs)
+
+
+async def run_primary(db, fn, *args, **kwargs):
+    """Like ``run_db``, but always on the primary: ``db`` itself when it
+    is a primary session, else a new one.
+
+    For reads whose result outlives the request (cache fills), which must
+    not come from a replica that has not caught up yet.
+    """
+    if db.info.get("replica") is None:
+        return await _run(db, fn, *args, **kwargs)
+    return await _run_on_new_primary(fn, *args, **kwargs)
+
+
+async def _run_on_new_primary(fn, *args, **kwargs):
+    primary = (AsyncSessionLocal or SessionLocal)()
+    try:
+        return await _run(primary, fn, *args, **kwargs)
+    finally:
+        await _close(primary)
+
+
+# ==========================================
+# Startup warm-up and readiness
+# ==========================================
+
+def _warm_sync(db_engine, connections: int) -> None:
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(db_engine.connect())
+    finally:
+        for conn in opened:
+            conn.close()
+
+
+async def _warm_async(db_engine: AsyncEngine, connections: int) -> None:
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(await db_engine.connect())
+    finally:
+        for conn in opened:
+            await conn.close()
+
+
+async def warm_pools(connections: int) -> None:
+    """Open ``connections`` connections on every engine and return them to
+    the pool, so the first requests do not pay for connecting.
+
+    A replica that cannot be reached is marked down; the primary raises.
+    """
+    for name, db_engine in engines.items():
+        try:
+            if isinstance(db_engine, AsyncEngine):
+                await _warm_async(db_engine, connections)
+            else:
+                await run_in_threadpool(_warm_sync, db_engine, connections)
+        except DBAPIError:
+            if not name.startswith("replica-"):
+                raise
+            replicas.mark_down(name)
+
+
+def _ping(db_engine) -> None:
+    with db_engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
+async def ping_databases() -> None:
+    """``SELECT 1`` on the primary engines; raises DBAPIError if one is down."""
+    await run_in_threadpool(_ping, engine)
+    if async_engine is not None:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
@@ -0,0 +1,79 @@
+"""
+HTTP conditional requests: ETag / Last-Modified validators and 304s.
+
+Validators are computed from what is already at hand (a cached payload)
+or from the catalog version, one primary-key read, so a 304 costs no
+serialization and at most that query.
+"""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+
+from .config import settings
+
+
+def make_etag(*parts: str) -> str:
+    """Strong ETag over ``parts``."""
+    digest = hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _not_modified(request: Request, etag: str, last_modified: Optional[str]) -> bool:
+    # If-None-Match wins over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def validator_headers(route: str, etag: str, last_modified: Optional[str]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": settings.CACHE_CONTROL.get(route, "no-cache")}
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return headers
+
+
+def conditional(request: Request, route: str, etag: str, last_modified: Optional[str]):
+    """Return ``(not_modified_response, headers)``.
+
+    The response is a ready 304 when the client's copy is current, else
+    None and the caller sends the body with ``headers``.
+    """
+    headers = validator_headers(route, etag, last_modified)
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers), headers
+    return None, headers
+
+
+def catalog_validators(request: Request, version: Tuple[str, Optional[int]]):
+    """ETag and Last-Modified for a response that depends on the whole
+    catalog (lists, category tree): the catalog version, read through the
+    same session as the body, plus the URL.
+
+    Anything cached into such a response must be keyed by the same
+    ``version`` token, or another worker's write would pin the old body
+    under the new ETag.
+    """
+    token, changed_at = version
+    etag = make_etag(token, request.url.path, request.url.query)
+    if changed_at is None:
+        return etag, None
+    return etag, http_date(datetime.fromtimestamp(changed_at, timezone.utc))
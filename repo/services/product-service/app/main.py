@@ -1,19 +1,92 @@
-from fastapi import FastAPI
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import DBAPIError
+from starlette.concurrency import run_in_threadpool
 
+from .background import (
+    catalog_version_bumper, hold_sweeper, search_index_refresher, view_count_flusher, flush_view_counts
+)
+from .cache import catalog_version
 from .config import settings
-from .database import engine, Base
-from .routers import category_router, product_router
+from .database import async_engine, replicas, SessionLocal, ReadYourWritesMiddleware, ping_databases, warm_pools
+from .crud.category import get_category_tree_json
+from .metrics import pool_metrics, route_metrics
+from .query_log import RouteContextMiddleware, query_stats
+from .request_metrics import RequestMetricsMiddleware
+from .crud.search_index import search_index
+from .routers import category_router, product_router, reservation_router
+
+logger = logging.getLogger(__name__)
+
+# Tables are managed by Alembic: run `alembic upgrade head` before starting
+# the service, once per deploy rather than in every worker.
+
+# Filled in by lifespan; served by GET /ready
+startup_report = {"ready": False, "startup_ms": None, "steps_ms": {}}
+
+
+def _with_session(fn):
+    db = SessionLocal()
+    try:
+        return fn(db)
+    finally:
+        db.close()
+
+
+def _build_search_index():
+    if settings.SEARCH_BACKEND == "memory":
+        _with_session(search_index.build)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    steps = startup_report["steps_ms"]
+
+    async def step(name, fn, *args):
+        step_started = time.perf_counter()
+        await fn(*args)
+        steps[name] = round((time.perf_counter() - step_started) * 1000, 1)
+
+    await step("warm_pools", warm_pools, min(settings.DB_POOL_WARM_CONNECTIONS, settings.DB_POOL_SIZE))
+    await step("category_tree", run_in_threadpool, _with_session, get_category_tree_json)
+    await step("search_index", run_in_threadpool, _build_search_index)
+    hold_sweeper.start()
+    view_count_flusher.start()
+    catalog_version_bumper.start()
+    if settings.SEARCH_BACKEND == "memory":
+        search_index_refresher.start()
+
+    startup_report["startup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup_report["ready"] = True
+    logger.info("%s ready in %.1f ms %s", settings.SERVICE_NAME, startup_report["startup_ms"], steps)
+    try:
+        yield
+    finally:
+        startup_report["ready"] = False
+        hold_sweeper.stop()
+        view_count_flusher.stop()
+        search_index_refresher.stop()
+        catalog_version_bumper.stop()
+        catalog_version.flush()
+        # Don't lose views buffered since the last flush
+        flush_view_counts()
+        if async_engine is not None:
+            await async_engine.dispose()
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Product Service",
     description="E-Commerce Product Management API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS
@@ -24,16 +97,72 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Lets the slow-query log attribute statements to routes
+app.add_middleware(RouteContextMiddleware)
+# Sends clients that just wrote to the primary for their next reads
+app.add_middleware(ReadYourWritesMiddleware)
+# Query count, DB time and rows per request; outermost so it times everything
+app.add_middleware(RequestMetricsMiddleware)
 
 
 @app.get("/health")
 def health_check():
+    """Liveness: the process is serving. Does not touch the database."""
     return {"status": "ok", "service": settings.SERVICE_NAME}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness: startup finished and the primary database answers."""
+    if not startup_report["ready"]:
+        return JSONResponse(status_code=503, content={"status": "starting", "service": settings.SERVICE_NAME})
+    try:
+        await ping_databases()
+    except DBAPIError as exc:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unavailable", "service": settings.SERVICE_NAME, "error": str(exc.orig)}
+        )
+    return {
+        "status": "ready",
+        "service": settings.SERVICE_NAME,
+        "startup_ms": startup_report["startup_ms"],
+        "steps_ms": startup_report["steps_ms"],
+        "replicas": replicas.status(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Per-route request, DB time, statement and row histograms (Prometheus text format)."""
+    return PlainTextResponse(route_metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/metrics/db")
+def db_metrics():
+    """Connection pool usage per engine, for sizing DB_POOL_SIZE/DB_MAX_OVERFLOW."""
+    report = {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    for name, healthy in replicas.status().items():
+        report[name]["healthy"] = healthy
+    return report
+
+
+@app.get("/metrics/queries")
+def query_metrics(
+    limit: int = Query(default=settings.SLOW_QUERY_TOP_N, ge=1, le=200),
+    reset: bool = Query(default=False, description="Clear the aggregates after reading")
+):
+    """Statement fingerprints with the most total execution time in this worker."""
+    report = query_stats.top(limit)
+    if reset:
+        query_stats.reset()
+    return report
+
+
 # Include routers
 app.include_router(category_router)
 app.include_router(product_router)
+app.include_router(reservation_router)
 
 
 if __name__ == "__main__":
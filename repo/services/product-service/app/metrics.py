@@ -0,0 +1,224 @@
+"""
+In-process metrics: latency histograms, per-route request histograms and
+connection pool statistics.
+
+Counters are per worker process; scrape every worker (or run one) to get
+the full picture.
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Seconds; fine at the low end where healthy checkouts land
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30
+)
+# Statements per request; more than a handful on a read route is an N+1
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+class Histogram:
+    """Thread-safe fixed-bucket histogram."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> dict:
+        """Cumulative counts per upper bound, Prometheus style."""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        buckets = {}
+        running = 0
+        for bound, count in zip(self.buckets + ("+Inf",), counts):
+            running += count
+            buckets[str(bound)] = running
+        return {"buckets": buckets, "sum": round(total, 6), "count": running}
+
+
+class PoolMetrics:
+    """Checkout waits and connection lifecycle counts for one engine's pool."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checkout_wait = Histogram()
+        self._counters = {
+            "connects": 0,
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "invalidations": 0,
+            "soft_invalidations": 0,
+        }
+        self._lock = threading.Lock()
+
+        engine.pool.metrics = self
+        event.listen(engine, "connect", lambda *args: self.increment("connects"))
+        event.listen(engine, "checkout", lambda *args: self.increment("checkouts"))
+        event.listen(engine, "invalidate", lambda *args: self.increment("invalidations"))
+        event.listen(engine, "soft_invalidate", lambda *args: self.increment("soft_invalidations"))
+
+    def increment(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self) -> dict:
+        pool = self.engine.pool
+        with self._lock:
+            counters = dict(self._counters)
+        stats = {}
+        if isinstance(pool, QueuePool):
+            stats = {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                # Negative while the pool has not filled up to ``size``
+                "overflow": max(pool.overflow(), 0),
+            }
+        return {
+            "pool": type(pool).__name__,
+            **stats,
+            **counters,
+            "checkout_wait_seconds": self.checkout_wait.snapshot(),
+        }
+
+
+class _MeteredPoolMixin:
+    """Times ``connect()``: queue wait, plus opening or pre-pinging the
+    connection when that happens during checkout."""
+
+    metrics: Optional[PoolMetrics] = None
+
+    def connect(self):
+        if self.metrics is None:
+            return super().connect()
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.metrics.increment("checkout_timeouts")
+            raise
+        finally:
+            self.metrics.checkout_wait.observe(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class MeteredQueuePool(_MeteredPoolMixin, QueuePool):
+    pass
+
+
+class MeteredAsyncQueuePool(_MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+# Engine name -> metrics, filled in by database.py
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    escaped = (
+        (name, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in labels.items()
+    )
+    return ",".join(f'{name}="{value}"' for name, value in escaped)
+
+
+def _histogram_lines(name: str, series: Iterable[Tuple[Dict[str, str], Histogram]]) -> list:
+    lines = []
+    for labels, histogram in series:
+        snapshot = histogram.snapshot()
+        for bound, count in snapshot["buckets"].items():
+            lines.append(f"{name}_bucket{{{_labels({**labels, 'le': bound})}}} {count}")
+        lines.append(f"{name}_sum{{{_labels(labels)}}} {snapshot['sum']}")
+        lines.append(f"{name}_count{{{_labels(labels)}}} {snapshot['count']}")
+    return lines
+
+
+class _RouteSeries:
+    __slots__ = ("duration", "db_time", "queries", "rows", "statuses")
+
+    def __init__(self):
+        self.duration = Histogram()
+        self.db_time = Histogram()
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.rows = Histogram(ROW_BUCKETS)
+        self.statuses: Dict[int, int] = {}
+
+
+class RouteMetrics:
+    """Request latency, DB time, statement and row histograms per route,
+    rendered in the Prometheus text format."""
+
+    # name, help, _RouteSeries attribute
+    HISTOGRAMS = (
+        ("http_request_duration_seconds", "Request latency", "duration"),
+        ("http_request_db_seconds", "Time spent executing SQL per request", "db_time"),
+        ("http_request_db_queries", "SQL statements per request", "queries"),
+        ("http_request_db_rows", "Rows returned or affected per request, as reported by the driver", "rows"),
+    )
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _RouteSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        method: str,
+        route: str,
+        status: int,
+        duration: float,
+        db_seconds: float,
+        queries: int,
+        rows: int
+    ) -> None:
+        key = (method, route)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(key, _RouteSeries())
+        series.duration.observe(duration)
+        series.db_time.observe(db_seconds)
+        series.queries.observe(queries)
+        series.rows.observe(rows)
+        with self._lock:
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        with self._lock:
+            items = sorted(self._series.items())
+            statuses = [(key, dict(series.statuses)) for key, series in items]
+
+        lines = ["# HELP http_requests_total Requests by route and status", "# TYPE http_requests_total counter"]
+        for (method, route), counts in statuses:
+            for status, count in sorted(counts.items()):
+                lines.append(f"http_requests_total{{{_labels({'method': method, 'route': route, 'status': status})}}} {count}")
+        for name, help_text, attribute in self.HISTOGRAMS:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            lines.extend(_histogram_lines(name, (
+                ({"method": method, "route": route}, getattr(series, attribute)) for (method, route), series in items
+            )))
+        return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
@@ -1,3 +1,3 @@
-from .product import Category, Product, ProductReview
+from .product import CatalogState, Category, Product, ProductReview, StockReservation
 
-__all__ = ["Category", "Product", "ProductReview"]
+__all__ = ["CatalogState", "Category", "Product", "ProductReview", "StockReservation"]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DECIMAL, Boolean, DateTime, ForeignKey, JSON
+from sqlalchemy import BigInteger, Column, Integer, String, Text, DECIMAL, Boolean, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..database import Base
@@ -13,6 +13,7 @@ class Category(Base):
     description = Column(Text, nullable=True)
     image = Column(String(255), nullable=True)
     parent_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    path = Column(String(512), nullable=True, index=True)  # Ancestor ids down to this one, e.g. "/1/5/12/"
     is_active = Column(Boolean, default=True)
     sort_order = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -36,8 +37,9 @@ class Product(Base):
     compare_price = Column(DECIMAL(12, 2), nullable=True)  # Original price for discounts
     cost_price = Column(DECIMAL(12, 2), nullable=True)
     stock = Column(Integer, default=0)
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")  # Held by open reservations
     low_stock_threshold = Column(Integer, default=5)
-    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=True, index=True)
     seller_id = Column(String(36), nullable=False, index=True)  # UUID from User Service
     brand = Column(String(100), nullable=True, index=True)
     images = Column(JSON, default=list)  # Array of image URLs
@@ -45,15 +47,36 @@ class Product(Base):
     is_active = Column(Boolean, default=True)
     is_featured = Column(Boolean, default=False)
     rating = Column(DECIMAL(2, 1), default=0)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")  # Sum of approved review ratings
     review_count = Column(Integer, default=0)
     sold_count = Column(Integer, default=0)
     view_count = Column(Integer, default=0)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Indexed for the search index's incremental refresh
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     # Relationships
     category = relationship("Category", back_populates="products")
 
+    # Composite indexes for keyset pagination: (is_active, sort key, id)
+    __table_args__ = (
+        Index("ix_products_active_created_at_id", "is_active", "created_at", "id"),
+        Index("ix_products_active_price_id", "is_active", "price", "id"),
+        Index("ix_products_active_rating_id", "is_active", "rating", "id"),
+        Index("ix_products_active_sold_count_id", "is_active", "sold_count", "id"),
+        Index("ix_products_active_name_id", "is_active", "name", "id"),
+        # Full-text search (MySQL only; must list the same columns as MATCH)
+        Index(
+            "ft_products_search", "name", "description", "sku",
+            mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+    )
+
+    @property
+    def available_stock(self) -> int:
+        """Sellable quantity: physical stock minus open reservation holds."""
+        return max((self.stock or 0) - (self.reserved or 0), 0)
+
 
 class ProductReview(Base):
     __tablename__ = "product_reviews"
@@ -73,3 +96,31 @@ class ProductReview(Base):
 
     # Relationships
     product = relationship("Product")
+
+
+class StockReservation(Base):
+    __tablename__ = "stock_reservations"
+
+    id = Column(Integer, primary_key=True, index=True)
+    hold_id = Column(String(36), nullable=False, index=True)  # Groups the items of one hold
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default="held")  # held, committed, released, expired
+    order_ref = Column(String(64), nullable=True)
+    expires_at = Column(DateTime, nullable=False)  # UTC
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        # Sweeper scans held rows by expiry
+        Index("ix_stock_reservations_status_expires_at", "status", "expires_at"),
+    )
+
+
+class CatalogState(Base):
+    """Single row (id 1) counting catalog writes; backs list/tree ETags."""
+    __tablename__ = "catalog_state"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    changed_at = Column(BigInteger, nullable=False, default=0)  # Unix timestamp
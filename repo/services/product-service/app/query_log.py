@@ -0,0 +1,160 @@
+"""
+Slow-query log and per-statement timing aggregates.
+
+Statements are timed with cursor events, grouped by a normalized
+fingerprint (literals and IN lists collapsed) and attributed to the route
+that issued them. Statements slower than SLOW_QUERY_THRESHOLD_MS are
+logged as JSON; all timed statements feed the top-N report.
+"""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# ASGI scope of the request being served; routing fills in scope["route"]
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\(([^()]*)\)(?:\s*,\s*\(\1\))+", re.IGNORECASE)
+_SPACE = re.compile(r"\s+")
+
+MAX_FINGERPRINTS = 1000
+MAX_ROUTES_PER_FINGERPRINT = 10
+
+
+# Compiled statements repeat, so normalizing each distinct string once is enough
+@lru_cache(maxsize=4096)
+def fingerprint(statement: str) -> str:
+    """Normalize a statement so executions differing only in values group together."""
+    text = _STRING.sub("?", statement)
+    text = _NUMBER.sub("?", text)
+    text = _PARAM.sub("?", text)
+    text = _IN_LIST.sub("IN (...)", text)
+    text = _VALUES_LIST.sub(r"VALUES (\1), ...", text)
+    return _SPACE.sub(" ", text).strip()
+
+
+def current_route() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope.get('method')} {route.path if route else scope.get('path')}"
+
+
+class RouteContextMiddleware:
+    """Makes the current request visible to cursor events."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        token = _request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_scope.reset(token)
+
+
+class QueryStats:
+    """Per-fingerprint execution count, total and max time, and top routes."""
+
+    def __init__(self):
+        self._stats = {}
+        self._dropped = 0
+        self._lock = threading.Lock()
+
+    def record(self, key: str, route: str, seconds: float) -> None:
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    self._dropped += 1
+                    return
+                entry = self._stats[key] = {"count": 0, "total": 0.0, "max": 0.0, "routes": Counter()}
+            entry["count"] += 1
+            entry["total"] += seconds
+            entry["max"] = max(entry["max"], seconds)
+            if route in entry["routes"] or len(entry["routes"]) < MAX_ROUTES_PER_FINGERPRINT:
+                entry["routes"][route] += 1
+
+    def top(self, limit: int) -> dict:
+        with self._lock:
+            entries = sorted(self._stats.items(), key=lambda item: item[1]["total"], reverse=True)[:limit]
+            items = [
+                {
+                    "fingerprint": key,
+                    "count": entry["count"],
+                    "total_ms": round(entry["total"] * 1000, 3),
+                    "mean_ms": round(entry["total"] * 1000 / entry["count"], 3),
+                    "max_ms": round(entry["max"] * 1000, 3),
+                    "routes": dict(entry["routes"].most_common()),
+                }
+                for key, entry in entries
+            ]
+            return {
+                "sample_rate": settings.SLOW_QUERY_SAMPLE_RATE,
+                "fingerprints": len(self._stats),
+                "dropped": self._dropped,
+                "items": items,
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._dropped = 0
+
+
+query_stats = QueryStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is None:
+        return
+    if settings.SLOW_QUERY_SAMPLE_RATE >= 1 or random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    key = fingerprint(statement)
+    route = current_route()
+    query_stats.record(key, route, seconds)
+
+    if seconds * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(seconds * 1000, 3),
+            "fingerprint": key,
+            "route": route,
+            "executemany": executemany,
+        }))
+
+
+def install(engine) -> None:
+    """Time every (sampled) statement on ``engine``; no-op when disabled."""
+    if settings.SLOW_QUERY_SAMPLE_RATE <= 0:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
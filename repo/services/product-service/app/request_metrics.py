@@ -0,0 +1,121 @@
+"""
+Per-request database instrumentation.
+
+Cursor events add every statement's count, execution time and row count
+to the request that issued it. When the response starts, the totals go
+out in a ``Server-Timing`` header; when it ends, they are logged as one
+JSON line and fed into per-route histograms served by GET /metrics.
+
+Rows are what the driver reports in ``cursor.rowcount``: rows returned by
+a SELECT on the MySQL drivers (their cursors buffer results) and rows
+affected by writes everywhere. SQLite does not count SELECT rows.
+"""
+
+import json
+import logging
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+
+from .config import settings
+from .metrics import route_metrics
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """Database totals of one request. Statements of one request run one
+    at a time, so no lock."""
+
+    __slots__ = ("queries", "db_seconds", "rows")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.rows = 0
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _request_stats.get() is not None:
+        context._request_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _request_stats.get()
+    started = getattr(context, "_request_started", None)
+    if stats is None or started is None:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - started
+    if cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def install(engine) -> None:
+    """Attribute statements on ``engine`` to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _route(scope: dict) -> str:
+    # Route templates, not raw paths, keep the label set bounded
+    route = scope.get("route")
+    return route.path if route is not None else UNMATCHED_ROUTE
+
+
+def server_timing(stats: RequestStats, app_seconds: float) -> str:
+    return (
+        f"app;dur={app_seconds * 1000:.1f}, "
+        f"db;dur={stats.db_seconds * 1000:.1f};desc=\"queries={stats.queries} rows={stats.rows}\""
+    )
+
+
+class RequestMetricsMiddleware:
+    """Collects RequestStats for each HTTP request and reports them."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    header = server_timing(stats, time.perf_counter() - started)
+                    message["headers"] = list(message.get("headers", [])) + [(b"server-timing", header.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_stats.reset(token)
+            # Includes background tasks, which run after the response is sent
+            duration = time.perf_counter() - started
+            route = _route(scope)
+            route_metrics.observe(scope["method"], route, status, duration, stats.db_seconds, stats.queries, stats.rows)
+            logger.info(json.dumps({
+                "event": "request",
+                "method": scope["method"],
+                "route": route,
+                "status": status,
+                "duration_ms": round(duration * 1000, 3),
+                "db_ms": round(stats.db_seconds * 1000, 3),
+                "queries": stats.queries,
+                "rows": stats.rows,
+            }))
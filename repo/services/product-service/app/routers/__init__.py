@@ -1,4 +1,5 @@
 from .category import router as category_router
 from .product import router as product_router
+from .reservation import router as reservation_router
 
-__all__ = ["category_router", "product_router"]
+__all__ = ["category_router", "product_router", "reservation_router"]
@@ -1,50 +1,72 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from ..database import get_db
+from ..cache import catalog_version
+from ..database import get_db, get_read_db, run_db, run_primary
+from ..http_cache import catalog_validators, conditional, validator_headers
 from ..crud import category as category_crud
 from ..schemas import (
-    CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithSubcategories
+    CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithSubcategories, CategoryListAdapter
 )
 
 router = APIRouter(prefix="/api/categories", tags=["Categories"])
 
 
 @router.get("", response_model=List[CategoryResponse])
-def get_categories(
+async def get_categories(
+    request: Request,
     parent_id: Optional[int] = None,
     is_active: Optional[bool] = True,
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=100),
-    db: Session = Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Get all categories with optional filtering."""
-    categories = category_crud.get_categories(
-        db, skip=skip, limit=limit, parent_id=parent_id, is_active=is_active
+    version = await run_db(db, catalog_version.get)
+    etag, last_modified = catalog_validators(request, version)
+    not_modified, headers = conditional(request, "category_list", etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    categories = await run_db(
+        db, category_crud.get_categories, skip=skip, limit=limit, parent_id=parent_id, is_active=is_active
     )
-    return categories
+    payload = CategoryListAdapter.dump_json(CategoryListAdapter.validate_python(categories))
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.get("/tree", response_model=List[CategoryWithSubcategories])
-def get_category_tree(db: Session = Depends(get_db)):
-    """Get category tree structure."""
-    return category_crud.get_category_tree(db)
+async def get_category_tree(request: Request, db=Depends(get_read_db)):
+    """Get the full category tree with subtree product counts."""
+    version = await run_db(db, catalog_version.get)
+    etag, last_modified = catalog_validators(request, version)
+    not_modified, headers = conditional(request, "category_tree", etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    payload = category_crud.cached_category_tree(version[0])
+    if payload is None:
+        # Built on the primary, so a lagging replica cannot cache an old tree;
+        # served under the version it was built from
+        version, payload = await run_primary(db, category_crud.get_category_tree_json)
+        headers = validator_headers("category_tree", *catalog_validators(request, version))
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(category_id: int, db: Session = Depends(get_db)):
+async def get_category(category_id: int, db=Depends(get_read_db)):
     """Get a specific category by ID."""
-    category = category_crud.get_category(db, category_id)
+    category = await run_db(db, category_crud.get_category, category_id)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
 
 
 @router.get("/slug/{slug}", response_model=CategoryResponse)
-def get_category_by_slug(slug: str, db: Session = Depends(get_db)):
+async def get_category_by_slug(slug: str, db=Depends(get_read_db)):
     """Get a specific category by slug."""
-    category = category_crud.get_category_by_slug(db, slug)
+    category = await run_db(db, category_crud.get_category_by_slug, slug)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     return category
@@ -68,7 +90,10 @@ def update_category(
     # TODO: Add admin authentication
 ):
     """Update a category (Admin only)."""
-    updated = category_crud.update_category(db, category_id, category)
+    try:
+        updated = category_crud.update_category(db, category_id, category)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     if not updated:
         raise HTTPException(status_code=404, detail="Category not found")
     return updated
@@ -1,93 +1,312 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Header
+import io
+import json
+import tempfile
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 from decimal import Decimal
 
-from ..database import get_db
+from ..background import flush_view_counts
+from ..cache import RedisCache, catalog_version, product_cache
+from ..config import settings
+from ..database import get_db, get_read_db, run_db, run_primary, wants_primary
+from ..http_cache import catalog_validators, conditional, http_date, make_etag
 from ..crud import product as product_crud
+from ..crud import product_import
 from ..schemas import (
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
-    ReviewCreate, ReviewResponse, PaginatedResponse
+    ProductBatchRequest, ProductBatchResponse, ProductImportResponse,
+    BulkStockRequest, BulkStockResponse,
+    ReviewCreate, ReviewResponse, ProductPage, ReviewPage, ProductListAdapter
 )
 
 router = APIRouter(prefix="/api/products", tags=["Products"])
 
+# Import bodies larger than this are spooled to a temp file
+IMPORT_SPOOL_SIZE = 1024 * 1024
 
-@router.get("", response_model=PaginatedResponse)
-def get_products(
+
+@router.get("", response_model=ProductPage)
+async def get_products(
+    request: Request,
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1, le=100),
     category_id: Optional[int] = None,
+    include_descendants: bool = Query(default=False, description="Also match products in subcategories of category_id"),
     brand: Optional[str] = None,
     min_price: Optional[Decimal] = None,
     max_price: Optional[Decimal] = None,
     is_featured: Optional[bool] = None,
     search: Optional[str] = None,
-    sort_by: str = Query(default="created_at", regex="^(created_at|price|rating|sold_count|name)$"),
+    sort_by: str = Query(default="created_at", regex="^(created_at|price|rating|sold_count|name|relevance)$"),
     sort_order: str = Query(default="desc", regex="^(asc|desc)$"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(default=None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: bool = Query(default=True, description="Set to false to skip counting matching products"),
+    db=Depends(get_read_db)
 ):
-    """Get all products with filtering, search, and pagination."""
+    """Get all products with filtering, search, and pagination.
+
+    Pass ``next_cursor`` from the previous response as ``cursor`` for keyset
+    pagination; deep pages then cost the same as the first one.
+    ``sort_by=relevance`` ranks ``search`` matches and uses page-based
+    pagination only.
+    """
+    version = await run_db(db, catalog_version.get)
+    etag, last_modified = catalog_validators(request, version)
+    not_modified, headers = conditional(request, "product_list", etag, last_modified)
+    if not_modified:
+        return not_modified
+    
     skip = (page - 1) * limit
     
-    products, total = product_crud.get_products(
-        db,
-        skip=skip,
-        limit=limit,
-        category_id=category_id,
-        brand=brand,
-        min_price=min_price,
-        max_price=max_price,
-        is_featured=is_featured,
-        search=search,
-        sort_by=sort_by,
-        sort_order=sort_order
-    )
+    try:
+        products, total, total_type = await run_db(
+            db,
+            product_crud.get_products,
+            skip=skip,
+            limit=limit,
+            category_id=category_id,
+            brand=brand,
+            min_price=min_price,
+            max_price=max_price,
+            is_featured=is_featured,
+            search=search,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor,
+            include_total=include_total,
+            include_descendants=include_descendants,
+            catalog_token=version[0]
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    
+    next_cursor = None
+    if len(products) == limit and sort_by in product_crud.SORT_COLUMNS:
+        next_cursor = product_crud.encode_cursor(products[-1], sort_by, sort_order)
     
-    return {
+    result = ProductPage.model_validate({
         "items": products,
         "total": total,
         "page": page,
         "limit": limit,
-        "total_pages": (total + limit - 1) // limit
-    }
+        "total_pages": None if total is None else (total + limit - 1) // limit,
+        "total_type": total_type,
+        "next_cursor": next_cursor
+    })
+    return Response(content=result.model_dump_json(), media_type="application/json", headers=headers)
 
 
 @router.get("/featured", response_model=List[ProductListResponse])
-def get_featured_products(
+async def get_featured_products(
+    request: Request,
     limit: int = Query(default=10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Get featured products."""
-    products, _ = product_crud.get_products(
-        db, limit=limit, is_featured=True
+    version = await run_db(db, catalog_version.get)
+    etag, last_modified = catalog_validators(request, version)
+    not_modified, headers = conditional(request, "product_list", etag, last_modified)
+    if not_modified:
+        return not_modified
+    
+    products, _, _ = await run_db(
+        db, product_crud.get_products, limit=limit, is_featured=True, include_total=False
+    )
+    payload = ProductListAdapter.dump_json(ProductListAdapter.validate_python(products))
+    return Response(content=payload, media_type="application/json", headers=headers)
+
+
+async def _batch_lookup(request: Request, db, ids: List[int]) -> Response:
+    ids = list(dict.fromkeys(ids))
+    if len(ids) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BATCH_SIZE} ids per batch"
+        )
+    
+    # Cached detail payloads first (same JSON as a batch item); one query for the rest
+    payloads = {}
+    if not wants_primary(request):
+        entries = await _off_loop(product_cache.get_many, [f"id:{product_id}" for product_id in ids])
+        payloads = {
+            product_id: entry.split("\n", 2)[2]
+            for product_id, entry in zip(ids, entries) if entry is not None
+        }
+    misses = [product_id for product_id in ids if product_id not in payloads]
+    if misses:
+        for product in await run_db(db, product_crud.get_products_by_ids, misses):
+            payloads[product.id] = ProductResponse.model_validate(product).model_dump_json()
+    
+    items = ",".join(payloads[product_id] for product_id in ids if product_id in payloads)
+    missing = json.dumps([product_id for product_id in ids if product_id not in payloads])
+    return Response(content=f'{{"items":[{items}],"missing":{missing}}}', media_type="application/json")
+
+
+@router.get("/batch", response_model=ProductBatchResponse)
+async def get_products_batch(
+    request: Request,
+    ids: str = Query(..., description="Comma-separated product ids, e.g. 1,2,3"),
+    db=Depends(get_read_db)
+):
+    """Get several products by id (for Order/Cart Services).
+
+    Products in the product cache are served from it, the rest come from
+    one query. Products come back in request order; unknown ids are listed
+    in ``missing``. View counts are not touched, so this is also the lookup
+    for a single product that is not a page view.
+    """
+    try:
+        product_ids = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if not product_ids:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    
+    return await _batch_lookup(request, db, product_ids)
+
+
+@router.post("/batch", response_model=ProductBatchResponse)
+async def post_products_batch(body: ProductBatchRequest, request: Request, db=Depends(get_read_db)):
+    """Same as GET /batch, with the ids in the request body."""
+    return await _batch_lookup(request, db, body.ids)
+
+
+@router.post("/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    fmt: str = Query(default="ndjson", alias="format", regex="^(ndjson|csv)$"),
+    x_user_id: str = Header(..., alias="X-User-Id"),
+    x_user_role: str = Header(default="USER", alias="X-User-Role"),
+    db: Session = Depends(get_db)
+):
+    """Create or update products in bulk, matched by SKU (Seller/Admin).
+
+    The body is NDJSON (one ProductCreate object per line) or CSV with a
+    header row; ``category_slug`` may replace ``category_id``. Rows that
+    fail are listed in ``errors`` with their line number and the rest are
+    still imported. Sellers can only update their own SKUs.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_SIZE) as spool:
+        async for chunk in request.stream():
+            spool.write(chunk)
+        spool.seek(0)
+        text = io.TextIOWrapper(spool, encoding="utf-8", errors="replace", newline="")
+        return await run_in_threadpool(
+            product_import.import_products, db, text, fmt, x_user_id,
+            update_any=x_user_role == "ADMIN"
+        )
+
+
+@router.post("/stock/bulk", response_model=BulkStockResponse)
+def bulk_update_stock(request: BulkStockRequest, db: Session = Depends(get_db)):
+    """Reserve or restock several products atomically (for Order Service).
+
+    Either every adjustment is applied or none is; on failure responds 409
+    with per-item statuses.
+    """
+    if len(request.items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BATCH_SIZE} items per batch"
+        )
+    
+    success, results = product_crud.bulk_update_stock(
+        db, [(item.product_id, item.quantity) for item in request.items]
     )
-    return products
+    if not success:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Stock not updated", "items": results}
+        )
+    return {"success": True, "items": results}
+
+
+def _count_view(product_id: int, background_tasks: BackgroundTasks) -> None:
+    # Buffered; flushed periodically, or after this response if the buffer is full
+    if product_crud.increment_view_count(product_id):
+        background_tasks.add_task(flush_view_counts)
+
+
+async def _off_loop(func, *args):
+    # Redis is a network round trip; keep it off the event loop
+    if isinstance(product_cache, RedisCache):
+        return await run_in_threadpool(func, *args)
+    return func(*args)
+
+
+async def _cached_entry(request: Request, key: str) -> Optional[str]:
+    # Clients reading their own writes skip entries another worker may
+    # still hold from before the write
+    if wants_primary(request):
+        return None
+    return await _off_loop(product_cache.get, key)
+
+
+def _cache_product(product) -> str:
+    # Cached as "<etag>\n<last-modified>\n<json>" so revalidation needs no parsing
+    payload = ProductResponse.model_validate(product).model_dump_json()
+    modified = product.updated_at or product.created_at
+    entry = f"{make_etag(payload)}\n{http_date(modified) if modified else ''}\n{payload}"
+    product_cache.set(f"id:{product.id}", entry)
+    product_cache.set(f"slug:{product.slug}", str(product.id))
+    return entry
+
+
+def _product_response(request: Request, entry: str) -> Response:
+    etag, last_modified, payload = entry.split("\n", 2)
+    not_modified, headers = conditional(request, "product_detail", etag, last_modified)
+    if not_modified:
+        return not_modified
+    return Response(content=payload, media_type="application/json", headers=headers)
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: int, db: Session = Depends(get_db)):
-    """Get a specific product by ID."""
-    product = product_crud.get_product(db, product_id)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+async def get_product(
+    product_id: int,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_read_db)
+):
+    """Get a specific product by ID.
+
+    Cache misses are read from the primary: a lagging replica would put the
+    pre-write row back into the cache after the write invalidated it.
+    """
+    entry = await _cached_entry(request, f"id:{product_id}")
+    if entry is None:
+        product = await run_primary(db, product_crud.get_product, product_id)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        entry = await _off_loop(_cache_product, product)
     
     # Increment view count
-    product_crud.increment_view_count(db, product_id)
+    _count_view(product_id, background_tasks)
     
-    return product
+    return _product_response(request, entry)
 
 
 @router.get("/slug/{slug}", response_model=ProductResponse)
-def get_product_by_slug(slug: str, db: Session = Depends(get_db)):
-    """Get a specific product by slug."""
-    product = product_crud.get_product_by_slug(db, slug)
-    if not product:
-        raise HTTPException(status_code=404, detail="Product not found")
+async def get_product_by_slug(
+    slug: str,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db=Depends(get_read_db)
+):
+    """Get a specific product by slug (cache misses as in ``get_product``)."""
+    product_id = await _cached_entry(request, f"slug:{slug}")
+    entry = await _cached_entry(request, f"id:{product_id}") if product_id else None
+    if entry is None:
+        product = await run_primary(db, product_crud.get_product_by_slug, slug)
+        if not product:
+            raise HTTPException(status_code=404, detail="Product not found")
+        product_id = product.id
+        entry = await _off_loop(_cache_product, product)
     
-    product_crud.increment_view_count(db, product.id)
+    _count_view(int(product_id), background_tasks)
     
-    return product
+    return _product_response(request, entry)
 
 
 @router.post("", response_model=ProductResponse, status_code=201)
@@ -116,7 +335,10 @@ def update_product(
     """Update a product (Owner or Admin)."""
     seller_id = None if x_user_role == "ADMIN" else x_user_id
     
-    updated = product_crud.update_product(db, product_id, product, seller_id)
+    try:
+        updated = product_crud.update_product(db, product_id, product, seller_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
     if not updated:
         raise HTTPException(status_code=404, detail="Product not found or access denied")
     return updated
@@ -148,36 +370,37 @@ def update_stock(
     updated = product_crud.update_stock(db, product_id, quantity)
     if not updated:
         raise HTTPException(status_code=400, detail="Product not found or insufficient stock")
-    return {"message": "Stock updated", "new_stock": updated.stock}
+    return {"message": "Stock updated", "new_stock": updated.available_stock}
 
 
 # ==========================================
 # Reviews
 # ==========================================
 
-@router.get("/{product_id}/reviews", response_model=PaginatedResponse)
-def get_product_reviews(
+@router.get("/{product_id}/reviews", response_model=ReviewPage)
+async def get_product_reviews(
     product_id: int,
     page: int = Query(default=1, ge=1),
     limit: int = Query(default=10, ge=1, le=50),
-    db: Session = Depends(get_db)
+    db=Depends(get_read_db)
 ):
     """Get reviews for a product."""
     # Verify product exists
-    product = product_crud.get_product(db, product_id)
+    product = await run_db(db, product_crud.get_product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     
     skip = (page - 1) * limit
-    reviews, total = product_crud.get_product_reviews(db, product_id, skip, limit)
+    reviews, total = await run_db(db, product_crud.get_product_reviews, product_id, skip, limit)
     
-    return {
+    result = ReviewPage.model_validate({
         "items": reviews,
         "total": total,
         "page": page,
         "limit": limit,
         "total_pages": (total + limit - 1) // limit
-    }
+    })
+    return Response(content=result.model_dump_json(), media_type="application/json")
 
 
 @router.post("/{product_id}/reviews", response_model=ReviewResponse, status_code=201)
@@ -197,3 +420,16 @@ def create_review(
     is_verified = False
     
     return product_crud.create_review(db, product_id, x_user_id, review, is_verified)
+
+
+@router.post("/ratings/recompute")
+def recompute_ratings(
+    x_user_role: str = Header(default="USER", alias="X-User-Role"),
+    db: Session = Depends(get_db)
+):
+    """Rebuild every product's rating aggregates from its reviews (Admin only)."""
+    if x_user_role != "ADMIN":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    reviewed = product_crud.recompute_rating_aggregates(db)
+    return {"message": "Ratings recomputed", "reviewed_products": reviewed}
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from ..config import settings
+from ..database import get_db
+from ..crud import reservation as reservation_crud
+from ..models import StockReservation
+from ..schemas import ReservationCreate, ReservationResponse
+
+router = APIRouter(prefix="/api/reservations", tags=["Reservations"])
+
+
+def _hold_response(rows: List[StockReservation]) -> dict:
+    statuses = {row.status for row in rows}
+    return {
+        "hold_id": rows[0].hold_id,
+        "status": statuses.pop() if len(statuses) == 1 else "mixed",
+        "order_ref": rows[0].order_ref,
+        "expires_at": rows[0].expires_at,
+        "items": rows
+    }
+
+
+@router.post("", response_model=ReservationResponse, status_code=201)
+def create_reservation(reservation: ReservationCreate, db: Session = Depends(get_db)):
+    """Hold stock for an order (for Order Service).
+
+    Held units stop counting as sellable until the hold is committed,
+    released, or expires after ``ttl_seconds``. All items are held or none.
+    """
+    if len(reservation.items) > settings.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.MAX_BATCH_SIZE} items per hold"
+        )
+    
+    ttl = min(reservation.ttl_seconds or settings.STOCK_HOLD_TTL, settings.STOCK_HOLD_MAX_TTL)
+    hold_id, results = reservation_crud.create_hold(
+        db,
+        [(item.product_id, item.quantity) for item in reservation.items],
+        ttl_seconds=ttl,
+        order_ref=reservation.order_ref
+    )
+    if hold_id is None:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Stock not reserved", "items": results}
+        )
+    return _hold_response(reservation_crud.get_hold(db, hold_id))
+
+
+@router.get("/{hold_id}", response_model=ReservationResponse)
+def get_reservation(hold_id: str, db: Session = Depends(get_db)):
+    """Get a stock hold."""
+    rows = reservation_crud.get_hold(db, hold_id)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return _hold_response(rows)
+
+
+@router.post("/{hold_id}/commit", response_model=ReservationResponse)
+def commit_reservation(hold_id: str, db: Session = Depends(get_db)):
+    """Commit a hold once the order is placed: held units leave stock."""
+    try:
+        rows = reservation_crud.commit_hold(db, hold_id)
+    except reservation_crud.HoldNotCommittable as exc:
+        # Not a race: the hold must be released, not retried
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return _hold_response(rows)
+
+
+@router.post("/{hold_id}/release", response_model=ReservationResponse)
+def release_reservation(hold_id: str, db: Session = Depends(get_db)):
+    """Release a hold (order failed or was abandoned). Safe to repeat."""
+    try:
+        rows = reservation_crud.release_hold(db, hold_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+    if rows is None:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    return _hold_response(rows)
@@ -1,13 +1,23 @@
 from .product import (
     CategoryCreate, CategoryUpdate, CategoryResponse, CategoryWithSubcategories,
     ProductCreate, ProductUpdate, ProductResponse, ProductListResponse,
+    ProductBatchRequest, ProductBatchResponse,
+    ProductImportRow, ProductImportError, ProductImportResponse,
+    StockAdjustment, BulkStockRequest, StockAdjustmentResult, BulkStockResponse,
+    ReservationItem, ReservationCreate, ReservationItemResponse, ReservationResponse,
     ReviewCreate, ReviewResponse,
-    PaginationParams, PaginatedResponse
+    PaginationParams, PaginatedResponse,
+    ProductPage, ReviewPage, ProductListAdapter, CategoryListAdapter
 )
 
 __all__ = [
     "CategoryCreate", "CategoryUpdate", "CategoryResponse", "CategoryWithSubcategories",
     "ProductCreate", "ProductUpdate", "ProductResponse", "ProductListResponse",
+    "ProductBatchRequest", "ProductBatchResponse",
+    "ProductImportRow", "ProductImportError", "ProductImportResponse",
+    "StockAdjustment", "BulkStockRequest", "StockAdjustmentResult", "BulkStockResponse",
+    "ReservationItem", "ReservationCreate", "ReservationItemResponse", "ReservationResponse",
     "ReviewCreate", "ReviewResponse",
-    "PaginationParams", "PaginatedResponse"
+    "PaginationParams", "PaginatedResponse",
+    "ProductPage", "ReviewPage", "ProductListAdapter", "CategoryListAdapter"
 ]
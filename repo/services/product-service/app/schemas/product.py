@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field, AliasChoices, TypeAdapter
+from typing import Optional, List, Dict, Any, Literal
 from decimal import Decimal
 from datetime import datetime
 
@@ -41,7 +41,8 @@ class CategoryResponse(CategoryBase):
 
 
 class CategoryWithSubcategories(CategoryResponse):
-    subcategories: List["CategoryResponse"] = []
+    product_count: int = 0  # Active products in this category and all below it
+    subcategories: List["CategoryWithSubcategories"] = []
 
 
 # ==========================================
@@ -88,6 +89,8 @@ class ProductUpdate(BaseModel):
 
 class ProductResponse(ProductBase):
     id: int
+    # Sellable quantity (stock minus reservation holds)
+    stock: int = Field(default=0, ge=0, validation_alias=AliasChoices("available_stock", "stock"))
     slug: str
     sku: str
     seller_id: str
@@ -109,7 +112,7 @@ class ProductListResponse(BaseModel):
     slug: str
     price: Decimal
     compare_price: Optional[Decimal] = None
-    stock: int
+    stock: int = Field(validation_alias=AliasChoices("available_stock", "stock"))
     images: List[str]
     rating: Decimal
     review_count: int
@@ -120,6 +123,92 @@ class ProductListResponse(BaseModel):
         from_attributes = True
 
 
+class ProductBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class ProductBatchResponse(BaseModel):
+    items: List[ProductResponse]
+    missing: List[int] = []
+
+
+# ==========================================
+# Bulk Import Schemas
+# ==========================================
+
+class ProductImportRow(ProductCreate):
+    # Alternative to category_id for files written by hand
+    category_slug: Optional[str] = None
+
+
+class ProductImportError(BaseModel):
+    line: int
+    sku: Optional[str] = None
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    processed: int
+    created: int
+    updated: int
+    failed: int
+    errors: List[ProductImportError]
+    errors_truncated: bool = False
+
+
+# ==========================================
+# Stock Schemas
+# ==========================================
+
+class StockAdjustment(BaseModel):
+    product_id: int
+    quantity: int = Field(..., description="Positive to add, negative to subtract")
+
+
+class BulkStockRequest(BaseModel):
+    items: List[StockAdjustment] = Field(..., min_length=1)
+
+
+class StockAdjustmentResult(BaseModel):
+    product_id: int
+    quantity: int
+    status: Literal["ok", "not_found", "insufficient_stock"]
+    stock: Optional[int] = None
+
+
+class BulkStockResponse(BaseModel):
+    success: bool
+    items: List[StockAdjustmentResult]
+
+
+class ReservationItem(BaseModel):
+    product_id: int
+    quantity: int = Field(..., gt=0)
+
+
+class ReservationCreate(BaseModel):
+    items: List[ReservationItem] = Field(..., min_length=1)
+    ttl_seconds: Optional[int] = Field(None, ge=1)
+    order_ref: Optional[str] = Field(None, max_length=64)
+
+
+class ReservationItemResponse(BaseModel):
+    product_id: int
+    quantity: int
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class ReservationResponse(BaseModel):
+    hold_id: str
+    status: str
+    order_ref: Optional[str] = None
+    expires_at: datetime
+    items: List[ReservationItemResponse]
+
+
 # ==========================================
 # Review Schemas
 # ==========================================
@@ -158,7 +247,24 @@ class PaginationParams(BaseModel):
 
 class PaginatedResponse(BaseModel):
     items: List[Any]
-    total: int
+    total: Optional[int] = None
     page: int
     limit: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    total_type: Literal["exact", "estimated", "omitted"] = "exact"
+    next_cursor: Optional[str] = None
+
+
+# Typed pages and lists: list routes validate ORM rows into these once and
+# return ``model_dump_json()``, skipping FastAPI's response_model round trip
+
+class ProductPage(PaginatedResponse):
+    items: List[ProductListResponse]
+
+
+class ReviewPage(PaginatedResponse):
+    items: List[ReviewResponse]
+
+
+ProductListAdapter = TypeAdapter(List[ProductListResponse])
+CategoryListAdapter = TypeAdapter(List[CategoryResponse])
@@ -0,0 +1,151 @@
+"""
+Load test: DATABASE_MODE=sync vs DATABASE_MODE=async
+Run: python benchmarks/async_mode.py [--database-url mysql+pymysql://...] [--concurrency 200]
+
+Seeds a catalog, then starts one uvicorn worker per mode and hammers the
+read endpoints (list, featured, detail, batch, category tree) from many
+concurrent clients for a fixed time. Reports throughput, latency
+percentiles and errors per mode. SQLite works for a smoke run; use MySQL
+for numbers that mean anything.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_async_mode.db')}")
+parser.add_argument("--products", type=int, default=5000)
+parser.add_argument("--concurrency", type=int, default=100)
+parser.add_argument("--duration", type=float, default=15, help="Seconds per mode")
+parser.add_argument("--port", type=int, default=38002)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+
+
+def seed() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(Product).filter(Product.seller_id == "load-test").delete()
+        if not db.query(Category).filter(Category.slug == "load-test").first():
+            db.add(Category(name="Load test", slug="load-test"))
+        db.commit()
+        category_id = db.query(Category.id).filter(Category.slug == "load-test").scalar()
+    finally:
+        db.close()
+
+    with engine.begin() as conn:
+        conn.execute(insert(Product), [
+            {
+                "name": f"Load test product {i}", "slug": f"load-test-{i}", "sku": f"LOAD{i:07d}",
+                "price": 1000 + i, "stock": 10, "seller_id": "load-test", "category_id": category_id,
+                "is_featured": i % 10 == 0, "images": [], "attributes": {}, "is_active": True,
+            }
+            for i in range(args.products)
+        ])
+
+
+def paths(product_ids: list) -> list:
+    rng = random.Random(7)
+    sample = [rng.choice(product_ids) for _ in range(1000)]
+    return (
+        ["/api/products?limit=20", "/api/products?limit=20&sort_by=price&include_total=false",
+         "/api/products/featured", "/api/categories/tree"]
+        + [f"/api/products/{pid}" for pid in sample[:500]]
+        + [f"/api/products/batch?ids={','.join(map(str, sample[i:i + 10]))}" for i in range(500, 1000, 10)]
+    )
+
+
+async def client_loop(client, urls, deadline, latencies, errors) -> None:
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = await client.get(rng.choice(urls))
+            if response.status_code != 200:
+                errors.append(response.status_code)
+        except httpx.HTTPError as exc:
+            errors.append(type(exc).__name__)
+        latencies.append(time.perf_counter() - started)
+
+
+async def load(urls: list) -> tuple:
+    latencies, errors = [], []
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + args.duration
+        await asyncio.gather(*(
+            client_loop(client, urls, deadline, latencies, errors) for _ in range(args.concurrency)
+        ))
+    return latencies, errors
+
+
+def run_mode(mode: str, urls: list) -> dict:
+    env = dict(os.environ, DATABASE_MODE=mode)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=env
+    )
+    try:
+        for _ in range(100):
+            try:
+                if httpx.get(f"http://127.0.0.1:{args.port}/health").status_code == 200:
+                    break
+            except httpx.HTTPError:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError(f"Server did not start in {mode} mode")
+
+        latencies, errors = asyncio.run(load(urls))
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+
+    def pct(p: float) -> float:
+        return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+    return {
+        "rps": len(latencies) / args.duration,
+        "p50": pct(0.50), "p95": pct(0.95), "p99": pct(0.99),
+        "errors": len(errors),
+    }
+
+
+def main():
+    print(f"📦 Seeding {args.products:,} products on {engine.dialect.name} ...")
+    seed()
+    db = SessionLocal()
+    product_ids = [row.id for row in db.query(Product.id).filter(Product.seller_id == "load-test")]
+    db.close()
+    urls = paths(product_ids)
+
+    results = {}
+    for mode in ("sync", "async"):
+        print(f"🔥 {mode}: {args.concurrency} clients for {args.duration:.0f}s ...")
+        results[mode] = run_mode(mode, urls)
+
+    print(f"\n{'mode':<8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['rps']:>10.0f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['p99']:>10.1f}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
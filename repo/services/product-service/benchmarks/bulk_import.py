@@ -0,0 +1,124 @@
+"""
+Benchmark: bulk NDJSON import vs one POST /api/products per item
+Run: python benchmarks/bulk_import.py [--products 100000] [--database-url mysql+pymysql://...]
+
+Writes a synthetic NDJSON catalog to a temp file, then:
+  - imports it into an empty catalog (all inserts),
+  - imports it again (all updates),
+  - creates --baseline products one at a time through crud.create_product
+    (what POST /api/products does) and extrapolates to --products.
+The target is 100k SKUs per minute. Use a fresh database: the run
+deletes products with seller_id "bulk-import-bench" first.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_bulk_import.db')}")
+parser.add_argument("--products", type=int, default=100000)
+parser.add_argument("--baseline", type=int, default=2000, help="Products created one by one")
+parser.add_argument("--chunk-size", type=int, default=1000)
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"
+os.environ["PRODUCT_CACHE_BACKEND"] = "none"
+
+from app.crud import product as product_crud  # noqa: E402
+from app.crud.product_import import ProductImporter, parse_ndjson  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+from app.schemas import ProductCreate  # noqa: E402
+
+SELLER = "bulk-import-bench"
+BRANDS = ["Apple", "Samsung", "Xiaomi", "Sony", "LG", "Lenovo", "Asus", "Huawei"]
+WORDS = ["Pro", "Max", "Ultra", "Lite", "Plus", "Mini", "Air", "Neo", "Edge", "Prime"]
+
+
+def prepare() -> list:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(Product).filter(Product.seller_id == SELLER).delete()
+        slugs = [f"bulk-category-{i}" for i in range(20)]
+        existing = {slug for (slug,) in db.query(Category.slug).filter(Category.slug.in_(slugs))}
+        db.add_all([Category(name=slug, slug=slug) for slug in slugs if slug not in existing])
+        db.commit()
+        return slugs
+    finally:
+        db.close()
+
+
+def write_catalog(path: str, category_slugs: list, price_shift: int = 0) -> None:
+    rng = random.Random(42)
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(args.products):
+            brand = rng.choice(BRANDS)
+            out.write(json.dumps({
+                "sku": f"BULK{i:08d}",
+                "name": f"{brand} {rng.choice(WORDS)} {rng.choice(WORDS)} {i % 5000}",
+                "short_description": f"{brand} device",
+                "description": "Synthetic product for the bulk import benchmark. " * 10,
+                "price": 100000 + rng.randint(0, 10000000) + price_shift,
+                "stock": rng.randint(0, 500),
+                "brand": brand,
+                "category_slug": rng.choice(category_slugs),
+                "images": [f"https://cdn.example.com/{i}.jpg"],
+                "attributes": {"color": rng.choice(["black", "white", "blue"])},
+                "is_featured": i % 50 == 0,
+            }) + "\n")
+
+
+def run_import(path: str) -> tuple:
+    db = SessionLocal()
+    try:
+        importer = ProductImporter(db, SELLER, chunk_size=args.chunk_size)
+        started = time.perf_counter()
+        with open(path, encoding="utf-8") as stream:
+            report = importer.run(parse_ndjson(stream))
+        return time.perf_counter() - started, report
+    finally:
+        db.close()
+
+
+def run_baseline() -> float:
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        for i in range(args.baseline):
+            product = ProductCreate(name=f"Baseline product {i % 500}", sku=f"BASE{i:08d}", price=1000)
+            # The route checks the SKU first, then create_product resolves the slug
+            product_crud.get_product_by_sku(db, product.sku)
+            product_crud.create_product(db, product, seller_id=SELLER)
+        return time.perf_counter() - started
+    finally:
+        db.close()
+
+
+def main():
+    print(f"📦 Preparing {args.products:,} products on {engine.dialect.name} ...")
+    category_slugs = prepare()
+    path = os.path.join(tempfile.gettempdir(), "bench_bulk_import.ndjson")
+    write_catalog(path, category_slugs)
+
+    print(f"\n{'run':<28}{'seconds':>10}{'rows/min':>14}{'failed':>8}")
+    for label in ("bulk import (insert)", "bulk import (update)"):
+        elapsed, report = run_import(path)
+        print(f"{label:<28}{elapsed:>10.1f}{args.products / elapsed * 60:>14,.0f}{report['failed']:>8}")
+        write_catalog(path, category_slugs, price_shift=1)
+
+    elapsed = run_baseline()
+    print(f"{'one by one (create_product)':<28}{elapsed:>10.1f}{args.baseline / elapsed * 60:>14,.0f}{0:>8}")
+    print(f"\n⏱️  One by one would take ~{args.products * elapsed / args.baseline / 60:.1f} min for {args.products:,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Benchmark: subtree category filter (materialized path) vs recursive walk
+Run: python benchmarks/category_subtree.py [--products 200000]
+
+Builds a deep tree (a long chain with a side leaf on every level) and a wide
+tree (thousands of children, each with leaves) in SQLite, spreads products
+over them, then times counting a subtree's products with the
+include_descendants predicate (one IN over a categories.path range) against
+walking parent_id level by level and filtering on the collected ids. Both
+must find the same products.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--products", type=int, default=200_000)
+parser.add_argument("--depth", type=int, default=60, help="Levels of the deep tree")
+parser.add_argument("--width", type=int, default=2000, help="Children of the wide tree's root")
+parser.add_argument("--leaves", type=int, default=5, help="Leaves under each wide child")
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_category_subtree.db"))
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import insert  # noqa: E402
+from app.crud import category as category_crud  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+
+
+def add_category(db, name: str, parent_id=None) -> int:
+    category = Category(name=name, slug=f"{name}-{random.random()}", parent_id=parent_id)
+    db.add(category)
+    db.flush()
+    return category.id
+
+
+def build_catalog() -> dict:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+
+    # Deep: a chain, each level with one extra leaf
+    deep_root = parent = add_category(db, "deep-0")
+    deep_mid = None
+    for level in range(1, args.depth):
+        add_category(db, f"deep-leaf-{level}", parent)
+        parent = add_category(db, f"deep-{level}", parent)
+        if level == args.depth // 2:
+            deep_mid = parent
+
+    # Wide: one root, many children, a few leaves under each
+    wide_root = add_category(db, "wide-0")
+    wide_child = None
+    for i in range(args.width):
+        child = add_category(db, f"wide-{i}", wide_root)
+        wide_child = wide_child or child
+        for j in range(args.leaves):
+            add_category(db, f"wide-{i}-{j}", child)
+    db.commit()
+    category_crud.rebuild_category_paths(db)
+
+    category_ids = [row.id for row in db.query(Category.id)]
+    db.close()
+
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        for start in range(0, args.products, 50000):
+            conn.execute(insert(Product), [
+                {
+                    "name": f"Product {i}", "slug": f"product-{i}", "sku": f"SKU{i:08d}",
+                    "price": 1000, "stock": 10, "seller_id": "benchmark",
+                    "category_id": rng.choice(category_ids), "images": [], "attributes": {},
+                    "is_active": True,
+                }
+                for i in range(start, min(start + 50000, args.products))
+            ])
+        # Planner statistics, as a production database would have
+        conn.exec_driver_sql("ANALYZE")
+
+    return {
+        "deep root": deep_root,
+        "deep middle": deep_mid or deep_root,
+        "wide root": wide_root,
+        "wide child": wide_child,
+    }
+
+
+def recursive_walk(db, category_id: int) -> int:
+    """Baseline: one query per tree level, then filter on the id list."""
+    ids = [category_id]
+    frontier = [category_id]
+    while frontier:
+        frontier = [row.id for row in db.query(Category.id).filter(Category.parent_id.in_(frontier))]
+        ids.extend(frontier)
+    return db.query(Product).filter(Product.is_active == True, Product.category_id.in_(ids)).count()
+
+
+def materialized_path(db, category_id: int) -> int:
+    """What get_products(include_descendants=True) filters on."""
+    return db.query(Product).filter(
+        Product.is_active == True, category_crud.subtree_filter(db, category_id)
+    ).count()
+
+
+def timed(func, db, category_id: int):
+    started = time.perf_counter()
+    for _ in range(args.repeat):
+        result = func(db, category_id)
+    return (time.perf_counter() - started) / args.repeat * 1000, result
+
+
+def main():
+    print(f"📦 Building trees and {args.products:,} products in {args.db} ...")
+    targets = build_catalog()
+
+    db = SessionLocal()
+    failed = False
+    print(f"\n{'subtree':<14}{'products':>10}{'walk ms':>10}{'path ms':>10}{'speedup':>9}")
+    for label, category_id in targets.items():
+        walk_ms, walk_total = timed(recursive_walk, db, category_id)
+        path_ms, path_total = timed(materialized_path, db, category_id)
+        status = "✅" if walk_total == path_total else "❌"
+        failed = failed or status == "❌"
+        print(f"{status} {label:<12}{path_total:>10,}{walk_ms:>10.1f}{path_ms:>10.1f}{walk_ms / path_ms:>8.1f}x")
+    db.close()
+
+    if failed:
+        print("\n❌ Subtree filter and recursive walk disagree")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark: list page with projected columns vs full product rows
+Run: python benchmarks/list_projection.py [--products 20000] [--description-kb 8]
+
+Builds a SQLite catalog whose products carry multi-KB descriptions and
+attribute blobs, then times get_products() + ProductPage rendering (what
+GET /api/products does) loading only LIST_COLUMNS vs loading every column.
+SQLite reads from the page cache, so on MySQL (where the extra bytes also
+cross the network) the gap is larger.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--products", type=int, default=20000)
+parser.add_argument("--description-kb", type=int, default=8)
+parser.add_argument("--repeat", type=int, default=50)
+parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_list_projection.db"))
+args = parser.parse_args()
+
+if os.path.exists(args.db):
+    os.remove(args.db)
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["DEBUG"] = "false"
+os.environ["PRODUCT_CACHE_BACKEND"] = "none"
+
+from sqlalchemy import insert  # noqa: E402
+from app.crud import product as product_crud  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+from app.schemas import ProductPage  # noqa: E402
+
+PROJECTED = product_crud.LIST_COLUMNS
+FULL = tuple(getattr(Product, column.key) for column in Product.__mapper__.column_attrs)
+
+CASES = [
+    ("newest, limit=20", {"limit": 20}),
+    ("newest, limit=100", {"limit": 100}),
+    ("price asc, limit=100", {"limit": 100, "sort_by": "price", "sort_order": "asc"}),
+    ("featured, limit=50", {"limit": 50, "is_featured": True}),
+]
+
+
+def build_catalog() -> None:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    categories = [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(20)]
+    db.add_all(categories)
+    db.commit()
+    category_ids = [category.id for category in categories]
+    db.close()
+
+    description = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 20)[:1024] * args.description_kb
+    attributes = {f"spec_{n}": f"value {n} " * 8 for n in range(30)}
+    batch = 2000
+    with engine.begin() as conn:
+        for start in range(0, args.products, batch):
+            conn.execute(insert(Product), [
+                {
+                    "name": f"Product {i}", "slug": f"product-{i}", "sku": f"SKU{i:08d}",
+                    "description": description, "short_description": "Short description",
+                    "price": 1000 + i % 5000, "cost_price": 800, "stock": 10, "seller_id": "benchmark",
+                    "category_id": category_ids[i % len(category_ids)], "is_featured": i % 10 == 0,
+                    "images": [f"https://cdn.example.com/{i}/{n}.jpg" for n in range(4)],
+                    "attributes": attributes, "is_active": True,
+                }
+                for i in range(start, min(start + batch, args.products))
+            ])
+        conn.exec_driver_sql("ANALYZE")
+
+
+def loaded_bytes(products: list) -> int:
+    """Rough size of the column values hydrated into ``products``."""
+    keys = [column.key for column in FULL]
+    return sum(
+        len(str(product.__dict__[key]))
+        for product in products for key in keys
+        if product.__dict__.get(key) is not None
+    )
+
+
+def render_page(params: dict) -> tuple:
+    db = SessionLocal()
+    try:
+        products, total, total_type = product_crud.get_products(db, include_total=False, **params)
+        page = ProductPage.model_validate({
+            "items": products, "total": total, "page": 1, "limit": params["limit"], "total_type": total_type
+        })
+        return page.model_dump_json().encode(), loaded_bytes(products)
+    finally:
+        db.close()
+
+
+def measure(columns: tuple, params: dict) -> tuple:
+    product_crud.LIST_COLUMNS = columns
+    try:
+        body, size = render_page(params)
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            render_page(params)
+        return (time.perf_counter() - started) / args.repeat, size, body
+    finally:
+        product_crud.LIST_COLUMNS = PROJECTED
+
+
+def main():
+    print(f"📦 Building {args.products:,} products with {args.description_kb} KB descriptions ...")
+    build_catalog()
+
+    print(f"\n{'page':<24}{'full ms':>10}{'projected ms':>14}{'speedup':>9}{'full KB':>10}{'projected KB':>14}")
+    for name, params in CASES:
+        full_time, full_bytes, full_body = measure(FULL, params)
+        projected_time, projected_bytes, projected_body = measure(PROJECTED, params)
+        if full_body != projected_body:
+            print(f"❌ {name}: response bodies differ")
+            sys.exit(1)
+        print(
+            f"{name:<24}{full_time * 1000:>10.2f}{projected_time * 1000:>14.2f}"
+            f"{full_time / projected_time:>8.1f}x{full_bytes / 1024:>10.0f}{projected_bytes / 1024:>14.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
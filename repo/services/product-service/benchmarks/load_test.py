@@ -0,0 +1,272 @@
+"""
+Load-test harness: every product and category route on a synthetic catalog
+Run: python benchmarks/load_test.py [--products 1000000] [--database-url mysql+pymysql://...]
+
+Builds the catalog with generate_catalog.py (skip with --reuse), starts the
+app in-process and drives each route in routers/product.py and
+routers/category.py --requests times from a single client: reads first,
+then writes on rows the run creates itself. Reports per route p50/p95/p99
+latency, throughput and SQL statements per request, then the statement
+fingerprints with the most total time. SQLite is the default stand-in;
+pass a MySQL URL for numbers that mean anything. Concurrency is covered by
+benchmarks/async_mode.py.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_load_test.db')}")
+parser.add_argument("--products", type=int, default=100000)
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--reuse", action="store_true", help="Use the catalog already in the database")
+parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+parser.add_argument("--heavy-requests", type=int, default=3, help="Requests for import and rating recompute")
+parser.add_argument("--cache-backend", default="none", help="PRODUCT_CACHE_BACKEND for the run")
+parser.add_argument("--routes", help="Only routes whose label contains this text")
+parser.add_argument("--json", help="Also write the results to this file")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"
+os.environ["PRODUCT_CACHE_BACKEND"] = args.cache_backend
+# Every statement is timed anyway; keep the per-statement log out of the table
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "60000")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event, func  # noqa: E402
+from app.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Category, Product  # noqa: E402
+from app.query_log import query_stats  # noqa: E402
+from generate_catalog import generate_catalog  # noqa: E402
+
+ENGINES = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+SELLER = "load-test-seller"
+WRITER = {"X-User-Id": SELLER}
+ADMIN = {"X-User-Id": SELLER, "X-User-Role": "ADMIN"}
+SEARCH_TERMS = ["iphone", "samsung galaxy", "macbook", "sony", "televizor"]
+
+
+class QueryCounter:
+    """Statements executed on the service's engines since the last take()."""
+
+    def __init__(self):
+        self.count = 0
+        for target in ENGINES:
+            event.listen(target, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+    def take(self) -> int:
+        count, self.count = self.count, 0
+        return count
+
+
+class Sample:
+    """What the read routes are pointed at, picked once from the catalog."""
+
+    def __init__(self, rng: random.Random):
+        db = SessionLocal()
+        try:
+            low, high = db.query(func.min(Product.id), func.max(Product.id)).one()
+            ids = [rng.randint(low, high) for _ in range(2000)]
+            self.products = db.query(Product.id, Product.slug).filter(
+                Product.id.in_(ids), Product.is_active == True
+            ).all()
+            # The skewed head: products with the most reviews
+            self.popular = [
+                product_id for (product_id,) in db.query(Product.id).order_by(Product.review_count.desc()).limit(20)
+            ]
+            self.categories = db.query(Category.id, Category.slug).all()
+            self.roots = [category_id for (category_id,) in db.query(Category.id).filter(Category.parent_id.is_(None))]
+            self.brands = [brand for (brand,) in db.query(Product.brand).filter(Product.brand.isnot(None)).distinct()]
+        finally:
+            db.close()
+
+
+def percentile(latencies: list, p: float) -> float:
+    return latencies[min(int(len(latencies) * p), len(latencies) - 1)] * 1000
+
+
+class Route:
+    """One route to drive. ``factory(i)`` returns (path, request kwargs) for
+    iteration i; ``collect`` receives the ids of created rows and ``needs``
+    is the list the factory takes ids from."""
+
+    def __init__(self, label, method, factory, iterations=None, collect=None, needs=None):
+        self.label = label
+        self.method = method
+        self.factory = factory
+        self.iterations = args.requests if iterations is None else iterations
+        self.collect = collect
+        self.needs = needs
+
+
+def routes(client: TestClient, sample: Sample, rng: random.Random) -> list:
+    """Every product and category route, in run order."""
+    run_id = f"{time.time_ns() % 10**10:010d}"
+    created_products, created_categories = [], []
+
+    def new_product(i):
+        return created_products[i % len(created_products)]
+
+    def new_category(i):
+        return created_categories[i % len(created_categories)]
+
+    def product():
+        return rng.choice(sample.products)
+
+    # A page-2 cursor, fixed for the run
+    first_page = client.get("/api/products?limit=20&sort_by=price&sort_order=asc").json()
+    cursor = first_page["next_cursor"]
+
+    def import_body(i):
+        lines = [
+            json.dumps({"sku": f"LT{run_id}-I{i}-{k}", "name": f"Load test import {k}", "price": 1000 + k, "stock": 5})
+            for k in range(500)
+        ]
+        return "\n".join(lines).encode()
+
+    def ids(count):
+        return [p.id for p in rng.sample(sample.products, min(count, len(sample.products)))]
+
+    return [
+        # Catalog reads
+        Route("GET /api/products", "GET", lambda i: ("/api/products", {})),
+        Route("GET /api/products (no total)", "GET", lambda i: ("/api/products?limit=20&include_total=false", {})),
+        Route("GET /api/products (page 50)", "GET", lambda i: ("/api/products?limit=20&page=50", {})),
+        Route("GET /api/products (cursor)", "GET", lambda i: (
+            f"/api/products?limit=20&sort_by=price&sort_order=asc&cursor={cursor}", {})),
+        Route("GET /api/products (sort rating)", "GET", lambda i: ("/api/products?limit=20&sort_by=rating", {})),
+        Route("GET /api/products (category tree)", "GET", lambda i: (
+            f"/api/products?limit=20&category_id={rng.choice(sample.roots)}&include_descendants=true", {})),
+        Route("GET /api/products (brand+price)", "GET", lambda i: (
+            f"/api/products?limit=20&brand={rng.choice(sample.brands)}&min_price=1000000&max_price=10000000", {})),
+        Route("GET /api/products (search)", "GET", lambda i: (
+            f"/api/products?limit=20&search={rng.choice(SEARCH_TERMS)}", {})),
+        Route("GET /api/products (relevance)", "GET", lambda i: (
+            f"/api/products?limit=20&search={rng.choice(SEARCH_TERMS)}&sort_by=relevance", {})),
+        Route("GET /api/products/featured", "GET", lambda i: ("/api/products/featured", {})),
+        Route("GET /api/products/batch", "GET", lambda i: (
+            f"/api/products/batch?ids={','.join(map(str, ids(50)))}", {})),
+        Route("POST /api/products/batch", "POST", lambda i: ("/api/products/batch", {"json": {"ids": ids(50)}})),
+        Route("GET /api/products/{id}", "GET", lambda i: (f"/api/products/{product().id}", {})),
+        Route("GET /api/products/slug/{slug}", "GET", lambda i: (f"/api/products/slug/{product().slug}", {})),
+        Route("GET /api/products/{id}/reviews", "GET", lambda i: (f"/api/products/{product().id}/reviews", {})),
+        Route("GET /api/products/{id}/reviews (popular)", "GET", lambda i: (
+            f"/api/products/{rng.choice(sample.popular)}/reviews?page={rng.randint(1, 20)}", {})),
+        Route("GET /api/categories", "GET", lambda i: ("/api/categories", {})),
+        Route("GET /api/categories/tree", "GET", lambda i: ("/api/categories/tree", {})),
+        Route("GET /api/categories/{id}", "GET", lambda i: (f"/api/categories/{rng.choice(sample.categories).id}", {})),
+        Route("GET /api/categories/slug/{slug}", "GET", lambda i: (
+            f"/api/categories/slug/{rng.choice(sample.categories).slug}", {})),
+
+        # Writes, on rows this run creates
+        Route("POST /api/products", "POST", lambda i: ("/api/products", {"headers": WRITER, "json": {
+            "name": f"Load test product {i % 20}", "sku": f"LT{run_id}-{i}", "price": 1000 + i, "stock": 50,
+            "category_id": rng.choice(sample.categories).id,
+        }}), collect=created_products),
+        Route("PUT /api/products/{id}", "PUT", lambda i: (f"/api/products/{new_product(i)}", {
+            "headers": WRITER, "json": {"price": 2000 + i, "stock": 40}}), needs=created_products),
+        Route("PATCH /api/products/{id}/stock", "PATCH", lambda i: (
+            f"/api/products/{new_product(i)}/stock?quantity=-1", {}), needs=created_products),
+        Route("POST /api/products/stock/bulk", "POST", lambda i: ("/api/products/stock/bulk", {"json": {"items": [
+            {"product_id": new_product(i + k), "quantity": -1} for k in range(10)
+        ]}}), needs=created_products),
+        Route("POST /api/products/{id}/reviews", "POST", lambda i: (f"/api/products/{new_product(i)}/reviews", {
+            "headers": {"X-User-Id": f"load-test-user-{i}"}, "json": {"rating": rng.randint(1, 5), "title": "Load test"},
+        }), needs=created_products),
+        Route("POST /api/products/import", "POST", lambda i: ("/api/products/import?format=ndjson", {
+            "headers": WRITER, "content": import_body(i)}), iterations=args.heavy_requests),
+        Route("POST /api/products/ratings/recompute", "POST", lambda i: (
+            "/api/products/ratings/recompute", {"headers": ADMIN}), iterations=args.heavy_requests),
+        Route("DELETE /api/products/{id}", "DELETE", lambda i: (
+            f"/api/products/{new_product(i)}", {"headers": WRITER}), needs=created_products),
+        Route("POST /api/categories", "POST", lambda i: ("/api/categories", {"json": {
+            "name": f"Load test category {i % 20}", "parent_id": rng.choice(sample.roots)}}), collect=created_categories),
+        Route("PUT /api/categories/{id}", "PUT", lambda i: (f"/api/categories/{new_category(i)}", {
+            "json": {"description": f"Updated {i}", "sort_order": i}}), needs=created_categories),
+        Route("DELETE /api/categories/{id}", "DELETE", lambda i: (
+            f"/api/categories/{new_category(i)}", {}), needs=created_categories),
+    ]
+
+
+def run_route(client: TestClient, counter: QueryCounter, route: Route) -> dict:
+    latencies, queries, errors = [], [], 0
+    started = time.perf_counter()
+    for i in range(route.iterations):
+        path, kwargs = route.factory(i)
+        counter.take()
+        request_started = time.perf_counter()
+        response = client.request(route.method, path, **kwargs)
+        latencies.append(time.perf_counter() - request_started)
+        queries.append(counter.take())
+        if response.status_code >= 400:
+            errors += 1
+        elif route.collect is not None:
+            route.collect.append(response.json()["id"])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": route.iterations,
+        "rps": route.iterations / elapsed,
+        "p50": percentile(latencies, 0.50), "p95": percentile(latencies, 0.95), "p99": percentile(latencies, 0.99),
+        "queries": sum(queries) / len(queries), "max_queries": max(queries),
+        "errors": errors,
+    }
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    if not args.reuse:
+        print(f"🏭 Generating {args.products:,} products on {engine.dialect.name} ...")
+        started = time.perf_counter()
+        counts = generate_catalog(products=args.products, seed=args.seed)
+        print(f"   {counts['categories']:,} categories, {counts['reviews']:,} reviews in {time.perf_counter() - started:.1f}s")
+
+    rng = random.Random(args.seed)
+    sample = Sample(rng)
+    counter = QueryCounter()
+    results = {}
+
+    # Startup hooks (search index, category paths) run as in production
+    with TestClient(app) as client:
+        query_stats.reset()
+
+        print(f"\n{'route':<46}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'req/s':>9}{'queries':>9}{'errors':>8}")
+        for route in routes(client, sample, rng):
+            if args.routes and args.routes not in route.label:
+                continue
+            if route.needs is not None and not route.needs:
+                print(f"{route.label[:45]:<46}  skipped: nothing created to work on")
+                continue
+            r = results[route.label] = run_route(client, counter, route)
+            print(
+                f"{route.label[:45]:<46}{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}"
+                f"{r['rps']:>9.0f}{r['queries']:>9.1f}{r['errors']:>8}"
+            )
+
+    print("\n🐢 Statements with the most total time (GET /metrics/queries has the full text)")
+    for item in query_stats.top(5)["items"]:
+        route = next(iter(item["routes"]), "-")
+        where = item["fingerprint"].partition(" WHERE ")[2][:60]
+        print(f"  {item['total_ms']:>9.0f} ms {item['count']:>7}x {item['mean_ms']:>8.1f} ms avg  {route}  {where}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as out:
+            json.dump({"database": engine.dialect.name, "products": args.products, "routes": results}, out, indent=2)
+        print(f"\n📝 Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Query-count budgets for read endpoints (catches N+1 regressions)
+Run: python benchmarks/query_counts.py
+
+Seeds a throwaway SQLite catalog where every page spans many categories,
+calls each endpoint through the ASGI app and counts the SQL statements it
+issues. Exits non-zero if any endpoint goes over its budget; the CI lint
+job runs it in both sync and async (DATABASE_MODE=async) mode.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_query_counts.db")
+if os.path.exists(DB_PATH):
+    os.remove(DB_PATH)
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+os.environ["PRODUCT_CACHE_BACKEND"] = "none"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from app.database import Base, SessionLocal, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models import Category, Product, ProductReview  # noqa: E402
+
+CATEGORIES = 20
+PRODUCTS = 200
+
+# (path, max statements); budgets must not grow with page size. Catalog-wide
+# responses also read the catalog version for their ETag.
+BUDGETS = [
+    ("/api/products?limit=100", 4),  # version + count + page + categories
+    ("/api/products?limit=100&include_total=false", 3),
+    ("/api/products?limit=100&sort_by=price&sort_order=asc", 4),
+    ("/api/products/featured?limit=50", 3),
+    ("/api/products/1", 1),
+    ("/api/products/slug/product-2", 1),
+    ("/api/products/batch?ids=" + ",".join(str(i) for i in range(1, 101)), 1),
+    ("/api/products/1/reviews", 3),  # product + count + page
+    ("/api/categories", 2),
+    ("/api/categories/tree", 3),  # version; cold cache: version + whole tree on the primary
+]
+
+
+# Read routes use the async engine when DATABASE_MODE=async
+ENGINES = [engine] + ([async_engine.sync_engine] if async_engine is not None else [])
+
+
+class QueryCounter:
+    """Counts statements executed on the service's engines while active."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        for target in ENGINES:
+            event.listen(target, "before_cursor_execute", self._count)
+        return self
+
+    def __exit__(self, *exc):
+        for target in ENGINES:
+            event.remove(target, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def seed() -> None:
+    # Throwaway database, so no migrations
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    categories = [Category(name=f"Category {i}", slug=f"category-{i}") for i in range(CATEGORIES)]
+    db.add_all(categories)
+    db.flush()
+    # Four levels deep: 0-3 are roots, every later category hangs off one four back
+    for i, category in enumerate(categories[4:], start=4):
+        category.parent_id = categories[i - 4].id
+    db.add_all([
+        Product(
+            name=f"Product {i}", slug=f"product-{i}", sku=f"SKU{i}", price=1000 + i, stock=10,
+            seller_id="benchmark", category_id=categories[i % CATEGORIES].id,
+            is_featured=i % 2 == 0, images=[], attributes={}
+        )
+        for i in range(1, PRODUCTS + 1)
+    ])
+    db.flush()
+    db.add_all([ProductReview(product_id=1, user_id=f"user-{i}", rating=5) for i in range(20)])
+    db.commit()
+    db.close()
+
+
+def main():
+    seed()
+    client = TestClient(app)
+    failed = False
+
+    print(f"{'endpoint':<60}{'queries':>8}{'budget':>8}")
+    for path, budget in BUDGETS:
+        # Fresh identity map per request, as in production
+        with QueryCounter() as counter:
+            response = client.get(path)
+        status = "✅" if response.status_code == 200 and counter.count <= budget else "❌"
+        failed = failed or status == "❌"
+        print(f"{status} {path[:57]:<57}{counter.count:>8}{budget:>8}")
+
+    os.remove(DB_PATH)
+    if failed:
+        print("\n❌ Query budget exceeded (N+1?)")
+        sys.exit(1)
+    print("\n🎉 All endpoints within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Microbenchmark: response serialization cost per list endpoint
+Run: python benchmarks/serialization.py [--items 100] [--repeat 200]
+
+Builds in-memory ORM objects (no database) shaped like each endpoint's
+page and times turning them into the response body two ways:
+
+  response_model  what FastAPI does for a returned dict/ORM list: prepare
+                  the content, validate it against response_model,
+                  serialize and json.dumps it (JSONResponse)
+  pre-rendered    what the routes do now: validate the typed page once
+                  and render it with pydantic-core's ``model_dump_json``
+
+Both bodies are checked to be identical before timing.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--items", type=int, default=100, help="Rows per page")
+parser.add_argument("--repeat", type=int, default=200)
+args = parser.parse_args()
+
+os.environ["DEBUG"] = "false"
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from app.models import Category, Product, ProductReview  # noqa: E402
+from app.schemas import (  # noqa: E402
+    CategoryListAdapter, CategoryResponse, PaginatedResponse, ProductBatchResponse, ProductListAdapter,
+    ProductListResponse, ProductPage, ReviewPage, ReviewResponse
+)
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def build_rows(count: int):
+    categories = [
+        Category(id=i, name=f"Category {i}", slug=f"category-{i}", is_active=True, sort_order=0, created_at=NOW)
+        for i in range(1, 11)
+    ]
+    products = [
+        Product(
+            id=i, name=f"Product {i}", slug=f"product-{i}", sku=f"SKU{i:08d}",
+            description="Lorem ipsum dolor sit amet. " * 20, short_description="Short description",
+            price=Decimal("1999.99") + i, compare_price=Decimal("2499.00"), stock=50, reserved=0, low_stock_threshold=5,
+            seller_id="benchmark", brand="Brand", category=categories[i % len(categories)],
+            category_id=categories[i % len(categories)].id,
+            images=[f"https://cdn.example.com/{i}/{n}.jpg" for n in range(4)],
+            attributes={"color": "black", "weight": "1.2kg"}, is_active=True, is_featured=i % 2 == 0,
+            rating=Decimal("4.5"), review_count=12, rating_sum=54, sold_count=3, view_count=100, created_at=NOW
+        )
+        for i in range(1, count + 1)
+    ]
+    reviews = [
+        ProductReview(
+            id=i, product_id=1, user_id=f"user-{i}", rating=5, title="Great", comment="Works as described. " * 5,
+            images=[], is_verified_purchase=True, helpful_count=0, created_at=NOW
+        )
+        for i in range(1, count + 1)
+    ]
+    return categories, products, reviews
+
+
+def response_field(response_model):
+    # Built once per route at startup, as FastAPI does
+    return create_response_field(name="response", type_=response_model, mode="serialization")
+
+
+def render_response_model(field, content) -> bytes:
+    """FastAPI's path for a route that returns ``content``."""
+    coroutine = serialize_response(field=field, response_content=content)
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return JSONResponse(done.value).body
+    raise RuntimeError("serialize_response awaited unexpectedly")
+
+
+def cases(categories, products, reviews) -> list:
+    page = {"total": 1000, "page": 1, "limit": len(products), "total_pages": 10, "total_type": "exact"}
+    paginated = response_field(PaginatedResponse)
+    product_list = response_field(List[ProductListResponse])
+    batch = response_field(ProductBatchResponse)
+    category_list = response_field(List[CategoryResponse])
+    return [
+        (
+            "GET /api/products",
+            lambda: render_response_model(paginated, {
+                **page, "items": [ProductListResponse.model_validate(p) for p in products]
+            }),
+            lambda: ProductPage.model_validate({**page, "items": products}).model_dump_json().encode(),
+        ),
+        (
+            "GET /api/products/featured",
+            lambda: render_response_model(product_list, products),
+            lambda: ProductListAdapter.dump_json(ProductListAdapter.validate_python(products)),
+        ),
+        (
+            "GET /api/products/batch",
+            lambda: render_response_model(batch, {"items": products, "missing": []}),
+            lambda: ProductBatchResponse.model_validate(
+                {"items": products, "missing": []}
+            ).model_dump_json().encode(),
+        ),
+        (
+            "GET /api/products/{id}/reviews",
+            lambda: render_response_model(paginated, {
+                **page, "items": [ReviewResponse.model_validate(r) for r in reviews]
+            }),
+            lambda: ReviewPage.model_validate({**page, "items": reviews}).model_dump_json().encode(),
+        ),
+        (
+            "GET /api/categories",
+            lambda: render_response_model(category_list, categories),
+            lambda: CategoryListAdapter.dump_json(CategoryListAdapter.validate_python(categories)),
+        ),
+    ]
+
+
+def per_call(fn) -> float:
+    """Best-of-5 mean seconds per call."""
+    fn()
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            fn()
+        best = min(best, (time.perf_counter() - started) / args.repeat)
+    return best
+
+
+def main():
+    print(f"📦 Building {args.items} products / reviews in memory ...")
+    rows = build_rows(args.items)
+
+    print(f"\n{'endpoint':<34}{'response_model':>16}{'pre-rendered':>14}{'speedup':>9}{'body KB':>9}")
+    for name, baseline, optimized in cases(*rows):
+        body = optimized()
+        if json.loads(baseline()) != json.loads(body):
+            print(f"❌ {name}: bodies differ")
+            sys.exit(1)
+        before, after = per_call(baseline), per_call(optimized)
+        print(
+            f"{name:<34}{before * 1e6:>13.0f} µs{after * 1e6:>11.0f} µs"
+            f"{before / after:>8.1f}x{len(body) / 1024:>9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
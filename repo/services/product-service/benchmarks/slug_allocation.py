@@ -0,0 +1,208 @@
+"""
+Benchmark: slug allocation on a catalog with many same-named products
+Run: python benchmarks/slug_allocation.py [--products 200000] [--same-name 5000] [--prefix-heavy 20000]
+
+Builds a SQLite catalog where --same-name products share one name, then
+creates --creates more products with that name and times picking their
+slugs with:
+  count+1   the old way: slug lookup, then ``COUNT(*)`` over the whole
+            table on a clash (and the result may already be taken)
+  allocator slugs.allocate_slug: one aggregate over the name's family
+  bulk      slugs.allocate_slugs for all of them at once (import path)
+count+1 scans the whole table, the allocator only the name's family.
+The same runs are repeated for a short name ("Samsung") whose slug is the
+prefix of --prefix-heavy longer slugs (samsung-galaxy-model-N): they fall
+in its index range but are not in its family.
+Then --races pairs of sessions pick a slug before either commits: count+1
+hands both the same one, commit_with_slug retries the loser.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--products", type=int, default=200000)
+parser.add_argument("--same-name", type=int, default=5000)
+parser.add_argument("--prefix-heavy", type=int, default=20000)
+parser.add_argument("--creates", type=int, default=500)
+parser.add_argument("--races", type=int, default=50)
+parser.add_argument("--db", default=os.path.join(tempfile.gettempdir(), "bench_slug_allocation.db"))
+args = parser.parse_args()
+
+if os.path.exists(args.db):
+    os.remove(args.db)
+os.environ["DATABASE_URL"] = f"sqlite:///{args.db}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import event, insert  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from app.crud.slugs import allocate_slug, allocate_slugs, commit_with_slug, generate_slug  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Product  # noqa: E402
+
+NAME = "Apple iPhone 15 Pro Max 256GB"
+SHORT_NAME = "Samsung"
+
+
+def build_catalog() -> None:
+    Base.metadata.create_all(bind=engine)
+    base = generate_slug(NAME)
+    short = generate_slug(SHORT_NAME)
+    rows = []
+    for i in range(args.products):
+        if i < args.same_name:
+            name, slug = NAME, base if i == 0 else f"{base}-{i + 1}"
+        elif i < args.same_name + args.prefix_heavy:
+            n = i - args.same_name
+            name, slug = (SHORT_NAME, short) if n == 0 else (f"Samsung Galaxy Model {n}", f"{short}-galaxy-model-{n}")
+        else:
+            name, slug = f"Product {i}", f"product-{i}"
+        rows.append({
+            "name": name, "slug": slug, "sku": f"SLUG{i:08d}", "price": 1000, "seller_id": "bench",
+            "images": [], "attributes": {},
+        })
+        if len(rows) == 10000:
+            with engine.begin() as conn:
+                conn.execute(insert(Product), rows)
+            rows = []
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(Product), rows)
+
+
+def legacy_slug(db, name: str) -> str:
+    slug = generate_slug(name)
+    if db.query(Product.id).filter(Product.slug == slug).first():
+        slug = f"{slug}-{db.query(Product).count() + 1}"
+    return slug
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        if self.active:
+            self.count += 1
+
+
+queries = QueryCounter()
+
+
+def run(label: str, allocate, name: str) -> tuple:
+    """Create --creates products, timing (and counting the queries of) only
+    the slug allocation."""
+    db = SessionLocal()
+    allocating = 0.0
+    clashes = 0
+    queries.count = 0
+    try:
+        for i in range(args.creates):
+            started = time.perf_counter()
+            queries.active = True
+            slug = allocate(db, name)
+            queries.active = False
+            allocating += time.perf_counter() - started
+            if db.query(Product.id).filter(Product.slug == slug).first():
+                clashes += 1  # would be an IntegrityError (HTTP 500)
+                continue
+            db.add(Product(name=name, slug=slug, sku=f"{label}{i:06d}", price=1000, seller_id="bench"))
+            db.commit()
+        db.query(Product).filter(Product.sku.like(f"{label}%")).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+    return allocating, clashes, queries.count
+
+
+def race(label: str, create) -> int:
+    """Failed creates when another session takes the same slug between
+    picking it and committing."""
+    failures = 0
+    own, other = SessionLocal(), SessionLocal()
+
+    def competing(slug: str, i: int) -> None:
+        other.add(Product(name=NAME, slug=slug, sku=f"{label}X{i:05d}", price=1000, seller_id="bench"))
+        other.commit()
+
+    try:
+        for i in range(args.races):
+            try:
+                create(own, f"{label}{i:05d}", lambda slug: competing(slug, i))
+            except IntegrityError:
+                own.rollback()
+                failures += 1
+        own.query(Product).filter(Product.sku.like(f"{label}%")).delete(synchronize_session=False)
+        own.commit()
+    finally:
+        own.close()
+        other.close()
+    return failures
+
+
+def legacy_create(db, sku: str, interleave) -> None:
+    slug = legacy_slug(db, NAME)
+    interleave(slug)
+    db.add(Product(name=NAME, slug=slug, sku=sku, price=1000, seller_id="bench"))
+    db.commit()
+
+
+def allocator_create(db, sku: str, interleave) -> None:
+    attempts = []
+
+    def stage(slug):
+        if not attempts:
+            interleave(slug)
+        attempts.append(slug)
+        product = Product(name=NAME, slug=slug, sku=sku, price=1000, seller_id="bench")
+        db.add(product)
+        return product
+    commit_with_slug(db, Product, NAME, stage)
+
+
+def compare(name: str) -> None:
+    print(f"\n{name!r}")
+    print(f"{'method':<12}{'total ms':>10}{'per slug µs':>13}{'queries':>9}{'clashes':>9}")
+    for label, allocate in (
+        ("count+1", legacy_slug),
+        ("allocator", lambda db, text: allocate_slug(db, Product, text)),
+    ):
+        elapsed, clashes, count = run(label.replace("+", ""), allocate, name)
+        print(f"{label:<12}{elapsed * 1000:>10.1f}{elapsed / args.creates * 1e6:>13.0f}{count:>9}{clashes:>9}")
+
+    db = SessionLocal()
+    try:
+        queries.count, queries.active = 0, True
+        started = time.perf_counter()
+        slugs = allocate_slugs(db, Product, [name] * args.creates)
+        elapsed = time.perf_counter() - started
+        queries.active = False
+    finally:
+        db.close()
+    assert len(set(slugs)) == len(slugs)
+    print(f"{'bulk':<12}{elapsed * 1000:>10.1f}{elapsed / args.creates * 1e6:>13.0f}{queries.count:>9}{0:>9}")
+
+
+def main():
+    print(
+        f"📦 Building {args.products:,} products, {args.same_name:,} named {NAME!r}, "
+        f"{args.prefix_heavy:,} prefixed by {generate_slug(SHORT_NAME)!r} ..."
+    )
+    build_catalog()
+    compare(NAME)
+    compare(SHORT_NAME)
+
+    print(f"\n🏁 {args.races} racing creates")
+    print(f"{'count+1':<12}{race('racecount', legacy_create):>4} failed")
+    print(f"{'allocator':<12}{race('racealloc', allocator_create):>4} failed")
+
+
+if __name__ == "__main__":
+    main()
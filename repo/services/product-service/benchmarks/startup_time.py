@@ -0,0 +1,111 @@
+"""
+Benchmark: worker startup time, from process start until GET /ready is 200
+Run: python benchmarks/startup_time.py [--runs 5] [--products 20000] [--database-url mysql+pymysql://...]
+
+Migrates a database with ``alembic upgrade head`` (a throwaway SQLite file
+unless --database-url is given), fills it with a small synthetic catalog,
+then starts ``uvicorn app.main:app`` --runs times and polls /ready. For
+each run it reports the time to ready and the lifespan steps /ready lists
+(pool warm-up, category tree cache, search index).
+
+For comparison it also times ``Base.metadata.create_all`` on the already
+migrated schema, which every worker used to run when importing app.main:
+one table-exists check per table, before the process could serve anything.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--runs", type=int, default=5)
+parser.add_argument("--products", type=int, default=20000)
+parser.add_argument("--database-url", default=None, help="Existing database to use instead of a temp SQLite file")
+parser.add_argument("--timeout", type=float, default=60, help="Seconds to wait for /ready per run")
+args = parser.parse_args()
+
+DB_PATH = os.path.join(tempfile.gettempdir(), "bench_startup_time.db")
+if args.database_url is None:
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    args.database_url = f"sqlite:///{DB_PATH}"
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"
+os.environ.setdefault("SLOW_QUERY_THRESHOLD_MS", "60000")
+
+from app.database import Base, engine  # noqa: E402
+from generate_catalog import generate_catalog  # noqa: E402
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_ready() -> tuple:
+    """Seconds from spawning a worker until /ready answers 200, and its body."""
+    port = _free_port()
+    started = time.perf_counter()
+    worker = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR, env=os.environ.copy(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=1) as client:
+            while time.perf_counter() - started < args.timeout:
+                try:
+                    response = client.get("/ready")
+                    if response.status_code == 200:
+                        return time.perf_counter() - started, response.json()
+                except httpx.TransportError:
+                    pass
+                if worker.poll() is not None:
+                    raise RuntimeError(f"worker exited with {worker.returncode}")
+                time.sleep(0.01)
+        raise RuntimeError(f"not ready after {args.timeout}s")
+    finally:
+        worker.terminate()
+        worker.wait()
+
+
+def main():
+    print(f"🗄️  Migrating {engine.dialect.name} and generating {args.products:,} products ...")
+    subprocess.run(["alembic", "upgrade", "head"], cwd=SERVICE_DIR, check=True, capture_output=True)
+    generate_catalog(products=args.products, depth=3, fanout=4)
+
+    create_all = []
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        Base.metadata.create_all(bind=engine)
+        create_all.append(time.perf_counter() - started)
+    engine.dispose()
+
+    print(f"\n{'run':<6}{'ready ms':>10}  lifespan steps ms")
+    ready = []
+    for run in range(1, args.runs + 1):
+        elapsed, body = time_to_ready()
+        ready.append(elapsed)
+        steps = ", ".join(f"{name} {ms}" for name, ms in body["steps_ms"].items())
+        print(f"{run:<6}{elapsed * 1000:>10.0f}  {steps} (total {body['startup_ms']})")
+
+    print(f"\n⏱️  time to ready: p50 {statistics.median(ready) * 1000:.0f} ms, max {max(ready) * 1000:.0f} ms")
+    print(f"🧱 create_all on the migrated schema (formerly paid at import): "
+          f"p50 {statistics.median(create_all) * 1000:.1f} ms")
+
+    if args.database_url == f"sqlite:///{DB_PATH}":
+        os.remove(DB_PATH)
+
+
+if __name__ == "__main__":
+    main()
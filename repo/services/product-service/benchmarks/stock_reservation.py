@@ -0,0 +1,119 @@
+"""
+Stress test: concurrent bulk stock reservations must never oversell
+Run: python benchmarks/stock_reservation.py [--database-url mysql+pymysql://...]
+
+Starts many threads that each reserve random baskets through
+bulk_update_stock, then checks that no product went below zero and that
+every product's stock dropped by exactly the quantity of the reservations
+that reported success. Exits non-zero if either check fails.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--database-url", default=f"sqlite:///{os.path.join(tempfile.gettempdir(), 'bench_stock.db')}")
+parser.add_argument("--products", type=int, default=5)
+parser.add_argument("--stock", type=int, default=100)
+parser.add_argument("--threads", type=int, default=16)
+parser.add_argument("--orders", type=int, default=50, help="Orders per thread")
+args = parser.parse_args()
+
+os.environ["DATABASE_URL"] = args.database_url
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from app.crud import product as product_crud  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.models import Product  # noqa: E402
+
+
+def setup() -> list:
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        db.query(Product).filter(Product.seller_id == "stress-test").delete()
+        products = [
+            Product(
+                name=f"Stress product {i}", slug=f"stress-product-{i}", sku=f"STRESS{i}",
+                price=1000, stock=args.stock, seller_id="stress-test", images=[], attributes={}
+            )
+            for i in range(args.products)
+        ]
+        db.add_all(products)
+        db.commit()
+        return [p.id for p in products]
+    finally:
+        db.close()
+
+
+def worker(product_ids: list, seed: int, reserved: dict, counters: dict, lock: threading.Lock) -> None:
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        for _ in range(args.orders):
+            basket = [(pid, -rng.randint(1, 3)) for pid in rng.sample(product_ids, rng.randint(1, 3))]
+            try:
+                success, _ = product_crud.bulk_update_stock(db, basket)
+            except OperationalError:
+                # Lock wait timeout / deadlock: the transaction was not applied
+                db.rollback()
+                success = False
+                with lock:
+                    counters["errors"] += 1
+            with lock:
+                counters["ok" if success else "rejected"] += 1
+                if success:
+                    for pid, quantity in basket:
+                        reserved[pid] += -quantity
+    finally:
+        db.close()
+
+
+def main():
+    product_ids = setup()
+    reserved = {pid: 0 for pid in product_ids}
+    counters = {"ok": 0, "rejected": 0, "errors": 0}
+    lock = threading.Lock()
+
+    threads = [
+        threading.Thread(target=worker, args=(product_ids, seed, reserved, counters, lock))
+        for seed in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    db = SessionLocal()
+    stocks = dict(db.query(Product.id, Product.stock).filter(Product.id.in_(product_ids)).all())
+    db.close()
+
+    total = counters["ok"] + counters["rejected"]
+    print(f"⚙️  {total} reservations in {elapsed:.2f}s ({total / elapsed:.0f}/s) on {engine.dialect.name}")
+    print(f"   accepted={counters['ok']} rejected={counters['rejected']} (db errors={counters['errors']})")
+
+    failed = False
+    for pid in product_ids:
+        expected = args.stock - reserved[pid]
+        status = "✅" if stocks[pid] == expected and stocks[pid] >= 0 else "❌"
+        failed = failed or status == "❌"
+        print(f"{status} product {pid}: stock={stocks[pid]} expected={expected}")
+
+    if failed:
+        print("❌ Oversell or lost update detected")
+        sys.exit(1)
+    print("🎉 No oversell")
+
+
+if __name__ == "__main__":
+    main()
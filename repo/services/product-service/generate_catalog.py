@@ -0,0 +1,291 @@
+"""
+Deterministic synthetic catalog for local load and performance testing
+Run: alembic upgrade head && python generate_catalog.py --products 1000000
+     python generate_catalog.py --products 100000 --depth 5 --fanout 3 --reviews 500000
+
+Builds on seed.py's categories_data and products_data: every seed category
+becomes the root of a tree --depth levels deep with --fanout children per
+node, and every product is a variant of a seed product placed somewhere in
+its template's tree. Reviews follow a Zipf-like popularity curve
+(--review-skew), so a few products carry most of them, as in production;
+rating, rating_sum, review_count and sold_count agree with that curve.
+
+The same options and --seed always produce the same rows. Everything is
+written with bulk INSERTs of --chunk-size rows; existing catalog data is
+deleted first unless --append is given.
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import func, insert
+
+from app.database import SessionLocal, engine
+from app.models import Category, Product, ProductReview, StockReservation
+from seed import categories_data, products_data
+
+# Fixed clock so created_at is reproducible too
+ANCHOR = datetime(2025, 1, 1)
+HISTORY_DAYS = 730
+
+COLORS = ["Black", "White", "Silver", "Blue", "Green", "Red", "Gold", "Graphite"]
+EDITIONS = ["", "2024", "Pro", "Lite", "Plus", "Max", "Mini", "SE"]
+# Rating shares of real marketplaces: J-shaped, mostly fives
+RATING_WEIGHTS = [(5, 55), (4, 20), (3, 8), (2, 5), (1, 12)]
+REVIEW_TITLES = ["Zo'r!", "Yaxshi", "O'rtacha", "Yomon emas", "Tavsiya qilaman", "Pulga arziydi"]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, default=1000000)
+    parser.add_argument("--depth", type=int, default=4, help="Category levels, roots included")
+    parser.add_argument("--fanout", type=int, default=4, help="Subcategories per category")
+    parser.add_argument("--reviews", type=int, default=None, help="Total reviews (default: 2 per product)")
+    parser.add_argument("--review-skew", type=float, default=1.0, help="Zipf exponent of review popularity")
+    parser.add_argument("--sellers", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--append", action="store_true", help="Keep existing catalog data")
+    return parser
+
+
+def _insert(table, rows: Iterator[dict], chunk_size: int) -> int:
+    written = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            with engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+            written += len(chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as conn:
+            conn.execute(insert(table), chunk)
+        written += len(chunk)
+    return written
+
+
+def _next_id(model) -> int:
+    db = SessionLocal()
+    try:
+        return (db.query(func.max(model.id)).scalar() or 0) + 1
+    finally:
+        db.close()
+
+
+def clear_catalog() -> None:
+    db = SessionLocal()
+    try:
+        db.query(StockReservation).delete()
+        db.query(ProductReview).delete()
+        db.query(Product).delete()
+        # Children before parents
+        db.query(Category).update({Category.parent_id: None})
+        db.query(Category).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+# ==========================================
+# Categories
+# ==========================================
+
+def generate_categories(depth: int, fanout: int, first_id: int) -> Dict[str, List[dict]]:
+    """Category rows per seed root slug, root first, in insert order."""
+    trees = {}
+    next_id = first_id
+    for template in categories_data:
+        root = {
+            "id": next_id, "name": template["name"], "slug": f"{template['slug']}-{next_id}",
+            "description": template["description"], "image": template["image"],
+            "parent_id": None, "path": f"/{next_id}/", "is_active": True, "sort_order": 0,
+        }
+        next_id += 1
+        tree, level = [root], [(root, "")]
+        for _ in range(depth - 1):
+            children = []
+            for parent, label in level:
+                for n in range(1, fanout + 1):
+                    child_label = f"{label}.{n}" if label else str(n)
+                    child = {
+                        "id": next_id, "name": f"{template['name']} {child_label}",
+                        "slug": f"{template['slug']}-{child_label.replace('.', '-')}-{next_id}",
+                        "description": template["description"], "image": template["image"],
+                        "parent_id": parent["id"], "path": f"{parent['path']}{next_id}/",
+                        "is_active": True, "sort_order": n,
+                    }
+                    next_id += 1
+                    tree.append(child)
+                    children.append((child, child_label))
+            level = children
+        trees[template["slug"]] = tree
+    return trees
+
+
+# ==========================================
+# Products and reviews
+# ==========================================
+
+def review_counts(rng: random.Random, products: int, reviews: int, skew: float) -> List[int]:
+    """Reviews per product: rank r gets a share proportional to 1 / r**skew."""
+    if not products or not reviews:
+        return [0] * products
+    ranks = list(range(1, products + 1))
+    rng.shuffle(ranks)
+    cum_weights = list(accumulate(rank ** -skew for rank in ranks))
+    counts = [0] * products
+    for index in rng.choices(range(products), cum_weights=cum_weights, k=reviews):
+        counts[index] += 1
+    return counts
+
+
+def _ratings(rng: random.Random, count: int) -> List[int]:
+    values, weights = zip(*RATING_WEIGHTS)
+    return rng.choices(values, weights=weights, k=count)
+
+
+def generate_products(
+    rng: random.Random,
+    count: int,
+    first_id: int,
+    trees: Dict[str, List[dict]],
+    counts: List[int],
+    ratings: Dict[int, List[int]],
+    sellers: int
+) -> Iterator[dict]:
+    templates = [template for template in products_data if template["category_slug"] in trees]
+    for index in range(count):
+        product_id = first_id + index
+        template = templates[rng.randrange(len(templates))]
+        edition = rng.choice(EDITIONS)
+        color = rng.choice(COLORS)
+        # Whole thousands of so'm, like the seed prices
+        price = max(int(round(template["price"] * rng.lognormvariate(0, 0.25), -3)), 1000)
+
+        rating_sum = sum(ratings.get(index, ()))
+        review_count = len(ratings.get(index, ()))
+        rating = (Decimal(rating_sum) / review_count).quantize(Decimal("0.1"), ROUND_HALF_UP) if review_count else 0
+        yield {
+            "id": product_id,
+            "name": " ".join(part for part in (template["name"], edition, color) if part),
+            "slug": f"{template['slug']}-{product_id}",
+            "description": template["description"],
+            "short_description": template["short_description"],
+            "sku": f"{template['sku'][:30]}-{product_id}",
+            "price": price,
+            "compare_price": int(round(price * 1.15, -3)) if rng.random() < 0.3 else None,
+            "stock": int(rng.paretovariate(1.5) * 5) if rng.random() < 0.95 else 0,
+            "reserved": 0,
+            "category_id": rng.choice(trees[template["category_slug"]])["id"],
+            "seller_id": f"seller-{rng.randrange(sellers):05d}",
+            "brand": template.get("brand"),
+            "images": [template["images"]] if isinstance(template.get("images"), str) else template.get("images", []),
+            "attributes": {"color": color, "edition": edition or "Standard"},
+            "is_active": rng.random() < 0.97,
+            "is_featured": rng.random() < 0.01,
+            "rating": rating,
+            "rating_sum": rating_sum,
+            "review_count": review_count,
+            # Popular products sell more
+            "sold_count": counts[index] * rng.randint(5, 20) + rng.randrange(10),
+            "view_count": counts[index] * rng.randint(50, 200) + rng.randrange(100),
+            "created_at": ANCHOR - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)),
+        }
+
+
+def generate_reviews(
+    rng: random.Random,
+    first_product_id: int,
+    ratings: Dict[int, List[int]],
+    unapproved: Dict[int, int]
+) -> Iterator[dict]:
+    for index in sorted(set(ratings) | set(unapproved)):
+        approved = ratings.get(index, [])
+        hidden = unapproved.get(index, 0)
+        for n, rating in enumerate(approved + _ratings(rng, hidden)):
+            yield {
+                "product_id": first_product_id + index,
+                "user_id": f"user-{n:07d}",
+                "rating": rating,
+                "title": rng.choice(REVIEW_TITLES),
+                "comment": "Sintetik sharh." if rng.random() < 0.7 else None,
+                "images": [],
+                "is_verified_purchase": rng.random() < 0.6,
+                "is_approved": n < len(approved),
+                "helpful_count": int(rng.paretovariate(2)) - 1,
+                "created_at": ANCHOR - timedelta(seconds=rng.randrange(HISTORY_DAYS * 86400)),
+            }
+
+
+def generate_catalog(
+    products: int = 1000000,
+    depth: int = 4,
+    fanout: int = 4,
+    reviews: Optional[int] = None,
+    review_skew: float = 1.0,
+    sellers: int = 500,
+    seed: int = 42,
+    chunk_size: int = 10000,
+    append: bool = False
+) -> dict:
+    """Write the synthetic catalog and return the row counts."""
+    if not append:
+        clear_catalog()
+    reviews = products * 2 if reviews is None else reviews
+
+    trees = generate_categories(depth, fanout, _next_id(Category))
+    categories = _insert(Category.__table__, (row for tree in trees.values() for row in tree), chunk_size)
+
+    # Separate streams so changing one volume keeps the other stages' rows
+    review_rng = random.Random(f"{seed}-reviews")
+    counts = review_counts(review_rng, products, reviews, review_skew)
+    ratings, unapproved = {}, {}
+    for index, count in enumerate(counts):
+        if count:
+            hidden = sum(1 for _ in range(count) if review_rng.random() < 0.05)
+            ratings[index] = _ratings(review_rng, count - hidden)
+            if hidden:
+                unapproved[index] = hidden
+
+    first_product_id = _next_id(Product)
+    written = _insert(
+        Product.__table__,
+        generate_products(random.Random(f"{seed}-products"), products, first_product_id, trees, counts, ratings, sellers),
+        chunk_size
+    )
+    review_rows = _insert(
+        ProductReview.__table__,
+        generate_reviews(review_rng, first_product_id, ratings, unapproved),
+        chunk_size
+    )
+    return {"categories": categories, "products": written, "reviews": review_rows}
+
+
+def main():
+    args = build_parser().parse_args()
+    started = time.perf_counter()
+    print(f"🏭 Generating {args.products:,} products on {engine.dialect.name} (seed {args.seed}) ...")
+    counts = generate_catalog(
+        products=args.products, depth=args.depth, fanout=args.fanout, reviews=args.reviews,
+        review_skew=args.review_skew, sellers=args.sellers, seed=args.seed,
+        chunk_size=args.chunk_size, append=args.append
+    )
+    print(
+        f"🎉 {counts['categories']:,} categories, {counts['products']:,} products, "
+        f"{counts['reviews']:,} reviews in {time.perf_counter() - started:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
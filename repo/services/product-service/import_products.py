@@ -0,0 +1,72 @@
+"""
+Bulk-import products from an NDJSON or CSV file, upserting by SKU.
+Run: python import_products.py products.ndjson --seller-id <uuid>
+     python import_products.py products.csv --seller-id <uuid> --admin
+     cat products.ndjson | python import_products.py - --format ndjson --seller-id <uuid>
+
+Same rules as POST /api/products/import. Per-row errors go to stderr (or
+--errors-file) as NDJSON; the exit code is 1 if any row failed.
+"""
+
+import argparse
+import json
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import settings
+from app.crud.product_import import FORMATS, ProductImporter, parse_rows
+from app.database import SessionLocal
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="File to import, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--seller-id", required=True, help="Owner of newly created products")
+    parser.add_argument("--admin", action="store_true", help="Allow updating other sellers' SKUs")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--errors-file", help="Write per-row errors here instead of stderr")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8", newline="")
+
+    db = SessionLocal()
+    importer = ProductImporter(db, args.seller_id, update_any=args.admin, chunk_size=args.chunk_size)
+    started = time.perf_counter()
+    try:
+        chunk = []
+        for row in parse_rows(stream, fmt):
+            chunk.append(row)
+            if len(chunk) >= args.chunk_size:
+                importer.import_chunk(chunk)
+                chunk = []
+                print(f"  … {importer.processed:,} rows", file=sys.stderr)
+        if chunk:
+            importer.import_chunk(chunk)
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+
+    report = importer.report()
+    elapsed = time.perf_counter() - started
+    errors = open(args.errors_file, "w", encoding="utf-8") if args.errors_file else sys.stderr
+    for error in report["errors"]:
+        errors.write(json.dumps(error, ensure_ascii=False) + "\n")
+    if errors is not sys.stderr:
+        errors.close()
+
+    print(
+        f"📦 {report['processed']:,} rows in {elapsed:.1f}s: {report['created']:,} created, "
+        f"{report['updated']:,} updated, {report['failed']:,} failed"
+    )
+    if report["errors_truncated"]:
+        print(f"⚠️  Only the first {len(report['errors'])} errors were kept", file=sys.stderr)
+    sys.exit(1 if report["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
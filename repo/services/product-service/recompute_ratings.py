@@ -0,0 +1,25 @@
+"""
+Rebuild product rating aggregates (rating, rating_sum, review_count)
+from approved reviews, repairing any drift in the incremental counters.
+Run: python recompute_ratings.py
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.database import SessionLocal
+from app.crud.product import recompute_rating_aggregates
+
+
+def main():
+    db = SessionLocal()
+    try:
+        reviewed = recompute_rating_aggregates(db)
+        print(f"⭐ Recomputed ratings ({reviewed} products with reviews)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
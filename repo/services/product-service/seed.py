@@ -1,20 +1,17 @@
 """
 Seed data script for Product Service
-Run: python seed.py
+Run: alembic upgrade head && python seed.py
 """
 
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app.database import SessionLocal, engine, Base
+from app.database import SessionLocal
 from app.models import Category, Product, ProductReview
 from datetime import datetime
 import random
 
-# Create tables
-Base.metadata.create_all(bind=engine)
-
 # Categories data
 categories_data = [
     {"name": "Telefonlar", "slug": "telefonlar", "description": "Smartfonlar va mobil qurilmalar", "image": "📱"},
@@ -450,6 +447,7 @@ def seed_database():
             )
             db.add(category)
             db.flush()
+            category.path = f"/{category.id}/"
             category_map[cat_data["slug"]] = category.id
             print(f"✅ Category: {cat_data['name']}")
         
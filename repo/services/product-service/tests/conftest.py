@@ -0,0 +1,64 @@
+"""
+Test setup: a primary and one read replica, both SQLite files.
+
+The replica is a file copy of the primary taken by ``sync_replica``, so a
+test can make it lag simply by writing to the primary without syncing.
+Settings are read at import time, hence the environment is set before
+anything from ``app`` is imported.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="product-service-tests-")
+PRIMARY_PATH = os.path.join(DATA_DIR, "primary.db")
+REPLICA_PATH = os.path.join(DATA_DIR, "replica.db")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_PATH}"
+os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{REPLICA_PATH}"
+os.environ["DEBUG"] = "false"
+os.environ["PRODUCT_CACHE_BACKEND"] = "memory"
+os.environ["SEARCH_BACKEND"] = "database"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.cache import count_cache, product_cache  # noqa: E402
+from app.crud.category import tree_cache  # noqa: E402
+from app.database import Base, SessionLocal, engine, engines  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+def sync_replica() -> None:
+    """Bring the replica up to date with the primary."""
+    engines["replica-0"].dispose()
+    shutil.copyfile(PRIMARY_PATH, REPLICA_PATH)
+
+
+@pytest.fixture(autouse=True)
+def fresh_database():
+    engine.dispose()
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    sync_replica()
+    for cache in (product_cache, count_cache, tree_cache):
+        cache.clear()
+    yield
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
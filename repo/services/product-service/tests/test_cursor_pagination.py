@@ -0,0 +1,33 @@
+from sqlalchemy import text
+
+from conftest import sync_replica
+
+SELLER = {"X-User-Id": "seller-1"}
+
+
+def walk(client, **params):
+    """Every page of a cursor walk, as lists of names."""
+    pages, cursor = [], None
+    for _ in range(10):
+        query = dict(params, cursor=cursor) if cursor else params
+        body = client.get("/api/products", params=query).json()
+        pages.append([item["name"] for item in body["items"]])
+        cursor = body["next_cursor"]
+        if not cursor:
+            return pages
+    raise AssertionError(f"Cursor walk did not end: {pages}")
+
+
+def test_cursor_walk_over_equal_timestamps(client, db):
+    for number in range(1, 5):
+        response = client.post(
+            "/api/products", json={"name": f"Phone {number}", "sku": f"SKU-{number}", "price": 100}, headers=SELLER
+        )
+        assert response.status_code == 201
+    db.execute(text("UPDATE products SET created_at = CURRENT_TIMESTAMP"))
+    db.commit()
+    sync_replica()
+    client.cookies.clear()
+
+    assert walk(client, limit=2) == [["Phone 4", "Phone 3"], ["Phone 2", "Phone 1"], []]
+    assert walk(client, limit=2, sort_order="asc") == [["Phone 1", "Phone 2"], ["Phone 3", "Phone 4"], []]
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+
+from app.database import READ_PRIMARY_HEADER
+
+from conftest import sync_replica
+
+SELLER = {"X-User-Id": "seller-1"}
+
+
+def create_product(client, name, sku):
+    response = client.post("/api/products", json={"name": name, "sku": sku, "price": 100}, headers=SELLER)
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_batch_serves_cached_products_and_queries_the_rest(client, db):
+    phone = create_product(client, "Phone", "SKU-1")
+    laptop = create_product(client, "Laptop", "SKU-2")
+    client.cookies.clear()
+    sync_replica()
+    assert client.get(f"/api/products/{phone}").status_code == 200
+
+    # Renamed behind the cache's back: only the uncached product shows it
+    db.execute(text("UPDATE products SET name = name || ' 2'"))
+    db.commit()
+    sync_replica()
+
+    body = client.get("/api/products/batch", params={"ids": f"{laptop},{phone},999"}).json()
+    assert [item["name"] for item in body["items"]] == ["Laptop 2", "Phone"]
+    assert body["missing"] == [999]
+    assert body == client.post("/api/products/batch", json={"ids": [laptop, phone, 999]}).json()
+
+    fresh = client.get("/api/products/batch", params={"ids": phone}, headers={READ_PRIMARY_HEADER: "1"}).json()
+    assert [item["name"] for item in fresh["items"]] == ["Phone 2"]
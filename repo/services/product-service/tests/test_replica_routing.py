@@ -0,0 +1,94 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database
+from app.database import READ_PRIMARY_COOKIE, READ_PRIMARY_HEADER, ReplicaSet
+
+from conftest import sync_replica
+
+SELLER = {"X-User-Id": "seller-1"}
+PRIMARY = {READ_PRIMARY_HEADER: "1"}
+
+
+def create_product(client, name="Phone", sku="SKU-1", **fields):
+    response = client.post("/api/products", json={"name": name, "sku": sku, "price": 100, **fields}, headers=SELLER)
+    assert response.status_code == 201
+    client.cookies.clear()
+    return response.json()
+
+
+def names(response):
+    return [item["name"] for item in response.json()["items"]]
+
+
+def test_reads_use_the_replica(client):
+    create_product(client)
+
+    assert names(client.get("/api/products")) == []
+    assert names(client.get("/api/products", headers=PRIMARY)) == ["Phone"]
+
+    sync_replica()
+    assert names(client.get("/api/products")) == ["Phone"]
+
+
+def test_write_pins_the_client_to_the_primary(client):
+    response = client.post("/api/products", json={"name": "Phone", "sku": "SKU-1", "price": 100}, headers=SELLER)
+    assert READ_PRIMARY_COOKIE in response.cookies
+
+    assert names(client.get("/api/products")) == ["Phone"]
+    client.cookies.clear()
+    assert names(client.get("/api/products")) == []
+
+
+def test_unreachable_replica_fails_over_to_the_primary(client, monkeypatch):
+    broken = ReplicaSet(retry_after=30)
+    broken.add("replica-broken", sessionmaker(bind=create_engine("sqlite:////nonexistent-dir/replica.db")))
+    monkeypatch.setattr(database, "replicas", broken)
+    create_product(client)
+
+    assert names(client.get("/api/products")) == ["Phone"]
+    assert broken.status() == {"replica-broken": False}
+    assert broken.pick() is None
+
+
+def test_list_etag_comes_from_the_same_database_as_the_body(client):
+    create_product(client)
+    sync_replica()
+    stale = client.get("/api/products")
+
+    create_product(client, name="Laptop", sku="SKU-2")
+    fresh = client.get("/api/products", headers=PRIMARY)
+    assert fresh.headers["etag"] != stale.headers["etag"]
+
+    # The lagging replica still serves the old list, under the old ETag
+    lagging = client.get("/api/products", headers={"If-None-Match": fresh.headers["etag"]})
+    assert lagging.status_code == 200
+    assert names(lagging) == ["Phone"]
+    assert lagging.headers["etag"] == stale.headers["etag"]
+
+
+def test_lagging_replica_does_not_refill_the_product_cache(client):
+    product = create_product(client)
+    sync_replica()
+    assert client.get(f"/api/products/{product['id']}").json()["name"] == "Phone"
+
+    response = client.put(f"/api/products/{product['id']}", json={"name": "Phone 2"}, headers=SELLER)
+    assert response.status_code == 200
+    writer_cookies = dict(client.cookies)
+    client.cookies.clear()
+
+    # Replica still has "Phone"; the cache miss must be read from the primary
+    assert client.get(f"/api/products/{product['id']}").json()["name"] == "Phone 2"
+    client.cookies.update(writer_cookies)
+    assert client.get(f"/api/products/{product['id']}").json()["name"] == "Phone 2"
+
+
+def test_category_tree_is_built_on_the_primary(client):
+    assert client.post("/api/categories", json={"name": "Phones", "slug": "phones"}).status_code == 201
+    client.cookies.clear()
+
+    # The replica has neither the category nor the new catalog version
+    response = client.get("/api/categories/tree")
+    assert [node["name"] for node in response.json()] == ["Phones"]
+    primary = client.get("/api/categories/tree", headers=PRIMARY)
+    assert response.headers["etag"] == primary.headers["etag"]
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine
+from sqlalchemy.orm import DeclarativeBase, Session
+
+from app.crud.slugs import allocate_slug, allocate_slugs
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class Item(Base):
+    """Slug column with a case-insensitive collation, like MySQL's
+    utf8mb4_unicode_ci (which also ignores accents)."""
+    __tablename__ = "items"
+    id = Column(Integer, primary_key=True)
+    slug = Column(String(64, collation="NOCASE"), unique=True)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def test_base_taken_is_checked_under_the_column_collation(session):
+    session.add_all([Item(slug="Soz"), Item(slug="Soz-2")])
+    session.flush()
+
+    assert allocate_slug(session, Item, "soz") == "soz-3"
+    assert allocate_slug(session, Item, "soz phone") == "soz-phone"
+
+
+def test_bulk_slugs_fold_case_and_accents(session):
+    session.add(Item(slug="soz"))
+    session.flush()
+
+    assert allocate_slugs(session, Item, ["sóz", "Soz", "SÓZ phone"]) == ["sóz-2", "soz-3", "sóz-phone"]
@@ -0,0 +1,69 @@
+import json
+
+from app.models import Product
+
+SELLER = {"X-User-Id": "seller-1"}
+
+
+def create_product(client, stock=5, sku="SKU-1"):
+    response = client.post(
+        "/api/products", json={"name": "Phone", "sku": sku, "price": 100, "stock": stock}, headers=SELLER
+    )
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def hold(client, product_id, quantity):
+    response = client.post("/api/reservations", json={"items": [{"product_id": product_id, "quantity": quantity}]})
+    assert response.status_code == 201
+    return response.json()["hold_id"]
+
+
+def stock_of(db, product_id):
+    db.expire_all()
+    product = db.get(Product, product_id)
+    return product.stock, product.reserved
+
+
+def test_stock_cannot_be_set_below_held_units(client, db):
+    product_id = create_product(client)
+    hold(client, product_id, 5)
+
+    response = client.put(f"/api/products/{product_id}", json={"stock": 2}, headers=SELLER)
+    assert response.status_code == 409
+    assert stock_of(db, product_id) == (5, 5)
+
+    assert client.put(f"/api/products/{product_id}", json={"stock": 7}, headers=SELLER).status_code == 200
+    assert stock_of(db, product_id) == (7, 5)
+
+
+def test_import_cannot_set_stock_below_held_units(client, db):
+    product_id = create_product(client)
+    hold(client, product_id, 5)
+
+    body = json.dumps({"name": "Phone", "sku": "SKU-1", "price": 100, "stock": 2})
+    response = client.post("/api/products/import", content=body, headers=SELLER)
+    assert response.json()["updated"] == 0
+    assert "held by open reservations" in response.json()["errors"][0]["error"]
+    assert stock_of(db, product_id) == (5, 5)
+
+
+def test_restock_is_allowed_while_stock_is_below_held_units(client, db):
+    product_id = create_product(client)
+    hold_id = hold(client, product_id, 5)
+    # Stock lowered below the hold before the guard existed
+    db.query(Product).filter(Product.id == product_id).update({"stock": 2})
+    db.commit()
+
+    response = client.patch(f"/api/products/{product_id}/stock", params={"quantity": 1})
+    assert response.status_code == 200
+    assert stock_of(db, product_id) == (3, 5)
+
+    assert client.patch(f"/api/products/{product_id}/stock", params={"quantity": -1}).status_code == 400
+
+    # Not a race: committing fails for good and says so, releasing works
+    response = client.post(f"/api/reservations/{hold_id}/commit")
+    assert response.status_code == 422
+    assert "retry" not in response.json()["detail"]
+    assert client.post(f"/api/reservations/{hold_id}/release").status_code == 200
+    assert stock_of(db, product_id) == (3, 0)